@@ -156,5 +156,17 @@ if not os.environ.get("LOCAL_RUN"):
             raise RuntimeError(f"Failed to import FastAPI app: {e}, {e2}")
 
     # Create the Mangum handler
-    handler = Mangum(app, lifespan='off')
+    http_handler = Mangum(app, lifespan='off')
+
+    def handler(event, context):
+        """
+        Routes scheduled EventBridge invocations to the stale job sweep (the
+        background reaper thread does not run on Lambda) and everything else
+        to the FastAPI app.
+        """
+        if isinstance(event, dict) and event.get('source') == 'aws.events':
+            from smart_agent.src.utils.reaper import reap_stale_jobs
+            return {'reaped': reap_stale_jobs()}
+        return http_handler(event, context)
+
     print("Lambda handler ready")
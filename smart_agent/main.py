@@ -4,8 +4,14 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from .src.routes import discover, execute, abort, status, logs
+from .src.routes import discover, execute, abort, status, logs, metrics
 from .src.utils.cleanup import setup_cleanup_handlers
+from .src.utils.worker_pool import shutdown_execution_pool, shutdown_async_runner
+from .src.utils.reaper import start_reaper, stop_reaper
+from .src.utils.job_context import start_heartbeat, stop_heartbeat
+from .src.agent.prompt_registry import start_prompt_refresher, stop_prompt_refresher
+from .src.utils.webhook_dispatcher import flush_webhooks
+from .src.utils.status_store import flush_status_store
 
 # Add dot env
 load_dotenv()
@@ -31,6 +37,26 @@ app.include_router(execute.router)
 app.include_router(abort.router)
 app.include_router(status.router)
 app.include_router(logs.router)
+app.include_router(metrics.router)
+
+
+@app.on_event("startup")
+def start_background_workers():
+    start_reaper()
+    start_heartbeat()
+    start_prompt_refresher()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    stop_reaper()
+    stop_heartbeat()
+    stop_prompt_refresher()
+    shutdown_execution_pool(wait=False)
+    shutdown_async_runner()
+    flush_webhooks()
+    flush_status_store()
+
 
 # Config App
 host = os.environ.get('APP_HOST', default='0.0.0.0')
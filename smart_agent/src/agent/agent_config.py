@@ -1,14 +1,5 @@
-import os 
-import json
+from ..config.manifest import get_manifest
 
 def fetch_agent_config():
-  doc = {}
-  current_directory = os.path.dirname(__file__)
-  file_path = os.path.normpath(
-      os.path.join(current_directory, '../config/agent.json'))
-
-  with open(file_path, "r") as json_file:
-      doc = json.load(json_file)
-      # print(f"the json config: {doc}")
-
-  return doc
\ No newline at end of file
+  # Parsed once per process and shared; callers must not modify it
+  return get_manifest().doc
@@ -1,17 +1,20 @@
 from ..config.logger import Logger
 from ..utils.webhook import call_webhook_with_error, call_webhook_with_success
-from openai import OpenAI
-from .prompt_extract import extract_prompts
+from .openai_client import get_openai_client, get_async_openai_client
+from .context_window import ConversationTurn, compact, compact_async
+from .prompt_registry import extract_prompt, get_prompt_registry, register_prompt
+import asyncio
 import os
 from datetime import datetime
 from .agent_config import fetch_agent_config
-import json
 
 # Configuration flag - Change this to switch between dev and prod modes
 ENVIRONMENT_MODE = "dev"  # Change to "prod" for production or dev for development
 
-openai_api_key = os.environ.get("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_openai_client()
+
+# Model used by the Chat Completions fallback if the gpt-5.1 Responses API fails
+FALLBACK_MODEL = "gpt-4o"
 
 COMPLETION_MARKER = "[CONVERSATION_COMPLETE]"
 
@@ -21,20 +24,13 @@ def get_environment_mode():
     return ENVIRONMENT_MODE.lower()
 
 
-def get_prompt_file_path():
-    """Get the appropriate prompt file path based on environment mode"""
-    mode = get_environment_mode()
+# Loaded at import and kept fresh by the prompt refresher; turns never touch the disk
+PROMPT_NAME = register_prompt('ClientDiscovery.yaml', get_environment_mode())
 
-    if mode == "dev":
-        # In dev mode, try /tmp/Prompt first, fallback to Prompt
-        tmp_prompt_path = '/tmp/Prompt/ClientDiscovery.yaml'
-        if os.path.exists(tmp_prompt_path):
-            return tmp_prompt_path
-        else:
-            return 'Prompt/ClientDiscovery.yaml'
-    else:
-        # In prod mode, only use Prompt folder
-        return 'Prompt/ClientDiscovery.yaml'
+
+def get_prompt_file_path():
+    """Get the prompt file path the prompt registry loaded, based on environment mode"""
+    return get_prompt_registry().get(PROMPT_NAME).path
 
 
 def detect_completion(response_text):
@@ -47,28 +43,18 @@ def clean_response(response_text):
     return response_text.replace(COMPLETION_MARKER, "").strip()
 
 
-def interviewer(user_input, previous_response_id=None):
+def _prepare_turn(user_input, previous_response_id=None):
     """
-    Conduct an interview turn using OpenAI's GPT-5.1 Responses API with thread continuity.
-
-    GPT-5.1 uses the Responses API which supports:
-    - previous_response_id for passing chain of thought between turns
-    - reasoning.effort parameter (none, low, medium, high)
-    - text.verbosity parameter (low, medium, high)
-
-    Args:
-        user_input: The user's message
-        previous_response_id: The ID of the previous response for thread continuity
+    Builds the prompts, the stored conversation and the GPT-5.1 Responses API
+    parameters (without the input, which depends on compaction) for one turn.
 
     Returns:
-        tuple: (model_response, response_id, is_complete)
+        tuple: (turn, model_params, api_params)
     """
-    prompt_file_path = get_prompt_file_path()
-
     # Extract prompts with user input replacement
     replacements = {"user_input": user_input}
-    system_prompt, user_prompt, model_params = extract_prompts(
-        prompt_file_path,
+    system_prompt, user_prompt, model_params = extract_prompt(
+        PROMPT_NAME,
         **replacements
     )
 
@@ -80,238 +66,445 @@ def interviewer(user_input, previous_response_id=None):
     print(f"User Input: {user_input[:100]}...")
     print("---" * 30)
 
-    try:
-        # Build the API call parameters for GPT-5.1 Responses API
-        api_params = {
-            "model": model_params['name'],
-            "max_output_tokens": model_params.get('max_tokens', 2048),
-            "reasoning": {
-                "effort": model_params.get('reasoning_effort', 'none')
-            },
-            "text": {
-                "verbosity": model_params.get('verbosity', 'medium')
-            }
+    # Build the API call parameters for GPT-5.1 Responses API
+    api_params = {
+        "model": model_params['name'],
+        "max_output_tokens": model_params.get('max_tokens', 2048),
+        "reasoning": {
+            "effort": model_params.get('reasoning_effort', 'none')
+        },
+        "text": {
+            "verbosity": model_params.get('verbosity', 'medium')
         }
+    }
+
+    # Only add temperature when reasoning effort is 'none'
+    if model_params.get('reasoning_effort', 'none') == 'none':
+        api_params["temperature"] = model_params.get('temperature', 0.7)
 
-        # Only add temperature when reasoning effort is 'none'
-        if model_params.get('reasoning_effort', 'none') == 'none':
-            api_params["temperature"] = model_params.get('temperature', 0.7)
-
-        if previous_response_id:
-            # Continue existing thread - pass previous_response_id for CoT continuity
-            api_params["previous_response_id"] = previous_response_id
-            api_params["input"] = [
-                {"role": "user", "content": user_prompt}
-            ]
-        else:
-            # Start new conversation with system prompt
-            api_params["input"] = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-
-        response = client.responses.create(**api_params)
-
-        # Extract response text from the GPT-5.1 response object
-        # GPT-5.1 returns output_text directly or in output items
-        response_text = ""
-        if hasattr(response, 'output_text'):
-            response_text = response.output_text
-        else:
-            # Fallback to iterating over output items
-            for item in response.output:
-                if item.type == "message":
-                    for content in item.content:
-                        if hasattr(content, 'text'):
-                            response_text += content.text
-                        elif content.type == "output_text":
-                            response_text += content.text
-
-        # Check if conversation is complete
-        is_complete = detect_completion(response_text)
-
-        # Clean the response for display
-        clean_text = clean_response(response_text)
-
-        print(f"Response ID: {response.id}")
-        print(f"Is Complete: {is_complete}")
-        print(f"Response: {clean_text[:200]}...")
-
-        return clean_text, response.id, is_complete
+    # The turn continues the previous response chain while it fits the token
+    # budget, and otherwise starts a fresh one from the summarised history
+    turn = ConversationTurn(system_prompt, user_prompt, previous_response_id)
+
+    return turn, model_params, api_params
+
+
+def interviewer(user_input, previous_response_id=None):
+    """
+    Conduct an interview turn using OpenAI's GPT-5.1 Responses API with thread continuity.
+
+    GPT-5.1 uses the Responses API which supports:
+    - previous_response_id for passing chain of thought between turns
+    - reasoning.effort parameter (none, low, medium, high)
+    - text.verbosity parameter (low, medium, high)
+
+    Args:
+        user_input: The user's message
+        previous_response_id: The history returned by the previous turn
+
+    Returns:
+        tuple: (model_response, history_id, is_complete)
+    """
+    turn, model_params, api_params = _prepare_turn(user_input, previous_response_id)
+
+    try:
+        if not turn.can_chain():
+            compact(turn, client)
+        response = client.responses.create(**api_params, **turn.responses_input())
 
     except Exception as e:
         print(f"Error calling OpenAI GPT-5.1 Responses API: {e}")
         # Fallback to Chat Completions API if Responses API fails
-        return fallback_chat_completion(system_prompt, user_prompt, model_params, previous_response_id)
+        return fallback_chat_completion(turn, model_params)
+
+    # Outside the try: a failure to record the answer must not buy a second one from the fallback
+    return _parse_response(response, turn)
 
 
-def fallback_chat_completion(system_prompt, user_prompt, model_params, conversation_history=None):
+async def interviewer_async(user_input, previous_response_id=None):
     """
-    Fallback to Chat Completions API if Responses API is not available.
-    Uses a simple conversation history stored as JSON string.
+    Asyncio variant of `interviewer` using the shared async client, so one
+    event loop can hold many in-flight turns.
+
+    Returns:
+        tuple: (model_response, history_id, is_complete)
     """
+    # Prompt file and conversation store reads block, so they run in a worker thread
+    turn, model_params, api_params = await asyncio.to_thread(
+        _prepare_turn, user_input, previous_response_id)
+
     try:
-        messages = []
+        if not turn.can_chain():
+            await compact_async(turn, get_async_openai_client())
+        response = await get_async_openai_client().responses.create(**api_params, **turn.responses_input())
 
-        if conversation_history:
-            try:
-                # Try to parse conversation history from JSON
-                history = json.loads(conversation_history)
-                messages = history
-            except (json.JSONDecodeError, TypeError):
-                # If not valid JSON, start fresh with system prompt
-                messages = [{"role": "system", "content": system_prompt}]
-        else:
-            messages = [{"role": "system", "content": system_prompt}]
+    except Exception as e:
+        print(f"Error calling OpenAI GPT-5.1 Responses API: {e}")
+        # Fallback to Chat Completions API if Responses API fails
+        return await fallback_chat_completion_async(turn, model_params)
+
+    return await asyncio.to_thread(_parse_response, response, turn)
+
+
+def _chain_tokens(usage):
+    """Size of the response chain after a response, from its reported usage (None if absent)."""
+    input_tokens = getattr(usage, 'input_tokens', None)
+    output_tokens = getattr(usage, 'output_tokens', None)
+    if input_tokens is None or output_tokens is None:
+        return None
+    return input_tokens + output_tokens
+
+
+def _parse_response(response, turn):
+    """
+    Extracts the text of a Responses API result and records the turn.
+
+    Returns:
+        tuple: (model_response, history_id, is_complete)
+    """
+    # Extract response text from the GPT-5.1 response object
+    # GPT-5.1 returns output_text directly or in output items
+    response_text = ""
+    if hasattr(response, 'output_text'):
+        response_text = response.output_text
+    else:
+        # Fallback to iterating over output items
+        for item in response.output:
+            if item.type == "message":
+                for content in item.content:
+                    if hasattr(content, 'text'):
+                        response_text += content.text
+                    elif content.type == "output_text":
+                        response_text += content.text
+
+    # Check if conversation is complete
+    is_complete = detect_completion(response_text)
+
+    # Clean the response for display
+    clean_text = clean_response(response_text)
+
+    history_id = turn.record(response_text, response.id, _chain_tokens(getattr(response, 'usage', None)))
+
+    print(f"Response ID: {response.id}")
+    print(f"History ID: {history_id}")
+    print(f"Is Complete: {is_complete}")
+    print(f"Response: {clean_text[:200]}...")
+
+    return clean_text, history_id, is_complete
+
+
+def _marker_prefix_length(text):
+    """Length of the longest suffix of text that could start the completion marker."""
+    for size in range(min(len(text), len(COMPLETION_MARKER) - 1), 0, -1):
+        if COMPLETION_MARKER.startswith(text[-size:]):
+            return size
+    return 0
+
+
+def interviewer_stream(user_input, previous_response_id=None):
+    """
+    Streaming variant of `interviewer`.
+
+    Yields ("delta", text) for each piece of model output as it arrives, with the
+    completion marker held back and removed, then a single
+    ("done", (model_response, history_id, is_complete)).
+    """
+    turn, model_params, api_params = _prepare_turn(user_input, previous_response_id)
 
-        # Add the new user message
-        messages.append({"role": "user", "content": user_prompt})
+    response_text = ""
+    response_id = None
+    usage = None
+    pending = ""
+    streamed = False
 
-        # Use gpt-4o as fallback if gpt-5.1 responses API fails
-        fallback_model = "gpt-4o"
+    try:
+        if not turn.can_chain():
+            compact(turn, client)
+        stream = client.responses.create(stream=True, **api_params, **turn.responses_input())
+        for event in stream:
+            event_type = getattr(event, 'type', '')
+            if event_type == "response.created":
+                response_id = event.response.id
+            elif event_type == "response.output_text.delta":
+                response_text += event.delta
+                pending = (pending + event.delta).replace(COMPLETION_MARKER, "")
+                keep = _marker_prefix_length(pending)
+                chunk, pending = pending[:len(pending) - keep], pending[len(pending) - keep:]
+                if chunk:
+                    streamed = True
+                    yield "delta", chunk
+            elif event_type == "response.completed":
+                response_id = event.response.id
+                usage = getattr(event.response, 'usage', None)
+            elif event_type in ("response.failed", "error"):
+                raise RuntimeError(f"Streaming response failed: {event}")
+    except Exception as e:
+        if streamed:
+            raise
+        print(f"Error streaming OpenAI GPT-5.1 Responses API: {e}")
+        # Nothing was sent yet, so fall back to a single Chat Completions answer
+        clean_text, history_id, is_complete = fallback_chat_completion(turn, model_params)
+        if clean_text:
+            yield "delta", clean_text
+        yield "done", (clean_text, history_id, is_complete)
+        return
+
+    pending = pending.replace(COMPLETION_MARKER, "")
+    if pending:
+        yield "delta", pending
+
+    is_complete = detect_completion(response_text)
+    clean_text = clean_response(response_text)
+    history_id = turn.record(response_text, response_id, _chain_tokens(usage))
+
+    print(f"Response ID: {response_id}")
+    print(f"History ID: {history_id}")
+    print(f"Is Complete: {is_complete}")
+    print(f"Response: {clean_text[:200]}...")
+
+    yield "done", (clean_text, history_id, is_complete)
+
+
+def _fallback_result(turn, response):
+    """
+    Reads a Chat Completions answer and records the turn.
+
+    Returns:
+        tuple: (model_response, history_id, is_complete) where history_id is
+        the conversation handle to pass back as the next turn's history
+    """
+    response_text = response.choices[0].message.content.strip()
+
+    # Check if conversation is complete
+    is_complete = detect_completion(response_text)
+
+    # Clean the response for display
+    clean_text = clean_response(response_text)
+
+    # Only the new messages are written; the handle stands in for the history
+    return clean_text, turn.record(response_text), is_complete
+
+
+def fallback_chat_completion(turn, model_params):
+    """
+    Fallback to Chat Completions API if Responses API is not available.
+    Sends the windowed history (system prompt, running summary, recent turns)
+    of the stored conversation; turns carry only its handle.
+    """
+    try:
+        compact(turn, client)
 
         response = client.chat.completions.create(
-            model=fallback_model,
-            messages=messages,
+            model=FALLBACK_MODEL,
+            messages=turn.window(),
             temperature=model_params.get('temperature', 0.7),
             max_tokens=model_params.get('max_tokens', 2048)
         )
 
-        response_text = response.choices[0].message.content.strip()
+        return _fallback_result(turn, response)
 
-        # Check if conversation is complete
-        is_complete = detect_completion(response_text)
+    except Exception as e:
+        print(f"Error in fallback chat completion: {e}")
+        raise
 
-        # Clean the response for display
-        clean_text = clean_response(response_text)
 
-        # Add assistant response to history for next turn
-        messages.append({"role": "assistant", "content": response_text})
+async def fallback_chat_completion_async(turn, model_params):
+    """Asyncio variant of `fallback_chat_completion`."""
+    try:
+        await compact_async(turn, get_async_openai_client())
 
-        # Use JSON-encoded history as the "response_id" for fallback
-        history_id = json.dumps(messages)
+        response = await get_async_openai_client().chat.completions.create(
+            model=FALLBACK_MODEL,
+            messages=turn.window(),
+            temperature=model_params.get('temperature', 0.7),
+            max_tokens=model_params.get('max_tokens', 2048)
+        )
 
-        return clean_text, history_id, is_complete
+        return await asyncio.to_thread(_fallback_result, turn, response)
 
     except Exception as e:
         print(f"Error in fallback chat completion: {e}")
         raise
 
 
-def base_agent(payload):
-    """
-    Main agent function implementing the Daiquiri pattern for multi-turn conversations.
+def _start_turn(payload):
+    """Reads the turn inputs from the payload and reports the job as in progress."""
+    print(payload)
 
-    Inputs expected:
-        - userInput: The user's message (required)
-        - history: The previous response ID or conversation history (optional)
-        - output: The previous agent response (optional, for context)
+    # Check environment mode
+    mode = get_environment_mode()
+    print(f"Running in {mode} mode")
 
-    Returns:
-        tuple: (resp, model_response, response_id, is_complete, summary)
-    """
-    try:
-        print(payload)
-
-        # Check environment mode
-        mode = get_environment_mode()
-        print(f"Running in {mode} mode")
-
-        # Get agent configuration
-        agent_config_doc = fetch_agent_config()
-        print(f"Agent config: {agent_config_doc}")
-        agent_name = agent_config_doc.get('name', 'Client Discovery Interview')
-
-        # Generate request ID
-        request_id = payload.get(
-            'request_id', f"req-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
-        print(f"Request ID: {request_id}")
-
-        # Extract inputs
-        user_input = payload.get('userInput', '')
-        previous_response_id = payload.get('history')  # Thread ID from previous turn
-        previous_output = payload.get('output', '')  # Previous response (for reference)
-
-        # Handle empty or initial user input
-        if not user_input or user_input.strip() == '':
-            # If no user input, this is the start - use a greeting trigger
-            user_input = "Hello, I'd like to start the discovery conversation."
-
-        call_webhook_with_success(
-            payload.get('id'), {
-                "status": "inprogress",
-                "data": {
-                    "title": "Processing your message",
-                    "info": "Conducting discovery interview...",
-                },
-            })
+    # Get agent configuration
+    agent_config_doc = fetch_agent_config()
+    print(f"Agent config: {agent_config_doc}")
 
-        # Call the interviewer using GPT-5.1
-        model_response, response_id, is_complete = interviewer(
-            user_input,
-            previous_response_id
-        )
+    # Generate request ID
+    request_id = payload.get(
+        'request_id', f"req-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    print(f"Request ID: {request_id}")
 
-        # Generate summary if conversation is complete
-        summary = None
-        if is_complete:
-            # The summary should be included in the model_response since we instructed
-            # the model to provide a closing summary
-            summary = model_response
+    # Extract inputs
+    user_input = payload.get('userInput', '')
+    previous_response_id = payload.get('history')  # Thread ID from previous turn
 
-        # Send outputs via webhook
-        call_webhook_with_success(payload.get('id'), {
+    # Handle empty or initial user input
+    if not user_input or user_input.strip() == '':
+        # If no user input, this is the start - use a greeting trigger
+        user_input = "Hello, I'd like to start the discovery conversation."
+
+    call_webhook_with_success(
+        payload.get('id'), {
             "status": "inprogress",
             "data": {
-                "output": {
-                    "name": "output",
-                    "type": "longText",
-                    "data": model_response
-                }
-            }
+                "title": "Processing your message",
+                "info": "Conducting discovery interview...",
+            },
         })
 
+    return user_input, previous_response_id
+
+
+def _finish_turn(payload, model_response, response_id, is_complete):
+    """
+    Sends the turn outputs via webhook.
+
+    Returns:
+        tuple: (resp, model_response, response_id, is_complete, summary)
+    """
+    # Generate summary if conversation is complete
+    summary = None
+    if is_complete:
+        # The summary should be included in the model_response since we instructed
+        # the model to provide a closing summary
+        summary = model_response
+
+    # Send outputs via webhook
+    call_webhook_with_success(payload.get('id'), {
+        "status": "inprogress",
+        "data": {
+            "output": {
+                "name": "output",
+                "type": "longText",
+                "data": model_response
+            }
+        }
+    })
+
+    call_webhook_with_success(payload.get('id'), {
+        "status": "inprogress",
+        "data": {
+            "output": {
+                "name": "history",
+                "type": "longText",
+                "data": response_id
+            }
+        }
+    })
+
+    if is_complete:
         call_webhook_with_success(payload.get('id'), {
             "status": "inprogress",
             "data": {
                 "output": {
-                    "name": "history",
-                    "type": "longText",
-                    "data": response_id
+                    "name": "isComplete",
+                    "type": "boolean",
+                    "data": True
                 }
             }
         })
 
-        if is_complete:
+        if summary:
             call_webhook_with_success(payload.get('id'), {
                 "status": "inprogress",
                 "data": {
                     "output": {
-                        "name": "isComplete",
-                        "type": "boolean",
-                        "data": True
+                        "name": "summary",
+                        "type": "longText",
+                        "data": summary
                     }
                 }
             })
 
-            if summary:
-                call_webhook_with_success(payload.get('id'), {
-                    "status": "inprogress",
-                    "data": {
-                        "output": {
-                            "name": "summary",
-                            "type": "longText",
-                            "data": summary
-                        }
-                    }
-                })
+    # Prepare response
+    resp = {"name": "output", "type": "longText", "data": model_response}
+
+    return resp, model_response, response_id, is_complete, summary
+
 
-        # Prepare response
-        resp = {"name": "output", "type": "longText", "data": model_response}
+def base_agent(payload):
+    """
+    Main agent function implementing the Daiquiri pattern for multi-turn conversations.
+
+    Inputs expected:
+        - userInput: The user's message (required)
+        - history: The previous response ID or conversation history (optional)
+        - output: The previous agent response (optional, for context)
 
-        return resp, model_response, response_id, is_complete, summary
+    Returns:
+        tuple: (resp, model_response, response_id, is_complete, summary)
+    """
+    try:
+        user_input, previous_response_id = _start_turn(payload)
+
+        # Call the interviewer using GPT-5.1
+        model_response, response_id, is_complete = interviewer(
+            user_input,
+            previous_response_id
+        )
+
+        return _finish_turn(payload, model_response, response_id, is_complete)
 
     except Exception as e:
         print(f"Error in base_agent: {e}")
         call_webhook_with_error(payload.get('id'), str(e), 500)
         raise
+
+
+def base_agent_stream(payload):
+    """
+    Streaming variant of `base_agent`.
+
+    Yields ("delta", text) while the model answers, then
+    ("done", (resp, model_response, response_id, is_complete, summary)).
+    Webhooks are sent exactly as in `base_agent`.
+    """
+    try:
+        user_input, previous_response_id = _start_turn(payload)
+
+        for kind, value in interviewer_stream(user_input, previous_response_id):
+            if kind == "delta":
+                yield kind, value
+            else:
+                model_response, response_id, is_complete = value
+                yield "done", _finish_turn(payload, model_response, response_id, is_complete)
+
+    except Exception as e:
+        print(f"Error in base_agent_stream: {e}")
+        call_webhook_with_error(payload.get('id'), str(e), 500)
+        raise
+
+
+async def base_agent_async(payload):
+    """
+    Asyncio variant of `base_agent`. The model call runs on the event loop;
+    webhook and status updates still block, so they run in worker threads.
+
+    Returns:
+        tuple: (resp, model_response, response_id, is_complete, summary)
+    """
+    try:
+        user_input, previous_response_id = await asyncio.to_thread(_start_turn, payload)
+
+        model_response, response_id, is_complete = await interviewer_async(
+            user_input,
+            previous_response_id
+        )
+
+        return await asyncio.to_thread(
+            _finish_turn, payload, model_response, response_id, is_complete)
+
+    except Exception as e:
+        print(f"Error in base_agent_async: {e}")
+        await asyncio.to_thread(call_webhook_with_error, payload.get('id'), str(e), 500)
+        raise
@@ -1,39 +1,30 @@
 # from ..utils.temp_db import temp_data
 from ..config.logger import Logger
 from ..utils.webhook import call_webhook_with_error, call_webhook_with_success
-from openai import OpenAI
+from .openai_client import get_openai_client
 import os
 import json
 import yaml
-from .prompt_extract import extract_prompts
-from .get_prompt_from_git import main as promptDownloader
+from .prompt_registry import extract_prompt, get_prompt_registry, register_prompt
 
 logger = Logger()
 
 # Configuration flag - Change this to switch between dev and prod modes
 ENVIRONMENT_MODE = "dev"  # Change to "prod" for production or dev for development
 
-openai_api_key = os.environ.get("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_openai_client()
 
 def get_environment_mode():
     """Get the current environment mode (dev or prod)"""
     return ENVIRONMENT_MODE.lower()
 
+# Loaded at import and kept fresh by the prompt refresher; turns never touch the disk
+PROMPT_NAME = register_prompt('GimletGPT.yaml', get_environment_mode())
+
+
 def get_prompt_file_path():
-    """Get the appropriate prompt file path based on environment mode"""
-    mode = get_environment_mode()
-    
-    if mode == "dev":
-        # In dev mode, try /tmp/Prompt first, fallback to Prompt
-        tmp_prompt_path = '/tmp/Prompt/GimletGPT.yaml'
-        if os.path.exists(tmp_prompt_path):
-            return tmp_prompt_path
-        else:
-            return 'Prompt/GimletGPT.yaml'
-    else:
-        # In prod mode, only use Prompt folder
-        return 'Prompt/GimletGPT.yaml'
+    """Get the prompt file path the prompt registry loaded, based on environment mode"""
+    return get_prompt_registry().get(PROMPT_NAME).path
 
 
 
@@ -54,7 +45,7 @@ def interviewer(user_input, conversation="", previous_response_id=None):
     if previous_response_id:
         # For continuing conversations, we only need the user prompt
         # Extract just the user prompt with the replacements
-        _, user_prompt, model_params = extract_prompts(prompt_file_path, **replacements)
+        _, user_prompt, model_params = extract_prompt(PROMPT_NAME, **replacements)
 
         # Continue existing conversation using just the response ID
         response = client.responses.create(
@@ -78,7 +69,7 @@ def interviewer(user_input, conversation="", previous_response_id=None):
             previous_response_id=previous_response_id)
     else:
         # For new conversations, extract both system and user prompts
-        system_prompt, user_prompt, model_params = extract_prompts(prompt_file_path,
+        system_prompt, user_prompt, model_params = extract_prompt(PROMPT_NAME,
                                                      **replacements)
 
         # Start a new conversation with both system and user prompts
@@ -1,12 +1,11 @@
 # from ..utils.temp_db import temp_data
 from ..config.logger import Logger
 from ..utils.webhook import call_webhook_with_error, call_webhook_with_success
-from openai import OpenAI
+from .openai_client import get_openai_client
 import openai
-from .prompt_extract import extract_prompts
+from .prompt_registry import extract_prompt, get_prompt_registry, register_prompt
 import os
 from datetime import datetime
-from .get_prompt_from_git import main as promptDownloader
 import json
 from .agent_config import fetch_agent_config
 
@@ -14,27 +13,19 @@ from .agent_config import fetch_agent_config
 # Configuration flag - Change this to switch between dev and prod modes
 ENVIRONMENT_MODE = "dev"  # Change to "prod" for production or dev for development
 
-openai_api_key = os.environ.get("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_openai_client()
 
 def get_environment_mode():
     """Get the current environment mode (dev or prod)"""
     return ENVIRONMENT_MODE.lower()
 
+# Loaded at import and kept fresh by the prompt refresher; turns never touch the disk
+PROMPT_NAME = register_prompt('CZP_MCP_Server_Prompt.yaml', get_environment_mode())
+
+
 def get_prompt_file_path():
-    """Get the appropriate prompt file path based on environment mode"""
-    mode = get_environment_mode()
-    
-    if mode == "dev":
-        # In dev mode, try /tmp/Prompt first, fallback to Prompt
-        tmp_prompt_path = '/tmp/Prompt/CZP_MCP_Server_Prompt.yaml'
-        if os.path.exists(tmp_prompt_path):
-            return tmp_prompt_path
-        else:
-            return 'Prompt/CZP_MCP_Server_Prompt.yaml'
-    else:
-        # In prod mode, only use Prompt folder
-        return 'Prompt/CZP_MCP_Server_Prompt.yaml'
+    """Get the prompt file path the prompt registry loaded, based on environment mode"""
+    return get_prompt_registry().get(PROMPT_NAME).path
 
 
 def llm(input, instructions, thread_id=None):
@@ -70,7 +61,7 @@ def llm(input, instructions, thread_id=None):
             ]
     
     # Extract prompts
-    system_prompt, user_prompt, model_params = extract_prompts(prompt_file_path, **replacements)
+    system_prompt, user_prompt, model_params = extract_prompt(PROMPT_NAME, **replacements)
     print(system_prompt)
     print(user_prompt)
 
@@ -172,12 +163,8 @@ def base_agent(payload):
         mode = get_environment_mode()
         print(f"Running in {mode} mode")
         
-        # Download the latest prompt files only in dev mode
-        if mode == "dev":
-            print("Dev mode: Downloading latest prompt files")
-            promptDownloader()
-        else:
-            print("Prod mode: Skipping prompt download")
+        # Prompt files are downloaded and reloaded by the background prompt
+        # refresher (PROMPT_DOWNLOAD_ENABLED), never on the request path
                                 
         instructions = payload.get("instructions")
         content = payload.get("payload", " ")
@@ -0,0 +1,236 @@
+import json
+import os
+from typing import List, Optional, Tuple
+
+from .conversation_store import get_conversation_store, is_conversation_handle
+
+# Stored summaries carry this key: the index of the first message they do not cover
+SUMMARY_KEY = "summary_of"
+
+SUMMARY_INSTRUCTIONS = (
+    "You are compacting the transcript of a client discovery interview. "
+    "Write a concise summary that keeps every fact, requirement, constraint, decision "
+    "and open question the client has stated, and which topics and phases are already "
+    "covered, so the interviewer can continue without the full transcript. "
+    "Do not add anything that was not said."
+)
+
+
+def token_budget() -> int:
+    """Estimated input tokens a turn may send before older exchanges are compacted."""
+    return int(os.getenv('CONTEXT_TOKEN_BUDGET', 16000))
+
+
+def keep_messages() -> int:
+    """Most recent messages always sent verbatim, never folded into the summary."""
+    return int(os.getenv('CONTEXT_KEEP_MESSAGES', 6))
+
+
+def summary_model() -> str:
+    return os.getenv('CONTEXT_SUMMARY_MODEL', 'gpt-4o-mini')
+
+
+def estimate_tokens(messages: List[dict]) -> int:
+    """Rough token count (~4 characters per token plus per-message overhead); no tokenizer needed."""
+    return sum(len(str(message.get("content", ""))) // 4 + 4 for message in messages)
+
+
+def _summary_start(messages: List[dict]) -> Tuple[Optional[dict], int]:
+    """The latest running summary and the index of the first message it does not cover."""
+    for message in reversed(messages):
+        if SUMMARY_KEY in message:
+            return message, message[SUMMARY_KEY]
+    # Conversations stored before the system prompt was left out start with it
+    return None, 1 if messages and messages[0].get("role") == "system" else 0
+
+
+def context_messages(messages: List[dict], system_prompt: str) -> List[dict]:
+    """
+    The part of a stored conversation sent to the model: the current system
+    prompt, the latest running summary, and every message after the point it
+    summarises.
+    """
+    summary, start = _summary_start(messages)
+    window = [{"role": "system", "content": system_prompt}]
+    if summary is not None:
+        window.append({"role": "system", "content": summary["content"]})
+    window.extend({"role": message["role"], "content": message["content"]}
+                  for message in messages[start:] if SUMMARY_KEY not in message)
+    return window
+
+
+class ConversationTurn:
+    """
+    One interview turn over the stored conversation.
+
+    `history` is what the previous turn returned: a conversation store handle,
+    a Responses API id from before histories were stored, or legacy JSON.
+    The turn decides whether the model can keep extending the current
+    response chain or has to start a fresh one from the system prompt, the
+    running summary and the recent messages, and records the exchange after.
+    The system prompt comes from the prompt registry on every turn, so it is
+    not stored with the conversation.
+    """
+
+    def __init__(self, system_prompt: str, user_prompt: str, history=None):
+        self.system_prompt = system_prompt
+        self.user_message = {"role": "user", "content": user_prompt}
+        self.handle = None
+        self.meta = {}
+        self.saved = 0
+
+        store = get_conversation_store()
+        if is_conversation_handle(history):
+            # One read of the head gives both the new messages and the chain state
+            self.handle = history
+            self.messages, self.meta = store.load_with_meta(history)
+            self.saved = len(self.messages)
+        elif isinstance(history, str) and history.startswith("resp_"):
+            # Chain started before turns were stored: keep extending it, and
+            # keep the transcript from this turn on
+            self.messages = []
+            self.meta = {"response_id": history, "chain_tokens": 0}
+        elif history:
+            try:
+                self.messages = json.loads(history)
+            except (json.JSONDecodeError, TypeError):
+                self.messages = []
+            # Legacy histories carry the system prompt of their day; the current one is sent instead
+            if self.messages and self.messages[0].get("role") == "system":
+                self.messages = self.messages[1:]
+        else:
+            self.messages = []
+
+        # Messages not in the store yet (migrated legacy history)
+        self.new_messages = self.messages[self.saved:]
+
+    # Building the request
+
+    def window(self) -> List[dict]:
+        """Messages for a fresh chain: system prompt, summary, recent turns and the new user message."""
+        return context_messages(self.messages, self.system_prompt) + [self.user_message]
+
+    def can_chain(self) -> bool:
+        """Whether the previous response chain still fits the budget with this turn added."""
+        response_id = self.meta.get("response_id")
+        if not response_id:
+            return False
+        tokens = int(self.meta.get("chain_tokens") or 0) + estimate_tokens([self.user_message])
+        return tokens <= token_budget()
+
+    def responses_input(self) -> dict:
+        """`previous_response_id` and `input` for a Responses API call."""
+        if self.can_chain():
+            return {"previous_response_id": self.meta["response_id"], "input": [self.user_message]}
+        return {"input": self.window()}
+
+    # Compaction
+
+    def needs_compaction(self) -> bool:
+        return estimate_tokens(self.window()) > token_budget() and self._cut() is not None
+
+    def _cut(self) -> Optional[int]:
+        """Index of the first message kept verbatim, or None when there is nothing to fold."""
+        _, start = _summary_start(self.messages)
+        turns = [i for i, message in enumerate(self.messages)
+                 if i >= start and SUMMARY_KEY not in message]
+        if len(turns) <= keep_messages():
+            return None
+        cut = turns[-keep_messages()] if keep_messages() else len(self.messages)
+        # Keep whole exchanges: the verbatim part starts at a user message
+        while cut < len(self.messages) and self.messages[cut].get("role") != "user":
+            cut += 1
+        return cut if cut > start else None
+
+    def summary_request(self) -> Optional[Tuple[List[dict], int]]:
+        """Chat messages asking for the new running summary, and the cut they cover up to."""
+        cut = self._cut()
+        if cut is None:
+            return None
+        summary, start = _summary_start(self.messages)
+        lines = []
+        if summary is not None:
+            lines.append(summary["content"])
+        lines.extend(f"{message['role']}: {message['content']}"
+                     for message in self.messages[start:cut] if SUMMARY_KEY not in message)
+        return [
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": "\n\n".join(lines)},
+        ], cut
+
+    def apply_summary(self, text: str, cut: int):
+        summary = {"role": "system", "content": f"Summary of the interview so far:\n{text}", SUMMARY_KEY: cut}
+        self.messages.append(summary)
+        self.new_messages.append(summary)
+        # The old chain still holds the folded messages; start a fresh one
+        self.meta = {}
+        print(f"Compacted conversation {self.handle} up to message {cut}")
+
+    # Recording
+
+    def record(self, assistant_text: str, response_id: Optional[str] = None,
+               chain_tokens: Optional[int] = None) -> str:
+        """
+        Stores this turn's messages and the response chain they now belong to.
+
+        Returns:
+            str: the conversation handle to pass back as the next turn's history
+        """
+        assistant = {"role": "assistant", "content": assistant_text}
+        chained = self.can_chain()
+        if response_id and chain_tokens is None:
+            sent = [self.user_message] if chained else self.window()
+            chain_tokens = estimate_tokens(sent + [assistant])
+            if chained:
+                chain_tokens += int(self.meta.get("chain_tokens") or 0)
+        self.messages.extend([self.user_message, assistant])
+        self.new_messages.extend([self.user_message, assistant])
+
+        # A fallback answer is not part of any chain, so the next turn starts a fresh one
+        meta = {"response_id": response_id, "chain_tokens": chain_tokens} if response_id else {}
+
+        # The messages and the chain state go to the store in a single write
+        store = get_conversation_store()
+        if self.handle is None:
+            self.handle = store.create(self.new_messages, meta)
+        else:
+            store.append(self.handle, self.new_messages, start=self.saved, meta=meta)
+        self.saved = len(self.messages)
+        self.new_messages = []
+        self.meta = meta
+        return self.handle
+
+
+def _summary_params(request: List[dict]) -> dict:
+    return {"model": summary_model(), "messages": request, "temperature": 0.2, "max_tokens": 1024}
+
+
+def compact(turn: ConversationTurn, client) -> bool:
+    """
+    Folds the older messages of an over-budget conversation into its running
+    summary. A failed summary call is logged and the full window is sent instead.
+    """
+    if not turn.needs_compaction():
+        return False
+    request, cut = turn.summary_request()
+    try:
+        response = client.chat.completions.create(**_summary_params(request))
+    except Exception as e:
+        print(f"Error compacting conversation {turn.handle}: {e}")
+        return False
+    turn.apply_summary(response.choices[0].message.content.strip(), cut)
+    return True
+
+
+async def compact_async(turn: ConversationTurn, client) -> bool:
+    """Asyncio variant of `compact`."""
+    if not turn.needs_compaction():
+        return False
+    request, cut = turn.summary_request()
+    try:
+        response = await client.chat.completions.create(**_summary_params(request))
+    except Exception as e:
+        print(f"Error compacting conversation {turn.handle}: {e}")
+        return False
+    turn.apply_summary(response.choices[0].message.content.strip(), cut)
+    return True
@@ -0,0 +1,347 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Handles look like "conv_<32 hex>", so they never collide with Responses API
+# ids ("resp_...") or the JSON history strings older turns carried.
+HANDLE_PREFIX = "conv_"
+
+
+def is_conversation_handle(value) -> bool:
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX) and len(value) == len(HANDLE_PREFIX) + 32
+
+
+def new_conversation_handle() -> str:
+    return HANDLE_PREFIX + uuid.uuid4().hex
+
+
+class ConversationStore(ABC):
+    """
+    Append-only message history of interview conversations, addressed by a
+    compact handle.
+
+    Each turn's messages are appended as separate records and never
+    rewritten. Histories already read by this process are kept in a small
+    LRU, so a turn only fetches the records appended since it last looked.
+    """
+
+    name = 'base'
+
+    def __init__(self, cache_size: int = 256):
+        self._cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    # Backends implement these
+
+    @abstractmethod
+    def _read_from(self, handle: str, start: int) -> Tuple[List[dict], dict]:
+        """Messages of the conversation from index `start` on, and its current meta."""
+
+    @abstractmethod
+    def _write(self, handle: str, start: int, messages: List[dict], meta: Optional[dict] = None) -> int:
+        """
+        Append messages, the first of which is meant to go at index `start`,
+        and replace the meta unless it is None. Returns the index they were
+        written at, which is later if another writer appended first.
+        """
+
+    def load(self, handle: str) -> List[dict]:
+        """Full message list of the conversation, reading only records not seen yet."""
+        return self.load_with_meta(handle)[0]
+
+    def load_with_meta(self, handle: str) -> Tuple[List[dict], dict]:
+        """
+        Full message list of the conversation and its meta: small mutable state
+        kept next to the history (e.g. the current response chain).
+        """
+        with self._lock:
+            cached = list(self._cache.get(handle, []))
+        messages, meta = self._read_from(handle, len(cached))
+        cached.extend(messages)
+        self._remember(handle, cached)
+        return list(cached), meta
+
+    def append(self, handle: str, messages: List[dict], start: Optional[int] = None,
+               meta: Optional[dict] = None):
+        """
+        Append messages to the conversation, and replace its meta unless it is
+        None. `start` is the number of messages the caller loaded; when
+        omitted the current length is looked up.
+        """
+        if not messages:
+            return
+        if start is None:
+            start = len(self.load(handle))
+        start = self._write(handle, start, messages, meta)
+        with self._lock:
+            cached = self._cache.get(handle)
+            if cached is not None and len(cached) == start:
+                cached.extend(messages)
+
+    def create(self, messages: List[dict], meta: Optional[dict] = None) -> str:
+        handle = new_conversation_handle()
+        self._write(handle, 0, messages, meta)
+        self._remember(handle, list(messages))
+        return handle
+
+    def _remember(self, handle: str, messages: List[dict]):
+        with self._lock:
+            self._cache[handle] = messages
+            self._cache.move_to_end(handle)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+
+class LocalConversationStore(ConversationStore):
+    """One JSON-lines file per conversation under a directory; for tests and single-node runs."""
+
+    name = 'local'
+
+    def __init__(self, root: str, cache_size: int = 256):
+        super().__init__(cache_size)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.root, f"{handle}.jsonl")
+
+    def _meta_path(self, handle: str) -> str:
+        return os.path.join(self.root, f"{handle}.meta.json")
+
+    def _read_from(self, handle, start):
+        try:
+            with open(self._path(handle), encoding='utf-8') as f:
+                messages = [json.loads(line) for i, line in enumerate(f) if i >= start and line.strip()]
+        except FileNotFoundError:
+            messages = []
+        try:
+            with open(self._meta_path(handle), encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {}
+        return messages, meta
+
+    def _write(self, handle, start, messages, meta=None):
+        lines = ''.join(json.dumps(message) + '\n' for message in messages)
+        # One O_APPEND write per turn keeps concurrent appends from interleaving
+        with open(self._path(handle), 'a', encoding='utf-8') as f:
+            f.write(lines)
+        if meta is not None:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._meta_path(handle))
+        return start
+
+
+class DynamoDBConversationStore(ConversationStore):
+    """
+    Conversations in the shared jobs table: a head record holding the message
+    count and the meta, and one record per message keyed "conv#<handle>#<index>".
+
+    An append writes its message records and moves the head in one
+    transaction, conditional on the records being new and the head still
+    being at the append's start, so concurrent turns never overwrite each
+    other's messages or leave records the head doesn't count.
+
+    The head expires `retention_seconds` after the last write. Message
+    records are written to live twice as long, and the head tracks the
+    earliest of their expiries in "messages_expire_at"; once that comes
+    within one retention period, the next append pushes every record forward
+    again. Messages therefore always outlive the head, at the cost of one
+    re-put of the history per retention period.
+    """
+
+    name = 'dynamodb'
+    # TransactWriteItems takes at most 100 items: the messages plus the head
+    TRANSACTION_MESSAGES = 99
+    WRITE_ATTEMPTS = 5
+
+    def __init__(self, retention_seconds: int, cache_size: int = 256):
+        super().__init__(cache_size)
+        self.retention_seconds = retention_seconds
+        # messages_expire_at of the heads this process has read or written
+        self._expiries: "OrderedDict[str, int]" = OrderedDict()
+
+    def _table(self):
+        from ..utils.temp_db import get_table
+        return get_table()
+
+    def _read_from(self, handle, start):
+        head = self._table().get_item(Key={"id": f"conv#{handle}"}).get("Item") or {}
+        count = int(head.get("count", 0))
+        meta = json.loads(head.get("meta", "{}"))
+        # Heads written before message expiries were tracked read as due
+        self._remember_expiry(handle, int(head.get("messages_expire_at", 0)))
+        ids = [f"conv#{handle}#{i}" for i in range(start, count)]
+        found: Dict[str, dict] = {}
+        client = self._table().meta.client
+        table_name = self._table().name
+        for offset in range(0, len(ids), 100):
+            request = {table_name: {"Keys": [{"id": item_id} for item_id in ids[offset:offset + 100]]}}
+            while request:
+                response = client.batch_get_item(RequestItems=request)
+                for item in response.get("Responses", {}).get(table_name, []):
+                    found[item["id"]] = json.loads(item["message"])
+                request = response.get("UnprocessedKeys") or {}
+        # Records and head are written together, so a gap is a record that expired
+        messages = []
+        for item_id in ids:
+            if item_id not in found:
+                print(f"Conversation {handle} is missing {item_id}; history truncated to {start + len(messages)} messages")
+                break
+            messages.append(found[item_id])
+        return messages, meta
+
+    def _write(self, handle, start, messages, meta=None):
+        from botocore.exceptions import ClientError
+        for attempt in range(self.WRITE_ATTEMPTS):
+            try:
+                for offset in range(0, len(messages), self.TRANSACTION_MESSAGES):
+                    last = offset + self.TRANSACTION_MESSAGES >= len(messages)
+                    self._write_chunk(handle, start + offset, messages[offset:offset + self.TRANSACTION_MESSAGES],
+                                      meta if last else None)
+                if start == 0:
+                    self._remember_expiry(handle, self._messages_expiry())
+                else:
+                    self._extend_if_due(handle, start)
+                return start
+            except ClientError as e:
+                # Only single-transaction appends can be moved; longer writes are to new conversations
+                if (not _is_write_conflict(e) or attempt == self.WRITE_ATTEMPTS - 1
+                        or len(messages) > self.TRANSACTION_MESSAGES):
+                    raise
+            # Another turn appended at this index first; append after it instead
+            start = self._count(handle)
+        return start
+
+    def _messages_expiry(self) -> int:
+        return int(time.time()) + 2 * self.retention_seconds
+
+    def _message_item(self, handle, index, message, expires_at) -> dict:
+        return {
+            "id": f"conv#{handle}#{index}",
+            "record_type": "conversation_turn",
+            "message": json.dumps(message),
+            "expires_at": expires_at,
+        }
+
+    def _write_chunk(self, handle, start, messages, meta=None):
+        table = self._table()
+        expires_at = int(time.time()) + self.retention_seconds
+        messages_expire_at = self._messages_expiry()
+        items = [{"Put": {
+            "TableName": table.name,
+            "Item": self._message_item(handle, i, message, messages_expire_at),
+            "ConditionExpression": "attribute_not_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+        }} for i, message in enumerate(messages, start)]
+        head = {
+            "TableName": table.name,
+            "Key": {"id": f"conv#{handle}"},
+            "UpdateExpression": "SET #record_type = :record_type, #expires_at = :expires_at, #count = :count",
+            "ConditionExpression": "attribute_not_exists(#count) OR #count = :start",
+            "ExpressionAttributeNames": {"#record_type": "record_type", "#expires_at": "expires_at", "#count": "count"},
+            "ExpressionAttributeValues": {
+                ":record_type": "conversation",
+                ":expires_at": expires_at,
+                ":count": start + len(messages),
+                ":start": start,
+            },
+        }
+        if start == 0:
+            # Later appends leave it alone; it only moves once every record has been extended
+            head["UpdateExpression"] += ", #messages_expire_at = :messages_expire_at"
+            head["ExpressionAttributeNames"]["#messages_expire_at"] = "messages_expire_at"
+            head["ExpressionAttributeValues"][":messages_expire_at"] = messages_expire_at
+        if meta is not None:
+            head["UpdateExpression"] += ", #meta = :meta"
+            head["ExpressionAttributeNames"]["#meta"] = "meta"
+            head["ExpressionAttributeValues"][":meta"] = json.dumps(meta)
+        items.append({"Update": head})
+        table.meta.client.transact_write_items(TransactItems=items)
+
+    def _extend_if_due(self, handle, count):
+        """Re-puts the first `count` message records with a later expiry once they are within a retention period."""
+        with self._lock:
+            known = self._expiries.get(handle)
+        if known is not None and known >= int(time.time()) + self.retention_seconds:
+            return
+        try:
+            history = self.load(handle)[:count]
+            messages_expire_at = self._messages_expiry()
+            table = self._table()
+            # Messages are never rewritten, so putting them again only moves their expiry
+            with table.batch_writer() as batch:
+                for i, message in enumerate(history):
+                    batch.put_item(Item=self._message_item(handle, i, message, messages_expire_at))
+            table.update_item(
+                Key={"id": f"conv#{handle}"},
+                UpdateExpression="SET #messages_expire_at = :messages_expire_at",
+                ExpressionAttributeNames={"#messages_expire_at": "messages_expire_at"},
+                ExpressionAttributeValues={":messages_expire_at": messages_expire_at},
+            )
+            self._remember_expiry(handle, messages_expire_at)
+        except Exception as e:
+            # The turn itself is stored; the next append tries again
+            print(f"Error extending expiry of conversation {handle}: {e}")
+
+    def _remember_expiry(self, handle, messages_expire_at):
+        with self._lock:
+            self._expiries[handle] = messages_expire_at
+            self._expiries.move_to_end(handle)
+            while len(self._expiries) > self._cache_size:
+                self._expiries.popitem(last=False)
+
+    def _count(self, handle) -> int:
+        head = self._table().get_item(
+            Key={"id": f"conv#{handle}"},
+            ProjectionExpression="#count",
+            ExpressionAttributeNames={"#count": "count"},
+            ConsistentRead=True,
+        ).get("Item")
+        return int(head.get("count", 0)) if head else 0
+
+
+def _is_write_conflict(error) -> bool:
+    """Whether a TransactWriteItems failed on one of its conditions rather than on capacity or errors."""
+    if error.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+        return False
+    reasons = error.response.get("CancellationReasons") or []
+    if reasons:
+        return any(reason.get("Code") == "ConditionalCheckFailed" for reason in reasons)
+    return "ConditionalCheckFailed" in error.response.get("Error", {}).get("Message", "")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """
+    Returns the process-wide conversation store for CONVERSATION_STORE
+    ("dynamodb" or "local"), creating it on first use. Defaults to dynamodb
+    when jobs live in DynamoDB and to local otherwise.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                default = 'dynamodb' if os.getenv('JOB_STORE_BACKEND', 'dynamodb') == 'dynamodb' else 'local'
+                backend = os.getenv('CONVERSATION_STORE', default).strip().lower()
+                if backend == 'local':
+                    root = os.getenv('CONVERSATION_DIR', os.path.join(tempfile.gettempdir(), 'agent-conversations'))
+                    _store = LocalConversationStore(root)
+                elif backend == 'dynamodb':
+                    retention = int(os.getenv('CONVERSATION_RETENTION_SECONDS', 7 * 24 * 60 * 60))
+                    _store = DynamoDBConversationStore(retention)
+                else:
+                    raise ValueError(f"Unknown CONVERSATION_STORE: {backend}")
+    return _store
@@ -1,8 +1,14 @@
+import hashlib
+import json
 import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 import yaml
-import time
-import sys  # To allow for graceful exit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # GitHub repository details
 repo_owner = 'Activate-Intelligence'
@@ -20,38 +26,56 @@ save_directory = "/tmp/Prompt"
 max_retries = 5
 initial_delay = 2  # Seconds between retries, increases with each retry
 
-# Function to create directory if it doesn't exist
-def create_save_directory(directory):
-  try:
-    if not os.path.exists(directory):
-      os.makedirs(directory)
-      print(f"Created directory: {directory}")
-    else:
-      print(f"Directory already exists: {directory}")
-  except Exception as e:
-    print(f"Error creating directory: {e}")
-    sys.exit(1)
+# Concurrent downloads; one pooled connection per worker
+max_workers = int(os.getenv('PROMPT_DOWNLOAD_WORKERS', 16))
+request_timeout = 10
+
+# Content cache (under save_directory/.cache): downloaded bodies stored by sha256,
+# plus the ETag each file was served with
+cache_subdirectory = '.cache'
+
+_session = None
+_session_lock = threading.Lock()
+_index_lock = threading.Lock()
+
+
+# Function to get the base URL files are downloaded from; PROMPT_BASE_URL points it at a local stand-in
+def get_base_url():
+  base_url = os.getenv('PROMPT_BASE_URL')
+  if base_url:
+    return base_url.rstrip('/') + '/'
+  return f'https://raw.githubusercontent.com/{repo_owner}/{repo_name}/{branch_name}/{file_path_prefix}'
 
 # Function to get the GitHub token from environment variables
 def get_github_token():
-  try:
-    github_token = os.getenv("GH_TOKEN")
-    if not github_token:
-      raise Exception("GitHub token not found. Please set the GITHUB_TOKEN environment variable.")
-    return github_token
-  except Exception as e:
-    print(f"Error getting GitHub token: {e}")
-    sys.exit(1)
+  github_token = os.getenv("GH_TOKEN")
+  if not github_token:
+    print("GitHub token not found (GH_TOKEN); downloading without authentication.")
+  return github_token
 
 # Function to get headers for GitHub authentication
 def get_headers(token):
-  try:
-    return {
-      'Authorization': f'token {token}'
-    }
-  except Exception as e:
-    print(f"Error generating headers: {e}")
-    sys.exit(1)
+  return {'Authorization': f'token {token}'} if token else {}
+
+# Function to get the shared session; retries 429/5xx with exponential backoff inside urllib3
+def get_session():
+  global _session
+  if _session is None:
+    with _session_lock:
+      if _session is None:
+        retry = Retry(
+          total=max_retries,
+          backoff_factor=initial_delay / 2,
+          status_forcelist=(429, 500, 502, 503, 504),
+          allowed_methods=frozenset(['GET']),
+          respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _session = session
+  return _session
 
 # Function to check if YAML content is valid
 def is_valid_yaml(content):
@@ -61,60 +85,124 @@ def is_valid_yaml(content):
   except yaml.YAMLError:
     return False
 
-# Function to download a file from GitHub with retries
-def download_file(file_name, headers):
-  url = f'https://raw.githubusercontent.com/{repo_owner}/{repo_name}/{branch_name}/{file_path_prefix}{file_name}'
-  retries = 0
-  delay = initial_delay
-
-  while retries < max_retries:
-    try:
-      response = requests.get(url, headers=headers)
-
-      if response.status_code == 200:
-        # Check if the YAML is valid
-        if is_valid_yaml(response.text):
-          file_path = os.path.join(save_directory, file_name)
-          with open(file_path, 'w') as file:
-            file.write(response.text)
-          print(f"Downloaded and validated: {file_name}")
-          return  # Exit the function if download is successful
-        else:
-          print(f"Invalid online YAML for {file_name}. Retaining the local version if available.")
-          return
+def _write_atomic(path, content):
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+  with os.fdopen(fd, 'wb') as file:
+    file.write(content)
+  os.replace(tmp_path, path)
 
-      else:
-        retries += 1
-        print(f"Failed to download {file_name}. Status code: {response.status_code}. Retrying in {delay} seconds...")
-        time.sleep(delay)
-        delay *= 2  # Exponential backoff: double the delay with each retry
+def _read(path):
+  try:
+    with open(path, 'rb') as file:
+      return file.read()
+  except FileNotFoundError:
+    return None
 
-    except Exception as e:
-      print(f"Error downloading file {file_name}: {e}")
-      sys.exit(1)
+def _object_path(digest):
+  return os.path.join(save_directory, cache_subdirectory, 'objects', digest)
 
-  print(f"Max retries reached. Could not download {file_name}.")
+def _index_path():
+  return os.path.join(save_directory, cache_subdirectory, 'index.json')
 
-# Function to download all files
-def download_all_files(file_names, headers):
+def load_cache_index():
   try:
-    for file_name in file_names:
-      download_file(file_name, headers)
-    print("Process completed.")
-  except Exception as e:
-    print(f"Error downloading files: {e}")
-    sys.exit(1)
+    with open(_index_path(), 'r') as file:
+      return json.load(file)
+  except (FileNotFoundError, ValueError):
+    return {}
+
+def _cached_content(entry):
+  """Cached body of an index entry, or None if it is missing or corrupt."""
+  if not entry:
+    return None
+  content = _read(_object_path(entry['sha256']))
+  if content is None or hashlib.sha256(content).hexdigest() != entry['sha256']:
+    return None
+  return content
+
+# Function to download one file, asking only for changes since the cached version
+def download_file(file_name, headers, index=None):
+  """
+  Returns a result dict: status is "downloaded", "not_modified", "invalid"
+  (online YAML rejected, local version kept) or "failed", with the index
+  entry to record for the file when there is one.
+  """
+  url = get_base_url() + file_name
+  entry = (index or {}).get(file_name)
+  cached = _cached_content(entry)
+  request_headers = dict(headers)
+  if cached is not None and entry.get('etag'):
+    request_headers['If-None-Match'] = entry['etag']
 
-# Main function to manage the download process
-def main():
   try:
-    create_save_directory(save_directory)
-    github_token = get_github_token()
-    headers = get_headers(github_token)
-    download_all_files(file_names, headers)
-  except Exception as e:
-    print(f"Error in the main process: {e}")
-    sys.exit(1)
+    response = get_session().get(url, headers=request_headers, timeout=request_timeout)
+  except requests.RequestException as e:
+    return {'file': file_name, 'status': 'failed', 'error': str(e)}
+
+  file_path = os.path.join(save_directory, file_name)
+  if response.status_code == 304:
+    # Unchanged upstream; restore the local copy from the cache if it was lost or edited
+    if _read(file_path) != cached:
+      _write_atomic(file_path, cached)
+    return {'file': file_name, 'status': 'not_modified', 'entry': entry}
+
+  if response.status_code != 200:
+    return {'file': file_name, 'status': 'failed', 'error': f"HTTP {response.status_code}"}
+
+  # Check if the YAML is valid
+  if not is_valid_yaml(response.text):
+    return {'file': file_name, 'status': 'invalid',
+            'error': "Invalid online YAML; retaining the local version if available."}
+
+  content = response.content
+  digest = hashlib.sha256(content).hexdigest()
+  if _read(_object_path(digest)) is None:
+    _write_atomic(_object_path(digest), content)
+  _write_atomic(file_path, content)
+  entry = {'sha256': digest, 'etag': response.headers.get('ETag'), 'url': url}
+  return {'file': file_name, 'status': 'downloaded', 'entry': entry}
+
+# Function to download all files concurrently; returns one result per file
+def download_all_files(file_names, headers, on_result=None):
+  index = load_cache_index()
+  results = []
+  with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(file_names)))) as executor:
+    futures = [executor.submit(download_file, file_name, headers, index) for file_name in file_names]
+    for future in as_completed(futures):
+      try:
+        result = future.result()
+      except Exception as e:
+        result = {'file': file_names[futures.index(future)], 'status': 'failed', 'error': str(e)}
+      results.append(result)
+      if on_result is not None:
+        on_result(result)
+      else:
+        print(f"{result['file']}: {result['status']}" + (f" ({result['error']})" if result.get('error') else ""))
+
+  updated = {result['file']: result['entry'] for result in results if result.get('entry')}
+  if updated:
+    with _index_lock:
+      index = {**load_cache_index(), **updated}
+      _write_atomic(_index_path(), json.dumps(index, indent=2).encode('utf-8'))
+  return results
+
+# Main function to manage the download process
+def main(names=None, on_result=None):
+  """
+  Downloads the configured prompt files into save_directory.
+
+  Returns:
+      list: one result dict per file; download errors are reported there instead of exiting
+  """
+  os.makedirs(save_directory, exist_ok=True)
+  headers = get_headers(get_github_token())
+  results = download_all_files(list(names or file_names), headers, on_result)
+  counts = {}
+  for result in results:
+    counts[result['status']] = counts.get(result['status'], 0) + 1
+  print(f"Prompt download completed: {counts}")
+  return results
 
 # # Run the main function
 # if __name__ == "__main__":
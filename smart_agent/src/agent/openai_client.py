@@ -0,0 +1,80 @@
+import asyncio
+import os
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+
+def _timeout() -> httpx.Timeout:
+    """Per-call timeouts; the read timeout bounds the wait for model output."""
+    return httpx.Timeout(
+        connect=float(os.environ.get("OPENAI_CONNECT_TIMEOUT", 5)),
+        read=float(os.environ.get("OPENAI_READ_TIMEOUT", 120)),
+        write=float(os.environ.get("OPENAI_WRITE_TIMEOUT", 30)),
+        pool=float(os.environ.get("OPENAI_POOL_TIMEOUT", 10)),
+    )
+
+
+def _limits() -> httpx.Limits:
+    """Connection-pool limits shared by every call made through one client."""
+    return httpx.Limits(
+        max_connections=int(os.environ.get("OPENAI_MAX_CONNECTIONS", 200)),
+        max_keepalive_connections=int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 50)),
+        keepalive_expiry=float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", 60)),
+    )
+
+
+def _max_retries() -> int:
+    return int(os.environ.get("OPENAI_MAX_RETRIES", 2))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """Process-wide synchronous client with pooled keep-alive connections."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=os.environ.get("OPENAI_API_KEY"),
+                    timeout=_timeout(),
+                    max_retries=_max_retries(),
+                    http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+                )
+    return _client
+
+
+# httpx async connection pools belong to the event loop that created them,
+# so keep one async client per loop.
+_async_clients = {}
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Shared asynchronous client for the running event loop.
+
+    All coroutines on one loop share its connection pool, so the loop can hold
+    many in-flight model calls without a thread per conversation.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            timeout=_timeout(),
+            max_retries=_max_retries(),
+            http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout()),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_openai_client():
+    """Close the running loop's async client, if one was created."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
@@ -1,7 +1,38 @@
+import re
+
 import yaml
 
+_PLACEHOLDER = re.compile(r"\{\{(.*?)\}\}")
 
-def extract_prompts(file_path, **replacements):
+
+class CompiledPrompt:
+    """
+    A prompt file parsed once: the system part, the user part pre-split into
+    literal text and {{placeholder}} slots, and the model parameters.
+    """
+
+    def __init__(self, system_part, user_instructions, model_params):
+        self.system_part = system_part
+        self.model_params = model_params
+        # Odd positions are placeholder names, even positions literal text
+        self.segments = _PLACEHOLDER.split(user_instructions)
+
+    def render(self, replacements):
+        """The user part with placeholders filled in; unknown placeholders are left as written."""
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            if name in replacements:
+                value = replacements[name]
+                # Lists are joined into a comma separated string
+                parts[i] = ', '.join(map(str, value)) if isinstance(value, list) else str(value)
+            else:
+                parts[i] = "{{" + name + "}}"
+        return ''.join(parts)
+
+
+def compile_prompt(file_path):
+    """Parse a prompt file; returns None when its template has no system or user message."""
     with open(file_path, 'r') as file:
         content = yaml.safe_load(file)
 
@@ -22,15 +53,19 @@ def extract_prompts(file_path, **replacements):
         system_part = template.split('<message role="system">', 1)[1].split('</message>', 1)[0].strip()
         user_instructions = template.split('<message role="user">', 1)[1].split('</message>', 1)[0].strip()
     except IndexError:
-        return "Formatting error in the file."
+        return None
+
+    return CompiledPrompt(system_part, user_instructions, model_params)
 
-    # Replace placeholders with values from the replacements dictionary
-    for key, value in replacements.items():
-        # Check if the value is a list and convert it to a string if necessary
-        if isinstance(value, list):
-            value = ', '.join(
-                map(str, value)
-            )  # Converts list elements to string and joins them with a comma
-        user_instructions = user_instructions.replace("{{" + key + "}}", value)
 
-    return system_part, user_instructions, model_params
+def extract_prompts(file_path, **replacements):
+    """
+    Reads and renders a prompt file directly. Agents go through the prompt
+    registry instead, which keeps each prompt compiled in memory.
+    """
+    compiled = compile_prompt(file_path)
+    if compiled is None:
+        return "Formatting error in the file."
+
+    # Model parameters are copied so callers can adjust them per turn
+    return compiled.system_part, compiled.render(replacements), dict(compiled.model_params)
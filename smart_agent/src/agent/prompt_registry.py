@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+
+from .prompt_extract import compile_prompt
+
+
+def prompt_candidates(name, mode):
+    """Paths a prompt is read from, best first: in dev mode downloaded prompts in /tmp/Prompt win."""
+    if mode == "dev":
+        return ('/tmp/Prompt/' + name, 'Prompt/' + name)
+    return ('Prompt/' + name,)
+
+
+class LoadedPrompt:
+    """One compiled version of a prompt and the file it came from."""
+
+    def __init__(self, name, path, version, compiled):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.compiled = compiled
+        self.loaded_at = int(time.time())
+
+
+class PromptRegistry:
+    """
+    Compiled prompts served from memory.
+
+    Prompts are loaded when registered (at import of the agent, i.e. at
+    startup) and refreshed by a background thread, which re-checks the
+    candidate paths, compiles any changed file and swaps the new version in.
+    A file that fails to compile is logged and the previous version kept, so
+    requests never read, probe or download prompt files themselves.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._prompts = {}
+        # Last file version that failed per prompt, so a broken file is reported once
+        self._rejected = {}
+        self._lock = threading.Lock()
+        self._stats = {'refreshes': 0, 'reloads': 0, 'failures': 0, 'last_refresh_at': None}
+
+    def register(self, name, paths):
+        """Adds a prompt read from the first existing path of `paths` and loads it now."""
+        with self._lock:
+            self._sources[name] = tuple(paths)
+            self._load_missing(name)
+
+    def _load_missing(self, name):
+        if name not in self._prompts:
+            prompt = self._load(name, self._sources[name], None)
+            if prompt is not None:
+                self._prompts = {**self._prompts, name: prompt}
+
+    def get(self, name):
+        prompt = self._prompts.get(name)
+        if prompt is None:
+            # Only when the prompt has never loaded; retry here rather than fail every turn until the next refresh
+            with self._lock:
+                if name not in self._sources:
+                    raise KeyError(f"Prompt {name} is not registered")
+                self._load_missing(name)
+                prompt = self._prompts.get(name)
+            if prompt is None:
+                raise ValueError(f"Prompt {name} could not be loaded from {', '.join(self._sources[name])}")
+        return prompt
+
+    def _load(self, name, paths, current):
+        """The new version of a prompt, `current` if unchanged, or None if it failed to load."""
+        path = next((path for path in paths if os.path.exists(path)), None)
+        if path is None:
+            print(f"Prompt {name} not found in {', '.join(paths)}")
+            return current
+        version = None
+        try:
+            stat = os.stat(path)
+            version = (stat.st_mtime_ns, stat.st_size)
+            if current is not None and current.path == path and current.version == version:
+                return current
+            if self._rejected.get(name) == (path, version):
+                return current
+            compiled = compile_prompt(path)
+        except Exception as e:
+            print(f"Prompt {name} failed to load from {path}: {e}")
+            compiled = None
+        if compiled is None:
+            self._rejected[name] = (path, version)
+            self._stats['failures'] += 1
+            print(f"Prompt {name} at {path} is invalid; keeping the previous version")
+            return current
+        if current is not None:
+            self._stats['reloads'] += 1
+            print(f"Reloaded prompt {name} from {path}")
+        return LoadedPrompt(name, path, version, compiled)
+
+    def refresh(self):
+        """Reloads every registered prompt whose file changed, then swaps them in at once."""
+        with self._lock:
+            prompts = dict(self._prompts)
+            for name, paths in self._sources.items():
+                prompt = self._load(name, paths, prompts.get(name))
+                if prompt is not None:
+                    prompts[name] = prompt
+            # Readers see either the old or the new dict, never a partial update
+            self._prompts = prompts
+            self._stats['refreshes'] += 1
+            self._stats['last_refresh_at'] = int(time.time())
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'prompts': {
+                    name: {'path': prompt.path, 'loaded_at': prompt.loaded_at}
+                    for name, prompt in self._prompts.items()
+                },
+            }
+
+
+_registry = PromptRegistry()
+_stop_event = threading.Event()
+_thread = None
+
+
+def get_prompt_registry():
+    return _registry
+
+
+def register_prompt(name, mode):
+    """Registers a prompt under its mode's candidate paths; returns the name for later lookups."""
+    _registry.register(name, prompt_candidates(name, mode))
+    return name
+
+
+def extract_prompt(name, **replacements):
+    """Same result as extract_prompts, from the registry's current compiled version."""
+    compiled = _registry.get(name).compiled
+    return compiled.system_part, compiled.render(replacements), dict(compiled.model_params)
+
+
+def get_prompt_refresh_interval():
+    return float(os.getenv('PROMPT_REFRESH_SECONDS', 30))
+
+
+def _download_prompts():
+    """Fetches the latest prompt files when PROMPT_DOWNLOAD_ENABLED is set."""
+    if os.getenv('PROMPT_DOWNLOAD_ENABLED', 'false').lower() not in ('true', '1', 'yes'):
+        return
+    from .get_prompt_from_git import main as promptDownloader
+    try:
+        # Per-file failures come back as results; the previous files stay in place
+        promptDownloader()
+    except Exception as e:
+        print(f"Prompt download failed: {e!r}")
+
+
+def _run():
+    interval = get_prompt_refresh_interval()
+    print(f"Prompt refresher started (interval={interval}s)")
+    while not _stop_event.wait(interval):
+        _download_prompts()
+        _registry.refresh()
+    print("Prompt refresher stopped")
+
+
+def start_prompt_refresher():
+    """Downloads (if enabled) and refreshes the prompts once, then keeps them fresh in the background."""
+    global _thread
+    _download_prompts()
+    _registry.refresh()
+    if get_prompt_refresh_interval() <= 0:
+        print("Prompt refresher disabled")
+        return
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(target=_run, name='prompt-refresher', daemon=True)
+    _thread.start()
+
+
+def stop_prompt_refresher(timeout: float = 5.0):
+    global _thread
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout)
+        _thread = None
+
+
+def get_prompt_registry_stats():
+    """Loaded prompt versions and refresh counters."""
+    return _registry.stats()
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+MANIFEST_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), 'agent.json'))
+
+
+class Manifest:
+    """
+    The parsed agent.json with its /discover body serialised once and a strong
+    ETag over that body. The document is shared: treat it as read-only.
+    """
+
+    def __init__(self, doc, version):
+        self.doc = doc
+        self.version = version
+        # Same encoding FastAPI's JSONResponse uses, so clients see an unchanged body
+        self.body = json.dumps(doc, ensure_ascii=False, allow_nan=False, indent=None,
+                               separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+    def matches(self, if_none_match):
+        """Whether an If-None-Match header value names this version."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+        return '*' in tags or self.etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load(path):
+    version = _file_version(path)
+    with open(path, "r") as json_file:
+        return Manifest(json.load(json_file), version)
+
+
+_manifest = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _watch_interval():
+    """Seconds between checks of agent.json for changes; 0 (default) parses it once per process."""
+    return float(os.getenv('AGENT_MANIFEST_WATCH_SECONDS', 0))
+
+
+def get_manifest():
+    """
+    Returns the agent manifest, parsing agent.json on first use. With
+    AGENT_MANIFEST_WATCH_SECONDS set, the file is stat()ed at most that often
+    and reloaded when its mtime or size changed.
+    """
+    global _manifest, _checked_at
+    manifest = _manifest
+    interval = _watch_interval()
+    if manifest is not None and (interval <= 0 or time.monotonic() - _checked_at < interval):
+        return manifest
+
+    with _lock:
+        if _manifest is None:
+            _manifest = _load(MANIFEST_PATH)
+        elif interval > 0 and time.monotonic() - _checked_at >= interval:
+            try:
+                if _file_version(MANIFEST_PATH) != _manifest.version:
+                    _manifest = _load(MANIFEST_PATH)
+                    print(f"Reloaded agent manifest, ETag {_manifest.etag}")
+            except (OSError, ValueError) as e:
+                # Keep serving the last good manifest while the file is mid-edit
+                print(f"Agent manifest reload failed: {e}")
+        _checked_at = time.monotonic()
+        return _manifest
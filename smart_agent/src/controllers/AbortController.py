@@ -1,7 +1,9 @@
 import os
 import time
 
-from ..utils.temp_db import get_job, remove_job, update_job_fields
+from ..utils.job_store import get_job, remove_job, update_job_fields, release_capacity_lease
+from ..utils.job_context import get_job_context
+from ..utils.status_store import get_status_store, is_write_behind_enabled
 from ..utils.error_handling import error_handler
 from ..config.logger import Logger
 
@@ -20,22 +22,32 @@ class AbortController:
         """
         try:
             logger.info("AbortController.execution_abort() called for %s", job_id)
-            job = get_job(job_id)
+            job = get_job(job_id, projection=["status", "agent_name", "environment"])
 
             if not job:
                 return {"result": f"No running execution with id {job_id}", "status": "not_found"}
 
             # Mark as aborted immediately so capacity frees up
             try:
-                update_job_fields(job_id, {
+                # Goes through the status store so no buffered update can overwrite it
+                write_job_fields = get_status_store().write if is_write_behind_enabled() else update_job_fields
+                write_job_fields(job_id, {
                     "status": "aborted",
                     "isExecutionContinue": False,
-                    "updated_at": int(time.time())
+                    "updated_at": int(time.time()),
+                    # The job's owner as stored, so its agent_status key is written in one update
+                    **{attr: job[attr] for attr in ("agent_name", "environment") if attr in job}
                 })
             except Exception:
                 # Non-fatal; we still attempt removal
                 pass
 
+            release_capacity_lease(job_id)
+
+            context = get_job_context(job_id)
+            if context is not None:
+                context.status = "aborted"
+
             # Attempt to remove the job record (best-effort)
             removed = remove_job(job_id)
             if removed:
@@ -1,5 +1,5 @@
-import os
-import json
+from fastapi import Response
+from ..config.manifest import get_manifest
 from ..utils.error_handling import error_handler
 from ..config.logger import Logger
 
@@ -24,16 +24,31 @@ class DiscoverController:
         """
         try:
             logger.info("DiscoverController.documentation() method called")
-            doc = {}
-            current_directory = os.path.dirname(__file__)
-            file_path = os.path.normpath(
-                os.path.join(current_directory, '../config/agent.json'))
+            return get_manifest().doc
+        except Exception as e:
+            logger.error(
+                'Getting Error in DiscoverController.documentation:', e)
+            raise error_handler(e, 500)
 
-            with open(file_path, "r") as json_file:
-                doc = json.load(json_file)
+    @classmethod
+    def documentation_response(cls, if_none_match=None):
+        """
+        Serves the API documentation from its pre-serialised body.
 
-            return doc
+        Args:
+            if_none_match (str): The request's If-None-Match header, if any.
+
+        Returns:
+            Response: 304 with no body when the client's ETag is current,
+            otherwise the documentation with its ETag.
+        """
+        try:
+            manifest = get_manifest()
+            headers = {"ETag": manifest.etag, "Cache-Control": "no-cache"}
+            if manifest.matches(if_none_match):
+                return Response(status_code=304, headers=headers)
+            return Response(content=manifest.body, media_type="application/json", headers=headers)
         except Exception as e:
             logger.error(
-                'Getting Error in DiscoverController.documentation:', e)
+                'Getting Error in DiscoverController.documentation_response:', e)
             raise error_handler(e, 500)
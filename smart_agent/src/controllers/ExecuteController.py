@@ -1,9 +1,11 @@
+import asyncio
 import os
 import json
 from ..validator.agent import AgentSchema
 from ..utils.webhook import call_webhook_with_success, call_webhook_with_error
+from ..utils.job_context import ensure_job_context
 from ..config.logger import Logger
-from ..agent.base_agent import base_agent
+from ..agent.base_agent import base_agent, base_agent_async, base_agent_stream
 
 logger = Logger()
 
@@ -14,6 +16,69 @@ class ExecuteController:
     Implements the Daiquiri pattern for multi-turn conversations.
     """
 
+    @staticmethod
+    def _prepare_inputs(payload: dict) -> dict:
+        """Flattens the payload inputs into the dict expected by base_agent."""
+        # Webhook calls for this job read the URL from its context, not the job store
+        ensure_job_context(payload.get('id'), payload.get('webhookUrl'))
+
+        inputs = {
+            'id': payload.get('id'),
+            'webhookUrl': payload.get('webhookUrl')
+        }
+
+        # Extract all inputs from the payload
+        for item in payload.get('inputs', []):
+            inputs[item.get('name')] = item.get('data')
+
+        return inputs
+
+    @staticmethod
+    def _notify_result(job_id, model_response, response_id, is_complete):
+        """Sends the completed webhook for a finished turn."""
+        # Determine completion status and prepare webhook response
+        if is_complete:
+            # Conversation is complete - send completed status
+            call_webhook_with_success(job_id, {
+                "status": "completed",
+                "data": {
+                    "info": "Discovery interview completed!",
+                    "output": {
+                        "name": "output",
+                        "type": "longText",
+                        "data": model_response
+                    }
+                }
+            })
+        else:
+            # Conversation continues - signal next task awaiting input
+            call_webhook_with_success(job_id, {
+                "status": "completed",
+                "data": {
+                    "output": {
+                        "name": "next_task_awaiting_input",
+                        "type": "nextTaskAwaitingInput",
+                        "data": [{
+                            "nextTask": {
+                                "agentIdentifier": "Client Discovery Interview",
+                                "taskDetails": {
+                                    "inputs": [
+                                        {
+                                            "name": "history",
+                                            "data": response_id
+                                        },
+                                        {
+                                            "name": "output",
+                                            "data": model_response
+                                        }
+                                    ]
+                                }
+                            }
+                        }]
+                    }
+                }
+            })
+
     def execute(self, payload: AgentSchema) -> dict:
         """
         Executes the interview task using the provided payload.
@@ -35,60 +100,12 @@ class ExecuteController:
             print(f"payload -> {payload}")
 
             # Prepare inputs
-            inputs = {
-                'id': payload.get('id'),
-                'webhookUrl': payload.get('webhookUrl')
-            }
-
-            # Extract all inputs from the payload
-            for item in payload.get('inputs', []):
-                inputs[item.get('name')] = item.get('data')
+            inputs = self._prepare_inputs(payload)
 
             # Call the base agent (Daiquiri pattern)
             resp, model_response, response_id, is_complete, summary = base_agent(inputs)
 
-            # Determine completion status and prepare webhook response
-            if is_complete:
-                # Conversation is complete - send completed status
-                call_webhook_with_success(payload.get('id'), {
-                    "status": "completed",
-                    "data": {
-                        "info": "Discovery interview completed!",
-                        "output": {
-                            "name": "output",
-                            "type": "longText",
-                            "data": model_response
-                        }
-                    }
-                })
-            else:
-                # Conversation continues - signal next task awaiting input
-                call_webhook_with_success(payload.get('id'), {
-                    "status": "completed",
-                    "data": {
-                        "output": {
-                            "name": "next_task_awaiting_input",
-                            "type": "nextTaskAwaitingInput",
-                            "data": [{
-                                "nextTask": {
-                                    "agentIdentifier": "Client Discovery Interview",
-                                    "taskDetails": {
-                                        "inputs": [
-                                            {
-                                                "name": "history",
-                                                "data": response_id
-                                            },
-                                            {
-                                                "name": "output",
-                                                "data": model_response
-                                            }
-                                        ]
-                                    }
-                                }
-                            }]
-                        }
-                    }
-                })
+            self._notify_result(payload.get('id'), model_response, response_id, is_complete)
 
             logger.info('Function execute: Execution complete', {
                 "response": model_response[:100] if model_response else "",
@@ -106,3 +123,75 @@ class ExecuteController:
             logger.error('Error in ExecuteController.execute:', e)
             call_webhook_with_error(payload.get('id'), str(e), 500)
             raise
+
+    async def execute_async(self, payload: AgentSchema) -> dict:
+        """
+        Asyncio variant of `execute` for the event-loop execution mode.
+
+        Returns:
+            dict: The result of the task execution.
+        """
+        try:
+            logger.info('ExecuteController.execute_async() method called')
+            payload = payload.dict()
+            inputs = self._prepare_inputs(payload)
+
+            resp, model_response, response_id, is_complete, summary = await base_agent_async(inputs)
+
+            await asyncio.to_thread(
+                self._notify_result, payload.get('id'), model_response, response_id, is_complete)
+
+            logger.info('Function execute_async: Execution complete', {
+                "response": model_response[:100] if model_response else "",
+                "is_complete": is_complete
+            })
+
+            return {
+                "result": resp,
+                "isComplete": is_complete,
+                "history": response_id,
+                "summary": summary
+            }
+
+        except Exception as e:
+            logger.error('Error in ExecuteController.execute_async:', str(e))
+            await asyncio.to_thread(call_webhook_with_error, payload.get('id'), str(e), 500)
+            raise
+
+    def execute_stream(self, payload: AgentSchema):
+        """
+        Executes one interview turn and yields (event, data) pairs as it runs.
+
+        Events:
+            token: a piece of model output, {"text": ...}
+            complete: the finished turn, with isComplete, history and summary
+
+        Webhooks are sent exactly as in `execute`.
+        """
+        logger.info('ExecuteController.execute_stream() method called')
+        payload = payload.dict()
+        inputs = self._prepare_inputs(payload)
+
+        try:
+            for kind, value in base_agent_stream(inputs):
+                if kind == "delta":
+                    yield "token", {"text": value}
+                    continue
+
+                resp, model_response, response_id, is_complete, summary = value
+                self._notify_result(payload.get('id'), model_response, response_id, is_complete)
+
+                logger.info('Function execute_stream: Execution complete', {
+                    "response": model_response[:100] if model_response else "",
+                    "is_complete": is_complete
+                })
+
+                yield "complete", {
+                    "result": resp,
+                    "isComplete": is_complete,
+                    "history": response_id,
+                    "summary": summary
+                }
+        except Exception as e:
+            logger.error('Error in ExecuteController.execute_stream:', str(e))
+            raise
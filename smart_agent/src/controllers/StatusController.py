@@ -1,6 +1,7 @@
 import os
-from ..utils.temp_db import get_job, list_active_jobs
+from ..utils.job_store import get_cached_job, acquire_capacity_lease, list_capacity_leases
 from ..utils.webhook import call_webhook_with_success
+from ..utils.status_store import pending_job_updates
 
 
 
@@ -11,7 +12,12 @@ class StatusController:
         """
         Look up the status of a task by its request_id.
         """
-        job = get_job(request_id)
+        job = get_cached_job(request_id)
+
+        # Overlay updates this process has buffered but not written yet
+        pending = pending_job_updates(request_id)
+        if pending:
+            job = {**(job or {}), **pending}
 
         if job:
             return {
@@ -31,34 +37,23 @@ class StatusController:
                 }
             }
 
-    def can_execute(self):
+    def can_execute(self, job_id=None):
         """
         Checks whether the agent can accept one more job.
         Returns a dict with 'status': 'available' or 'inprogress'.
+
+        When job_id is given, the job atomically takes one of the agent's
+        execution slots; the slot is released when the job reaches a terminal
+        status or is aborted.
         """
         limit = int(os.getenv('AGENT_EXECUTE_LIMIT', 1))
 
-        # Clean up any stale or completed jobs before counting
-        try:
-            from ..utils.temp_db import cleanup_stale_jobs
-            # Remove jobs older than 15 minutes before capacity check
-            cleanup_stale_jobs(max_age_seconds=15 * 60)
-        except Exception:
-            pass
-
-        # Only consider this agent's in-progress jobs for capacity
-        filters = {}
-        agent_name = os.getenv('AGENT_NAME')
-        environment = os.getenv('ENVIRONMENT')
-        if agent_name:
-            filters['agent_name'] = agent_name
-        if environment:
-            filters['environment'] = environment
-
-        # Use strong consistency to avoid GSI propagation lag after aborts
-        active_jobs = list_active_jobs(status_filter="inprogress", filters=filters, strong_consistent=True)
+        if job_id is not None:
+            available = acquire_capacity_lease(str(job_id), limit)
+        else:
+            available = len(list_capacity_leases()) < limit
 
-        if len(active_jobs) < limit:
+        if available:
             return {'status': 'available'}
 
         return {
@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from typing import Optional
 from ..controllers.DiscoverController import DiscoverController
 from ..validator.agent import ApiResponse
 
@@ -7,5 +8,5 @@ router = APIRouter(tags=['Discover News agent'])
 
 
 @router.get('/discover')
-def discover():
-  return DiscoverController.documentation()
+def discover(if_none_match: Optional[str] = Header(None)):
+  return DiscoverController.documentation_response(if_none_match)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, StreamingResponse
 from queue import Queue, Empty
 from threading import Thread
 from dotenv import load_dotenv
@@ -7,9 +8,14 @@ from dotenv import load_dotenv
 from ..controllers.ExecuteController import ExecuteController
 from ..controllers.StatusController import StatusController
 from ..validator.agent import ApiResponse, AgentSchema
-from ..utils.temp_db import add_job
+from ..utils.job_store import add_job, remove_job, release_capacity_lease
 from ..utils.helper import update_task_status
+from ..utils.webhook import call_webhook_with_error
+from ..utils.job_context import register_job_context, clear_job_context
+from ..utils.worker_pool import get_execute_mode, get_execution_pool, get_async_runner
 
+import asyncio
+import json
 import os
 import time
 
@@ -28,14 +34,52 @@ def _execute_worker(request_data: dict, result_q: Queue):
         result_q.put(res)
 
 
-@router.post('/execute', response_model=ApiResponse)
-def execute_agent(request: AgentSchema):
-    # 1. capacity check
-    status = StatusController().can_execute()
-    if status['status'] != 'available':
-        return {'result': status}
+def _persist_result(job_id: str, result):
+    """Persist the final status of a job instead of deleting it."""
+    try:
+        final_status = result.get("status", "completed") if isinstance(result, dict) else "completed"
+        final_data = result.get("data", result) if isinstance(result, dict) else {"result": result}
+        update_task_status(job_id, final_status, final_data)
+    except Exception:
+        # Best-effort; avoid breaking the response on persistence issues
+        pass
+    finally:
+        clear_job_context(job_id)
 
-    # 2. Register job in DynamoDB immediately so status is visible
+
+def _execute_in_background(request_data: dict):
+    """Pool entry point: run the job and persist its outcome.
+
+    The caller has already received 202, so results are only visible through
+    the webhook and /status/{task_id}.
+    """
+    result_q = Queue()
+    _execute_worker(request_data, result_q)
+    _persist_result(str(request_data.get('id')), result_q.get_nowait())
+
+
+async def _execute_on_loop(request_data: dict):
+    """Async runner entry point: run the job as a coroutine and persist its outcome."""
+    schema = AgentSchema(**request_data)
+    try:
+        res = await ExecuteController().execute_async(schema)
+    except asyncio.CancelledError:
+        # The runner is shutting down; tell the caller instead of dropping the turn
+        message = "Agent shut down before the task finished."
+        try:
+            await asyncio.to_thread(call_webhook_with_error, request_data.get('id'), message, 503)
+        except Exception:
+            # error_handler raises once the webhook has been sent
+            pass
+        await asyncio.to_thread(_persist_result, str(request_data.get('id')), {"status": "error", "message": message})
+        raise
+    except Exception as e:
+        res = {"status": "error", "message": str(e)}
+    await asyncio.to_thread(_persist_result, str(request_data.get('id')), res)
+
+
+def _register_job(request: AgentSchema):
+    """Register the job in DynamoDB immediately so its status is visible."""
     job_record = {
         'id': request.id,
         'webhookUrl': request.webhookUrl,
@@ -48,6 +92,85 @@ def execute_agent(request: AgentSchema):
         'environment': os.getenv('ENVIRONMENT', '')
     }
     add_job(job_record)
+    register_job_context(
+        request.id,
+        request.webhookUrl,
+        agent_name=job_record['agent_name'],
+        agent_type=job_record['agent_type'],
+        environment=job_record['environment']
+    )
+
+
+def _sse_event(event: str, data) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_turn(request_data: dict):
+    """Run one turn as server-sent events and persist its outcome when it ends."""
+    job_id = str(request_data.get('id'))
+    result = None
+    try:
+        yield _sse_event('start', {'id': request_data.get('id'), 'status': 'inprogress'})
+        for event, data in ExecuteController().execute_stream(AgentSchema(**request_data)):
+            if event == 'complete':
+                result = data
+            yield _sse_event(event, data)
+    except GeneratorExit:
+        # Client went away; stop generating and free the slot
+        result = {"status": "aborted", "data": {"reason": "Client disconnected"}}
+        raise
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+        yield _sse_event('error', {'id': request_data.get('id'), 'message': str(e)})
+    finally:
+        if result is None:
+            result = {"status": "error", "message": "Stream ended without a result."}
+        _persist_result(job_id, result)
+
+
+@router.post('/execute', response_model=ApiResponse)
+def execute_agent(request: AgentSchema):
+    # 1. capacity check (takes an execution slot for this job if one is free)
+    status = StatusController().can_execute(request.id)
+    if status['status'] != 'available':
+        return {'result': status}
+
+    # 2. Register job in DynamoDB immediately so status is visible
+    _register_job(request)
+
+    # Background modes: hand off to the worker pool or event loop and return straight away
+    mode = get_execute_mode()
+    if mode in ('background', 'asyncio'):
+        if mode == 'asyncio':
+            accepted = get_async_runner().submit(_execute_on_loop, request.dict())
+        else:
+            accepted = get_execution_pool().submit(_execute_in_background, request.dict())
+
+        if not accepted:
+            # The job never started, so don't leave it holding capacity
+            remove_job(str(request.id))
+            release_capacity_lease(str(request.id))
+            clear_job_context(request.id)
+            return {
+                'result': {
+                    'status': 'inprogress',
+                    'data': {
+                        'info': 'Agent is busy. Please try again later.'
+                    }
+                }
+            }
+
+        return JSONResponse(status_code=202, content={
+            'result': {
+                'id': request.id,
+                'status': 'accepted',
+                'data': {
+                    'info': 'Task accepted. Results will be sent to the webhook.',
+                    'statusUrl': f'/status/{request.id}'
+                }
+            }
+        })
 
     # 3. prepare the thread-safe queue and worker (after we persist the job)
     result_q = Queue()
@@ -67,12 +190,26 @@ def execute_agent(request: AgentSchema):
         }
 
     # 6. Persist final status instead of deleting the job
-    try:
-        final_status = result.get("status", "completed") if isinstance(result, dict) else "completed"
-        final_data = result.get("data", result) if isinstance(result, dict) else {"result": result}
-        update_task_status(str(request.id), final_status, final_data)
-    except Exception:
-        # Best-effort; avoid breaking the response on persistence issues
-        pass
+    _persist_result(str(request.id), result)
 
     return result
+
+
+@router.post('/execute/stream', response_model=ApiResponse)
+def execute_agent_stream(request: AgentSchema):
+    """
+    Runs one interview turn and streams the model output as server-sent events:
+    `start`, then `token` events as text arrives, then a terminal `complete`
+    (isComplete, history, summary) or `error` event.
+    """
+    status = StatusController().can_execute(request.id)
+    if status['status'] != 'available':
+        return {'result': status}
+
+    _register_job(request)
+
+    return StreamingResponse(
+        _stream_turn(request.dict()),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
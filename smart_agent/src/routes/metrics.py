@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from ..agent.prompt_registry import get_prompt_registry_stats
+from ..utils.job_cache import get_job_cache_stats
+from ..utils.reaper import get_reaper_stats
+from ..utils.status_store import get_status_store_stats
+from ..utils.job_store import get_job_counts
+from ..utils.webhook_dispatcher import get_webhook_dispatcher_stats
+from ..utils.worker_pool import get_execution_pool_stats, get_async_runner_stats
+
+router = APIRouter(tags=['Metrics'])
+
+
+@router.get('/metrics')
+def get_metrics():
+  return {
+    "reaper": get_reaper_stats(),
+    "executionPool": get_execution_pool_stats(),
+    "asyncRunner": get_async_runner_stats(),
+    "webhooks": get_webhook_dispatcher_stats(),
+    "statusStore": get_status_store_stats(),
+    "jobCache": get_job_cache_stats(),
+    "prompts": get_prompt_registry_stats(),
+    "jobCounts": get_job_counts(),
+  }
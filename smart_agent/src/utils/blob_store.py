@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+from typing import List, Optional
+from urllib.parse import quote
+
+
+class LocalBlobStore:
+    """Blobs as files under a directory; a stand-in for S3 on a single node or in tests."""
+
+    name = 'local'
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *[quote(part, safe='') for part in key.split('/')])
+
+    def put(self, key: str, body: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), 'rb') as f:
+            return f.read()
+
+    def delete_many(self, keys: List[str]):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+
+class S3BlobStore:
+    """Blobs as objects under a prefix of an S3 bucket."""
+
+    name = 's3'
+
+    def __init__(self, bucket: str, prefix: str = ''):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self._client = boto3.client('s3', endpoint_url=os.getenv('S3_ENDPOINT_URL') or None)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, body: bytes):
+        self._client.put_object(Bucket=self.bucket, Key=self._key(key), Body=body)
+
+    def get(self, key: str) -> bytes:
+        return self._client.get_object(Bucket=self.bucket, Key=self._key(key))['Body'].read()
+
+    def delete_many(self, keys: List[str]):
+        # DeleteObjects takes up to 1000 keys per call
+        for start in range(0, len(keys), 1000):
+            self._client.delete_objects(Bucket=self.bucket, Delete={
+                'Objects': [{'Key': self._key(key)} for key in keys[start:start + 1000]],
+                'Quiet': True,
+            })
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    """
+    Returns the blob store configured with JOB_BLOB_STORE ("local" or "s3"),
+    or None when offloading is not configured.
+    """
+    global _store
+    backend = os.getenv('JOB_BLOB_STORE', '').strip().lower()
+    if not backend:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if backend == 'local':
+                    _store = LocalBlobStore(os.getenv('JOB_BLOB_DIR', os.path.join(tempfile.gettempdir(), 'agent-job-blobs')))
+                elif backend == 's3':
+                    _store = S3BlobStore(os.environ['JOB_BLOB_BUCKET'], os.getenv('JOB_BLOB_PREFIX', 'job-data'))
+                else:
+                    raise ValueError(f"Unknown JOB_BLOB_STORE: {backend}")
+    return _store
@@ -3,7 +3,9 @@ import signal
 import sys
 
 import os
-from .temp_db import list_active_jobs, remove_job
+from .job_store import COUNT_ATTRIBUTES, iter_jobs, remove_jobs, release_capacity_leases
+from .webhook_dispatcher import flush_webhooks
+from .status_store import flush_status_store
 from ..config.logger import Logger
 
 logger = Logger()
@@ -19,17 +21,20 @@ def _cleanup_jobs():
     if environment:
         filters['environment'] = environment
 
-    active = list_active_jobs(status_filter="inprogress", filters=filters)
-    for job in active:
-        job_id = job.get("id")
-        if job_id:
-            logger.info("Cleaning up job %s", job_id)
-            remove_job(job_id)
+    active = {job["id"]: job for job in iter_jobs("inprogress", filters=filters, projection=COUNT_ATTRIBUTES)
+              if job.get("id")}
+    job_ids = list(active)
+    if job_ids:
+        logger.info("Cleaning up jobs", job_ids)
+        remove_jobs(job_ids, records=active)
+        release_capacity_leases(job_ids)
 
 
 def _signal_handler(signum, frame):
     logger.info("Received signal %s, initiating cleanup", signum)
+    flush_status_store()
     _cleanup_jobs()
+    flush_webhooks()
     sys.exit(0)
 
 
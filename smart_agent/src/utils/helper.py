@@ -1,16 +1,21 @@
 import logging
 import sys
 
-from ..utils.temp_db import get_job, update_job_fields
+from ..utils.job_store import get_job, update_job_fields, release_capacity_lease
+from ..utils.job_context import get_job_context
+from ..utils.status_store import get_status_store, is_write_behind_enabled
 
 logger = logging.getLogger(__name__)
 
+# Statuses after which a job no longer holds an execution slot
+TERMINAL_STATUSES = {"completed", "failed", "aborted", "error"}
+
 
 def is_execution_abort(job_id: str):
     """
     Raises SystemExit if the job with job_id has been aborted.
     """
-    job = get_job(job_id)
+    job = get_job(job_id, projection=["isExecutionContinue"])
     if job and not job.get("isExecutionContinue", True):
         logger.info("Abort due to request for job %s", job_id)
         sys.exit(0)
@@ -19,11 +24,27 @@ def is_execution_abort(job_id: str):
 def update_task_status(job_id: str, status: str, data=None):
     """
     Updates the status and data for the job with job_id in DynamoDB.
+
+    Intermediate statuses go through the write-behind store and are coalesced
+    per job; terminal statuses are written before returning.
     """
     try:
-        update_job_fields(job_id, {
+        updates = {
             "status": status,
             "data": data or {}
-        })
+        }
+        # The job's owner, so the store writes its agent_status key in one update
+        context = get_job_context(job_id)
+        if context is not None:
+            updates.update(agent_name=context.agent_name, environment=context.environment)
+        if not is_write_behind_enabled():
+            update_job_fields(job_id, updates)
+        elif status in TERMINAL_STATUSES:
+            get_status_store().write(job_id, updates)
+        else:
+            get_status_store().update(job_id, updates)
+
+        if status in TERMINAL_STATUSES:
+            release_capacity_lease(job_id)
     except Exception as e:
         logger.error(f"Failed to update task {job_id}: {e}")
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+class JobCache:
+    """
+    Bounded read-through cache of job records with a short TTL.
+
+    Entries are evicted least recently used first once `max_entries` is
+    reached. Concurrent misses for the same job share one load
+    (singleflight), and invalidate() drops an entry immediately so a job
+    written by this process is never served stale from here.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # A load may only fill the cache while its future is still the one
+        # registered here; invalidate() unregisters it
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'shared_loads': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, job_id: str, loader: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Return the cached job, or load it once for every concurrent caller."""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(job_id)
+                self._stats['hits'] += 1
+                return entry[1]
+
+            self._stats['misses'] += 1
+            future = self._inflight.get(job_id)
+            if future is not None:
+                self._stats['shared_loads'] += 1
+                leader = False
+            else:
+                future = self._inflight[job_id] = Future()
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            job = loader(job_id)
+        except BaseException as e:
+            with self._lock:
+                if self._inflight.get(job_id) is future:
+                    del self._inflight[job_id]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            # Skip storing if the job was written while it was being read
+            if self._inflight.get(job_id) is future:
+                del self._inflight[job_id]
+                self._entries[job_id] = (time.monotonic() + self.ttl, job)
+                self._entries.move_to_end(job_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        future.set_result(job)
+        return job
+
+    def invalidate(self, job_id: str):
+        """Forget job_id, including a read of it that is still in flight."""
+        with self._lock:
+            self._entries.pop(job_id, None)
+            self._inflight.pop(job_id, None)
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'hit_ratio': round(self._stats['hits'] / lookups, 4) if lookups else None,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def is_job_cache_enabled() -> bool:
+    return os.getenv('JOB_CACHE_TTL_MS', '1000').strip() not in ('', '0')
+
+
+def get_job_cache() -> JobCache:
+    """Returns the process-wide job cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = JobCache(
+                    ttl=int(os.getenv('JOB_CACHE_TTL_MS', '1000')) / 1000.0,
+                    max_entries=int(os.getenv('JOB_CACHE_MAX_ENTRIES', '10000')),
+                )
+    return _cache
+
+
+def invalidate_cached_job(job_id):
+    """Drop job_id from the cache, if the cache was started."""
+    cache = _cache
+    if cache is not None and job_id:
+        cache.invalidate(str(job_id))
+
+
+def get_job_cache_stats():
+    """Stats of the job cache, or None if it has not been started."""
+    cache = _cache
+    return cache.stats() if cache is not None else None
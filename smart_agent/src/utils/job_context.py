@@ -0,0 +1,107 @@
+import os
+import threading
+from typing import Dict, Optional
+
+
+class JobContext:
+    """
+    What the execution layers know about a running job, so they don't have to
+    read it back from the job store (e.g. to find its webhook URL).
+    """
+
+    def __init__(self, job_id: str, webhook_url: Optional[str] = None, status: str = 'inprogress',
+                 agent_name: Optional[str] = None, agent_type: Optional[str] = None,
+                 environment: Optional[str] = None):
+        self.job_id = str(job_id)
+        self.webhook_url = webhook_url
+        self.status = status
+        self.agent_name = agent_name if agent_name is not None else os.getenv('AGENT_NAME', '')
+        self.agent_type = agent_type if agent_type is not None else os.getenv('AGENT_TYPE', '')
+        self.environment = environment if environment is not None else os.getenv('ENVIRONMENT', '')
+
+    def __repr__(self):
+        return f"JobContext(job_id={self.job_id!r}, status={self.status!r})"
+
+
+_contexts: Dict[str, JobContext] = {}
+_lock = threading.Lock()
+
+
+def register_job_context(job_id, webhook_url: Optional[str] = None, **kwargs) -> JobContext:
+    """Create (or replace) the context of a job when it starts executing in this process."""
+    context = JobContext(job_id, webhook_url, **kwargs)
+    with _lock:
+        _contexts[context.job_id] = context
+    return context
+
+
+def ensure_job_context(job_id, webhook_url: Optional[str] = None) -> JobContext:
+    """Return the job's context, creating it if the job was not started through /execute."""
+    with _lock:
+        context = _contexts.get(str(job_id))
+    return context or register_job_context(job_id, webhook_url)
+
+
+def get_job_context(job_id) -> Optional[JobContext]:
+    with _lock:
+        return _contexts.get(str(job_id))
+
+
+def clear_job_context(job_id):
+    """Forget a job once its final status has been persisted."""
+    with _lock:
+        _contexts.pop(str(job_id), None)
+
+
+def get_heartbeat_interval() -> float:
+    """
+    Seconds between heartbeats of running jobs. Defaults to a third of the
+    shorter of the in-progress lease and the reaper's stale age.
+    """
+    lease = int(os.getenv('JOB_LEASE_SECONDS', 15 * 60))
+    max_age = int(os.getenv('JOB_REAPER_MAX_AGE_SECONDS', 15 * 60))
+    return float(os.getenv('JOB_HEARTBEAT_SECONDS', min(lease, max_age) / 3))
+
+
+_heartbeat_stop = threading.Event()
+_heartbeat_thread = None
+
+
+def heartbeat_running_jobs() -> int:
+    """Extends the lease of every job executing in this process; returns how many were renewed."""
+    from .job_store import heartbeat_job
+    with _lock:
+        job_ids = list(_contexts)
+    renewed = 0
+    for job_id in job_ids:
+        try:
+            renewed += bool(heartbeat_job(job_id))
+        except Exception as e:
+            print(f"Heartbeat failed for job {job_id}: {e}")
+    return renewed
+
+
+def _run_heartbeat(interval: float):
+    print(f"Job heartbeat started (interval={interval}s)")
+    while not _heartbeat_stop.wait(interval):
+        heartbeat_running_jobs()
+    print("Job heartbeat stopped")
+
+
+def start_heartbeat():
+    """Starts the thread that keeps running jobs from expiring or being reaped mid-run."""
+    global _heartbeat_thread
+    if _heartbeat_thread is not None and _heartbeat_thread.is_alive():
+        return
+    _heartbeat_stop.clear()
+    _heartbeat_thread = threading.Thread(
+        target=_run_heartbeat, args=(get_heartbeat_interval(),), name='job-heartbeat', daemon=True)
+    _heartbeat_thread.start()
+
+
+def stop_heartbeat(timeout: float = 5.0):
+    global _heartbeat_thread
+    _heartbeat_stop.set()
+    if _heartbeat_thread is not None:
+        _heartbeat_thread.join(timeout)
+        _heartbeat_thread = None
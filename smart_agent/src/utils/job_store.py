@@ -0,0 +1,357 @@
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import temp_db
+from .temp_db import COUNT_ATTRIBUTES, is_job_expired, job_expires_at
+
+
+class JobStore(ABC):
+    """
+    Storage for job records and the agent's execution-slot leases.
+
+    Backends (selected with JOB_STORE_BACKEND):
+      - "dynamodb": the shared DynamoDB table in temp_db (default)
+      - "memory": process-local dictionaries, for single-process runs and tests
+      - "sqlite": a local SQLite database in WAL mode, shared by the
+        processes of a single node
+
+    Subclasses implement the record and lease primitives; listings, cleanup
+    and counts have generic implementations built on them.
+    """
+
+    name = 'base'
+    # Whether reads are remote enough to be worth the /status read-through cache
+    cacheable = False
+
+    # --- Records -------------------------------------------------------------
+
+    @abstractmethod
+    def get_job(self, job_id: str, projection: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_job(self, job: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_job_fields(self, job_id: str, updates: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat_job(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_job(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_jobs(self, status: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                  limit: Optional[int] = None, projection: Optional[List[str]] = None,
+                  include_expired: bool = False) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def remove_jobs(self, job_ids: List[str], records: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        return sum(1 for job_id in dict.fromkeys(job_ids) if job_id and self.remove_job(job_id))
+
+    def list_active_jobs(self, status_filter: str = "inprogress", filters: Optional[Dict[str, Any]] = None,
+                         limit: Optional[int] = None, projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_jobs(status_filter, filters, limit=limit, projection=projection))
+
+    def list_all_jobs(self, filters: Optional[Dict[str, Any]] = None,
+                      projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_jobs(filters=filters, projection=projection))
+
+    # --- Leases --------------------------------------------------------------
+
+    @abstractmethod
+    def acquire_capacity_lease(self, job_id: str, limit: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def release_capacity_lease(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_capacity_leases(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def release_capacity_leases(self, job_ids: List[str]) -> int:
+        return sum(1 for job_id in dict.fromkeys(job_ids) if job_id and self.release_capacity_lease(job_id))
+
+    def reconcile_capacity_leases(self, grace_seconds: int = 60) -> int:
+        """Release leases whose job is gone or no longer in progress (see temp_db)."""
+        now = time.time()
+        released = 0
+        for job_id, acquired_at in self.list_capacity_leases().items():
+            job = self.get_job(job_id, projection=["status"])
+            if job and job.get("status") == "inprogress":
+                continue
+            if not job and now - acquired_at < grace_seconds:
+                continue
+            if self.release_capacity_lease(job_id):
+                released += 1
+        return released
+
+    # --- Maintenance ---------------------------------------------------------
+
+    def cleanup_stale_jobs(self, max_age_seconds: int = 900) -> int:
+        """Remove this agent's jobs that are no longer active or are older than the given age."""
+        now = time.time()
+        stale = {}
+        for job in self.iter_jobs(filters=_current_agent_filters(), projection=["timestamp", "heartbeat_at", *COUNT_ATTRIBUTES],
+                                  include_expired=True):
+            timestamp = float(job.get("heartbeat_at") or job.get("timestamp", 0))
+            if (job.get("status") != "inprogress" or (timestamp and now - timestamp > max_age_seconds)
+                    or is_job_expired(job, now)):
+                stale[job["id"]] = job
+        cleaned = self.remove_jobs(list(stale), records=stale)
+        self.reconcile_capacity_leases()
+        return cleaned
+
+    def cleanup_completed_jobs(self, max_age_hours: int = 24) -> int:
+        """Remove completed jobs whose completed_at/updated_at is older than max_age_hours."""
+        cutoff = time.time() - max_age_hours * 3600
+        expired = {}
+        for job in self.iter_jobs("completed", projection=["completed_at", "updated_at", *COUNT_ATTRIBUTES],
+                                  include_expired=True):
+            job_timestamp = job.get('completed_at') or job.get('updated_at')
+            if job_timestamp and float(job_timestamp) < cutoff:
+                expired[job['id']] = job
+        return self.remove_jobs(list(expired), records=expired)
+
+    def get_job_counts(self, agent_name: Optional[str] = None, environment: Optional[str] = None) -> Dict[str, int]:
+        """Per-status job counts of an agent/environment (the current one by default)."""
+        filters = {
+            'agent_name': os.getenv('AGENT_NAME', '') if agent_name is None else agent_name,
+            'environment': os.getenv('ENVIRONMENT', '') if environment is None else environment,
+        }
+        counts: Dict[str, int] = {}
+        for job in self.iter_jobs(filters=filters, projection=["status"], include_expired=True):
+            if job.get("status"):
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+    def reconcile_job_counts(self, filters: Optional[Dict[str, Any]] = None):
+        """Counts are computed on read unless a backend materialises them; nothing to rebuild."""
+        return {}
+
+    def health_check(self) -> Dict[str, Any]:
+        return {"status": "healthy", "backend": self.name}
+
+
+def _current_agent_filters() -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+    if os.getenv('AGENT_NAME'):
+        filters['agent_name'] = os.getenv('AGENT_NAME')
+    if os.getenv('ENVIRONMENT'):
+        filters['environment'] = os.getenv('ENVIRONMENT')
+    return filters
+
+
+def project(job: Dict[str, Any], projection: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the projected attributes (plus id and expires_at), like a ProjectionExpression."""
+    if not projection:
+        return job
+    keep = set(projection) | {"id", "expires_at"}
+    return {k: v for k, v in job.items() if k in keep}
+
+
+def matches(job: Dict[str, Any], status: Optional[str], filters: Optional[Dict[str, Any]]) -> bool:
+    """Equality match on status and every filter, like temp_db's filter expressions."""
+    if job.get("record_type"):
+        return False
+    if status is not None and job.get("status") != status:
+        return False
+    return all(job.get(key) == value for key, value in (filters or {}).items())
+
+
+class DynamoDBJobStore(JobStore):
+    """The shared DynamoDB table; every call goes to the functions in temp_db."""
+
+    name = 'dynamodb'
+    cacheable = True
+
+    def get_job(self, job_id, projection=None):
+        return temp_db.get_job(job_id, projection)
+
+    def add_job(self, job):
+        return temp_db.add_job(job)
+
+    def update_job_fields(self, job_id, updates):
+        return temp_db.update_job_fields(job_id, updates)
+
+    def heartbeat_job(self, job_id):
+        return temp_db.heartbeat_job(job_id)
+
+    def remove_job(self, job_id):
+        return temp_db.remove_job(job_id)
+
+    def remove_jobs(self, job_ids, records=None):
+        return temp_db.remove_jobs(job_ids, records=records)
+
+    def iter_jobs(self, status=None, filters=None, limit=None, projection=None, include_expired=False):
+        return temp_db.iter_jobs(status, filters, limit=limit, projection=projection,
+                                 include_expired=include_expired)
+
+    def list_active_jobs(self, status_filter="inprogress", filters=None, limit=None, projection=None):
+        return temp_db.list_active_jobs(status_filter, filters, limit=limit, projection=projection)
+
+    def list_all_jobs(self, filters=None, projection=None):
+        return temp_db.list_all_jobs(filters, projection)
+
+    def acquire_capacity_lease(self, job_id, limit):
+        return temp_db.acquire_capacity_lease(job_id, limit)
+
+    def release_capacity_lease(self, job_id):
+        return temp_db.release_capacity_lease(job_id)
+
+    def release_capacity_leases(self, job_ids):
+        return temp_db.release_capacity_leases(job_ids)
+
+    def list_capacity_leases(self):
+        return temp_db.list_capacity_leases()
+
+    def reconcile_capacity_leases(self, grace_seconds=60):
+        return temp_db.reconcile_capacity_leases(grace_seconds)
+
+    def cleanup_stale_jobs(self, max_age_seconds=900):
+        return temp_db.cleanup_stale_jobs(max_age_seconds)
+
+    def cleanup_completed_jobs(self, max_age_hours=24):
+        return temp_db.cleanup_completed_jobs(max_age_hours)
+
+    def get_job_counts(self, agent_name=None, environment=None):
+        return temp_db.get_job_counts(agent_name, environment)
+
+    def reconcile_job_counts(self, filters=None):
+        return temp_db.reconcile_job_counts(filters)
+
+    def health_check(self):
+        return {**temp_db.health_check(), "backend": self.name}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store_backend() -> str:
+    return os.getenv('JOB_STORE_BACKEND', 'dynamodb').strip().lower()
+
+
+def get_job_store() -> JobStore:
+    """Returns the process-wide job store for JOB_STORE_BACKEND, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = get_job_store_backend()
+                if backend == 'memory':
+                    from .job_store_memory import InMemoryJobStore
+                    _store = InMemoryJobStore()
+                elif backend == 'sqlite':
+                    from .job_store_sqlite import SQLiteJobStore
+                    default_path = os.path.join(tempfile.gettempdir(), 'agent-jobs.sqlite3')
+                    _store = SQLiteJobStore(os.getenv('JOB_STORE_SQLITE_PATH', default_path))
+                elif backend == 'dynamodb':
+                    _store = DynamoDBJobStore()
+                else:
+                    raise ValueError(f"Unknown JOB_STORE_BACKEND: {backend}")
+                print(f"Job store backend: {_store.name}")
+    return _store
+
+
+# Module-level functions used by controllers, routes and utils
+
+def get_job(job_id: str, projection: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Read a job; pass `projection` to fetch only the attributes the caller needs."""
+    return get_job_store().get_job(job_id, projection)
+
+
+def get_cached_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """get_job through the read-through cache when the backend is remote (see temp_db.get_cached_job)."""
+    store = get_job_store()
+    if store.cacheable:
+        return temp_db.get_cached_job(job_id)
+    return store.get_job(job_id)
+
+
+def add_job(job: Dict[str, Any]) -> bool:
+    return get_job_store().add_job(job)
+
+
+def update_job_fields(job_id: str, updates: Dict[str, Any]) -> bool:
+    return get_job_store().update_job_fields(job_id, updates)
+
+
+def heartbeat_job(job_id: str) -> bool:
+    return get_job_store().heartbeat_job(job_id)
+
+
+def remove_job(job_id: str) -> bool:
+    return get_job_store().remove_job(job_id)
+
+
+def remove_jobs(job_ids: List[str], records: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+    return get_job_store().remove_jobs(job_ids, records=records)
+
+
+def iter_jobs(status: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+              limit: Optional[int] = None, projection: Optional[List[str]] = None,
+              include_expired: bool = False) -> Iterator[Dict[str, Any]]:
+    return get_job_store().iter_jobs(status, filters, limit=limit, projection=projection,
+                                     include_expired=include_expired)
+
+
+def list_active_jobs(status_filter: str = "inprogress", filters: Optional[Dict[str, Any]] = None,
+                     limit: Optional[int] = None, projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    return get_job_store().list_active_jobs(status_filter, filters, limit=limit, projection=projection)
+
+
+def list_all_jobs(filters: Optional[Dict[str, Any]] = None,
+                  projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    return get_job_store().list_all_jobs(filters, projection)
+
+
+def acquire_capacity_lease(job_id: str, limit: int) -> bool:
+    return get_job_store().acquire_capacity_lease(job_id, limit)
+
+
+def release_capacity_lease(job_id: str) -> bool:
+    return get_job_store().release_capacity_lease(job_id)
+
+
+def release_capacity_leases(job_ids: List[str]) -> int:
+    return get_job_store().release_capacity_leases(job_ids)
+
+
+def list_capacity_leases() -> Dict[str, int]:
+    return get_job_store().list_capacity_leases()
+
+
+def reconcile_capacity_leases(grace_seconds: int = 60) -> int:
+    return get_job_store().reconcile_capacity_leases(grace_seconds)
+
+
+def cleanup_stale_jobs(max_age_seconds: int = 900) -> int:
+    return get_job_store().cleanup_stale_jobs(max_age_seconds)
+
+
+def cleanup_completed_jobs(max_age_hours: int = 24) -> int:
+    return get_job_store().cleanup_completed_jobs(max_age_hours)
+
+
+def get_job_counts(agent_name: Optional[str] = None, environment: Optional[str] = None) -> Dict[str, int]:
+    return get_job_store().get_job_counts(agent_name, environment)
+
+
+def reconcile_job_counts(filters: Optional[Dict[str, Any]] = None):
+    return get_job_store().reconcile_job_counts(filters)
+
+
+def health_check() -> Dict[str, Any]:
+    return get_job_store().health_check()
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any, Dict
+
+from .job_store import JobStore, matches, project
+from .temp_db import is_job_expired, job_expires_at, with_agent_status
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Job records and leases in process-local dictionaries.
+
+    Every write to a job (add, update, heartbeat, remove) holds one of a
+    fixed set of striped locks chosen by the job id, so concurrent updates to
+    a job merge instead of overwriting each other. Writers never mutate a
+    stored record; they build a new dict and swap it in, so reads and
+    listings skip the locks, always see a whole record and hand out copies.
+    Capacity leases are admitted under a single separate lock.
+
+    State lives and dies with the process, so this suits single-process
+    deployments, local load tests and offline benchmarks.
+    """
+
+    name = 'memory'
+
+    def __init__(self, lock_stripes: int = 64):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._leases: Dict[str, int] = {}
+        self._lease_lock = threading.Lock()
+        self._job_locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def _job_lock(self, job_id: str) -> threading.Lock:
+        return self._job_locks[hash(job_id) % len(self._job_locks)]
+
+    def get_job(self, job_id, projection=None):
+        job = self._jobs.get(str(job_id)) if job_id else None
+        if job is None or is_job_expired(job):
+            return None
+        return dict(project(job, projection))
+
+    def add_job(self, job):
+        job = with_agent_status(job)
+        job.setdefault("expires_at", job_expires_at(job.get("status")))
+        with self._job_lock(str(job["id"])):
+            self._jobs[str(job["id"])] = job
+        return True
+
+    def update_job_fields(self, job_id, updates):
+        job_id = str(job_id)
+        with self._job_lock(job_id):
+            job = {**self._jobs.get(job_id, {"id": job_id}), **updates}
+            if "status" in updates:
+                if "expires_at" not in updates:
+                    job["expires_at"] = job_expires_at(updates["status"])
+                job = with_agent_status(job)
+            self._jobs[job_id] = job
+        return True
+
+    def heartbeat_job(self, job_id):
+        job_id = str(job_id)
+        with self._job_lock(job_id):
+            job = self._jobs.get(job_id)
+            if job is None or job.get("status") != "inprogress":
+                return False
+            now = int(time.time())
+            self._jobs[job_id] = {**job, "expires_at": job_expires_at("inprogress", now), "heartbeat_at": now}
+        return True
+
+    def remove_job(self, job_id):
+        job_id = str(job_id)
+        with self._job_lock(job_id):
+            return self._jobs.pop(job_id, None) is not None
+
+    def iter_jobs(self, status=None, filters=None, limit=None, projection=None, include_expired=False):
+        now = time.time()
+        count = 0
+        # list() takes a snapshot, so writers never invalidate the iteration
+        for job in list(self._jobs.values()):
+            if not matches(job, status, filters) or (not include_expired and is_job_expired(job, now)):
+                continue
+            yield dict(project(job, projection))
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def acquire_capacity_lease(self, job_id, limit):
+        job_id = str(job_id)
+        with self._lease_lock:
+            if job_id not in self._leases and len(self._leases) >= limit:
+                return False
+            self._leases[job_id] = int(time.time())
+        return True
+
+    def release_capacity_lease(self, job_id):
+        with self._lease_lock:
+            return self._leases.pop(str(job_id), None) is not None
+
+    def list_capacity_leases(self):
+        return dict(self._leases)
+
+    def health_check(self) -> Dict[str, Any]:
+        return {"status": "healthy", "backend": self.name, "item_count": len(self._jobs)}
@@ -0,0 +1,236 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from .job_store import JobStore, matches, project
+from .temp_db import is_job_expired, job_expires_at, with_agent_status
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT,
+    agent_name TEXT,
+    environment TEXT,
+    expires_at INTEGER,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_agent_status ON jobs (agent_name, environment, status);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS leases (
+    scope TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    acquired_at INTEGER NOT NULL,
+    PRIMARY KEY (scope, job_id)
+);
+"""
+
+# Columns that can be matched in SQL; any other filter is applied to the decoded record
+_COLUMNS = ("status", "agent_name", "environment")
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode(job: Dict[str, Any]) -> str:
+    return json.dumps(job, default=_json_default)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job records and leases in a local SQLite database in WAL mode.
+
+    Readers never block the writer, and every process on the node sees the
+    same jobs and leases, so multi-worker single-node deployments keep a
+    shared capacity limit without a network hop. Each thread uses its own
+    connection; read-modify-write operations run in IMMEDIATE transactions.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        # Resolved once, so every thread opens the same file whatever the working directory
+        self.path = os.path.abspath(path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _scope(self) -> str:
+        return f"{os.getenv('AGENT_NAME', '')}#{os.getenv('ENVIRONMENT', '')}"
+
+    def _put(self, conn: sqlite3.Connection, job: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, agent_name, environment, expires_at, record)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (str(job["id"]), job.get("status"), job.get("agent_name"), job.get("environment"),
+             job.get("expires_at"), _encode(job)),
+        )
+
+    def _read(self, conn: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT record FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_job(self, job_id, projection=None):
+        if not job_id:
+            return None
+        job = self._read(self._connection(), str(job_id))
+        return None if is_job_expired(job) else project(job, projection)
+
+    def add_job(self, job):
+        job = with_agent_status(job)
+        job.setdefault("expires_at", job_expires_at(job.get("status")))
+        try:
+            self._put(self._connection(), job)
+            return True
+        except sqlite3.Error as e:
+            print(f"add_job error: {e}")
+            return False
+
+    def update_job_fields(self, job_id, updates):
+        job_id = str(job_id)
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                job = {**(self._read(conn, job_id) or {"id": job_id}), **updates}
+                if "status" in updates:
+                    if "expires_at" not in updates:
+                        job["expires_at"] = job_expires_at(updates["status"])
+                    job = with_agent_status(job)
+                self._put(conn, job)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return True
+        except sqlite3.Error as e:
+            print(f"update_job_fields error: {e}")
+            return False
+
+    def heartbeat_job(self, job_id):
+        job_id = str(job_id)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            job = self._read(conn, job_id)
+            if job is None or job.get("status") != "inprogress":
+                conn.execute("ROLLBACK")
+                return False
+            now = int(time.time())
+            self._put(conn, {**job, "expires_at": job_expires_at("inprogress", now), "heartbeat_at": now})
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def remove_job(self, job_id):
+        cursor = self._connection().execute("DELETE FROM jobs WHERE id = ?", (str(job_id),))
+        return cursor.rowcount > 0
+
+    def remove_jobs(self, job_ids, records=None):
+        job_ids = [str(job_id) for job_id in dict.fromkeys(job_ids) if job_id]
+        if not job_ids:
+            return 0
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = 0
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                cursor = conn.execute(
+                    f"DELETE FROM jobs WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                removed += cursor.rowcount
+            conn.execute("COMMIT")
+            return removed
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def iter_jobs(self, status=None, filters=None, limit=None, projection=None, include_expired=False):
+        filters = dict(filters or {})
+        if status is not None:
+            filters["status"] = status
+        where, params = [], []
+        for column in _COLUMNS:
+            if column in filters:
+                where.append(f"{column} = ?")
+                params.append(filters[column])
+        if not include_expired:
+            where.append("(expires_at IS NULL OR expires_at > ?)")
+            params.append(int(time.time()))
+        sql = "SELECT record FROM jobs" + (" WHERE " + " AND ".join(where) if where else "")
+
+        # Read eagerly so no statement stays open on the thread's connection between yields
+        rows = self._connection().execute(sql, params).fetchall()
+        count = 0
+        for (record,) in rows:
+            job = json.loads(record)
+            if not matches(job, None, filters):
+                continue
+            yield project(job, projection)
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def acquire_capacity_lease(self, job_id, limit):
+        scope = self._scope()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            held = conn.execute("SELECT 1 FROM leases WHERE scope = ? AND job_id = ?",
+                                (scope, str(job_id))).fetchone()
+            if not held:
+                (count,) = conn.execute("SELECT COUNT(*) FROM leases WHERE scope = ?", (scope,)).fetchone()
+                if count >= limit:
+                    conn.execute("ROLLBACK")
+                    return False
+            conn.execute("INSERT OR REPLACE INTO leases (scope, job_id, acquired_at) VALUES (?, ?, ?)",
+                         (scope, str(job_id), int(time.time())))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release_capacity_lease(self, job_id):
+        cursor = self._connection().execute("DELETE FROM leases WHERE scope = ? AND job_id = ?",
+                                            (self._scope(), str(job_id)))
+        return cursor.rowcount > 0
+
+    def list_capacity_leases(self):
+        rows = self._connection().execute("SELECT job_id, acquired_at FROM leases WHERE scope = ?",
+                                          (self._scope(),))
+        return {job_id: acquired_at for job_id, acquired_at in rows}
+
+    def get_job_counts(self, agent_name=None, environment=None):
+        agent_name = os.getenv('AGENT_NAME', '') if agent_name is None else agent_name
+        environment = os.getenv('ENVIRONMENT', '') if environment is None else environment
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE agent_name = ? AND environment = ? GROUP BY status",
+            (agent_name, environment))
+        return {status: count for status, count in rows if status}
+
+    def health_check(self) -> Dict[str, Any]:
+        try:
+            (count,) = self._connection().execute("SELECT COUNT(*) FROM jobs").fetchone()
+            return {"status": "healthy", "backend": self.name, "path": self.path, "item_count": count}
+        except sqlite3.Error as e:
+            return {"status": "unhealthy", "backend": self.name, "path": self.path, "error": str(e)}
@@ -4,7 +4,7 @@ from dotenv import load_dotenv
 from kafka import KafkaProducer
 from kafka.errors import KafkaTimeoutError
 
-from ..utils.temp_db import list_active_jobs
+from ..utils.job_store import iter_jobs
 
 load_dotenv()
 
@@ -24,8 +24,9 @@ def write_to_kafka(data, status):
         current_pid = os.getpid()
 
         # Look for the job that matches the current PID
-        jobs = list_active_jobs()
-        task_execution_id = next((j.get('id') for j in jobs if j.get('pid') == current_pid), 'NA')
+        # Stops reading pages as soon as the job is found
+        jobs = iter_jobs("inprogress", filters={'pid': current_pid}, projection=["pid"])
+        task_execution_id = next((j.get('id') for j in jobs), 'NA')
 
         message = {
             'agent': agent_name,
@@ -0,0 +1,88 @@
+import json
+import os
+import zlib
+from decimal import Decimal
+from typing import Any, List
+
+from .blob_store import get_blob_store
+
+# Encoded payloads are dicts tagged with this key; anything else is stored as-is
+CODEC_KEY = "_codec"
+
+
+def _compress_threshold() -> int:
+    """Serialised size in bytes above which job data is compressed."""
+    return int(os.getenv('JOB_DATA_COMPRESS_BYTES', 16 * 1024))
+
+
+def _offload_threshold() -> int:
+    """Compressed size in bytes above which job data moves to the blob store."""
+    return int(os.getenv('JOB_DATA_OFFLOAD_BYTES', 192 * 1024))
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def blob_key(job_id: str) -> str:
+    """One blob per job, overwritten by every offloaded write of its data."""
+    return f"jobs/{job_id}/data.json.z"
+
+
+def encode_job_data(job_id: str, data: Any) -> Any:
+    """
+    Encode a job's `data` attribute for storage.
+
+    Small payloads are returned unchanged. Larger ones are zlib-compressed
+    into {"_codec": "zlib", "payload": bytes}, and if still above the offload
+    threshold (and JOB_BLOB_STORE is set) written to the blob store and
+    replaced by {"_codec": "blob", "key": ...}.
+    """
+    if not isinstance(data, (dict, list)):
+        return data
+    raw = json.dumps(data, default=_json_default, separators=(',', ':')).encode('utf-8')
+    if len(raw) < _compress_threshold():
+        return data
+
+    packed = zlib.compress(raw, 6)
+    if len(packed) > _offload_threshold():
+        store = get_blob_store()
+        if store is not None:
+            key = blob_key(job_id)
+            store.put(key, packed)
+            return {CODEC_KEY: "blob", "store": store.name, "key": key, "size": len(raw)}
+        print(f"Job {job_id} data is {len(packed)} bytes compressed; set JOB_BLOB_STORE to offload it")
+
+    return {CODEC_KEY: "zlib", "payload": packed, "size": len(raw)}
+
+
+def decode_job_data(data: Any) -> Any:
+    """Inverse of encode_job_data; plain payloads are returned unchanged."""
+    if not isinstance(data, dict) or CODEC_KEY not in data:
+        return data
+    try:
+        if data[CODEC_KEY] == "zlib":
+            payload = data["payload"]
+            # boto3 returns binary attributes wrapped in Binary
+            packed = bytes(getattr(payload, "value", payload))
+        elif data[CODEC_KEY] == "blob":
+            packed = get_blob_store().get(data["key"])
+        else:
+            return data
+        return json.loads(zlib.decompress(packed))
+    except Exception as e:
+        print(f"decode_job_data error ({data.get(CODEC_KEY)}): {e}")
+        return {"error": "Stored job data could not be decoded."}
+
+
+def delete_job_blobs(job_ids: List[str]):
+    """Best-effort removal of the offloaded data of removed jobs."""
+    store = get_blob_store()
+    if store is None or not job_ids:
+        return
+    try:
+        store.delete_many([blob_key(str(job_id)) for job_id in job_ids])
+    except Exception as e:
+        print(f"delete_job_blobs error: {e}")
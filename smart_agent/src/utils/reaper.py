@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+from .job_store import cleanup_stale_jobs, reconcile_job_counts
+from ..config.logger import Logger
+
+logger = Logger()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "running": False,
+    "sweeps": 0,
+    "errors": 0,
+    "jobs_reaped": 0,
+    "last_jobs_reaped": 0,
+    "last_sweep_seconds": 0.0,
+    "total_sweep_seconds": 0.0,
+    "last_sweep_at": None,
+    "last_counts_reconcile_at": None,
+}
+
+_stop_event = threading.Event()
+_thread = None
+_sweep_lock = threading.Lock()
+
+
+def get_reaper_interval() -> int:
+    """Seconds between two sweeps."""
+    return int(os.getenv('JOB_REAPER_INTERVAL_SECONDS', 60))
+
+
+def get_reaper_max_age() -> int:
+    """Age in seconds after which an in-progress job is considered stale."""
+    return int(os.getenv('JOB_REAPER_MAX_AGE_SECONDS', 15 * 60))
+
+
+def get_counts_reconcile_interval() -> int:
+    """Seconds between two rebuilds of this agent's job counters (0 disables them)."""
+    return int(os.getenv('JOB_COUNTS_RECONCILE_SECONDS', 60 * 60))
+
+
+def _reconcile_counts_if_due():
+    interval = get_counts_reconcile_interval()
+    with _stats_lock:
+        last = _stats["last_counts_reconcile_at"]
+    if interval <= 0 or (last is not None and time.time() - last < interval):
+        return
+    reconcile_job_counts({
+        'agent_name': os.getenv('AGENT_NAME', ''),
+        'environment': os.getenv('ENVIRONMENT', ''),
+    })
+    with _stats_lock:
+        _stats["last_counts_reconcile_at"] = int(time.time())
+
+
+def reap_stale_jobs() -> int:
+    """
+    Runs one sweep over this agent's jobs and records how long it took.
+
+    Returns:
+        int: Number of jobs removed
+    """
+    # Only one sweep at a time per process
+    if not _sweep_lock.acquire(blocking=False):
+        return 0
+    try:
+        started = time.monotonic()
+        reaped = 0
+        failed = False
+        try:
+            reaped = cleanup_stale_jobs(max_age_seconds=get_reaper_max_age())
+            # Counters miss TTL deletes, so rebuild them now and then
+            _reconcile_counts_if_due()
+        except Exception as e:
+            failed = True
+            logger.error('Error in reap_stale_jobs:', str(e))
+        elapsed = time.monotonic() - started
+
+        with _stats_lock:
+            _stats["sweeps"] += 1
+            _stats["errors"] += int(failed)
+            _stats["jobs_reaped"] += reaped
+            _stats["last_jobs_reaped"] = reaped
+            _stats["last_sweep_seconds"] = round(elapsed, 4)
+            _stats["total_sweep_seconds"] = round(_stats["total_sweep_seconds"] + elapsed, 4)
+            _stats["last_sweep_at"] = int(time.time())
+
+        if reaped:
+            print(f"Reaper removed {reaped} stale jobs in {elapsed:.3f}s")
+        return reaped
+    finally:
+        _sweep_lock.release()
+
+
+def _run():
+    interval = get_reaper_interval()
+    print(f"Job reaper started (interval={interval}s, max_age={get_reaper_max_age()}s)")
+    while not _stop_event.is_set():
+        reap_stale_jobs()
+        _stop_event.wait(interval)
+    print("Job reaper stopped")
+
+
+def is_reaper_running() -> bool:
+    return _thread is not None and _thread.is_alive()
+
+
+def start_reaper():
+    """Starts the background reaper thread unless disabled with JOB_REAPER_ENABLED=false."""
+    global _thread
+    if os.getenv('JOB_REAPER_ENABLED', 'true').lower() in ('false', '0', 'no'):
+        print("Job reaper disabled")
+        return
+    if is_reaper_running():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(target=_run, name='job-reaper', daemon=True)
+    _thread.start()
+    with _stats_lock:
+        _stats["running"] = True
+
+
+def stop_reaper(timeout: float = 5.0):
+    """Signals the reaper to stop and waits briefly for the current sweep."""
+    global _thread
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout)
+        _thread = None
+    with _stats_lock:
+        _stats["running"] = False
+
+
+def get_reaper_stats() -> dict:
+    """Counters for reaped jobs and sweep durations."""
+    with _stats_lock:
+        return dict(_stats)
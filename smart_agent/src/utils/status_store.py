@@ -0,0 +1,129 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .job_store import update_job_fields
+from ..config.logger import Logger
+
+logger = Logger()
+
+
+class WriteBehindStatusStore:
+    """
+    Buffers intermediate job field updates in memory and writes each job's
+    latest state on a short interval.
+
+    Updates for the same job coalesce, so a burst of in-progress statuses
+    costs one UpdateItem. Durable writes (terminal statuses, aborts) merge
+    anything still buffered and are written before returning. Writes for one
+    job are serialised so a late background flush can never overwrite a
+    durable write.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, lock_stripes: int = 64):
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._job_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._stats = {'buffered': 0, 'coalesced': 0, 'writes': 0, 'failed': 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='status-write-behind', daemon=True)
+        self._thread.start()
+
+    def _job_lock(self, job_id: str) -> threading.Lock:
+        return self._job_locks[hash(job_id) % len(self._job_locks)]
+
+    def update(self, job_id: str, updates: Dict[str, Any]):
+        """Buffer updates for job_id; they are written on the next flush."""
+        with self._pending_lock:
+            pending = self._pending.get(job_id)
+            if pending is None:
+                self._pending[job_id] = dict(updates)
+            else:
+                pending.update(updates)
+                self._stats['coalesced'] += 1
+            self._stats['buffered'] += 1
+
+    def write(self, job_id: str, updates: Dict[str, Any]) -> bool:
+        """Write updates for job_id now, together with anything still buffered for it."""
+        with self._job_lock(job_id):
+            with self._pending_lock:
+                merged = {**self._pending.pop(job_id, {}), **updates}
+            return self._write(job_id, merged)
+
+    def pending(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Buffered updates for job_id not yet written, if any."""
+        with self._pending_lock:
+            pending = self._pending.get(job_id)
+            return dict(pending) if pending is not None else None
+
+    def flush(self, job_id: str = None):
+        """Write buffered updates for one job, or for every job."""
+        with self._pending_lock:
+            job_ids = [job_id] if job_id is not None else list(self._pending)
+        for pending_id in job_ids:
+            with self._job_lock(pending_id):
+                with self._pending_lock:
+                    updates = self._pending.pop(pending_id, None)
+                if updates:
+                    self._write(pending_id, updates)
+
+    def stats(self) -> dict:
+        with self._pending_lock:
+            return {**self._stats, 'pending_jobs': len(self._pending)}
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _write(self, job_id: str, updates: Dict[str, Any]) -> bool:
+        ok = update_job_fields(job_id, updates)
+        with self._pending_lock:
+            self._stats['writes' if ok else 'failed'] += 1
+        return ok
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error('Error flushing buffered job status:', str(e))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def is_write_behind_enabled() -> bool:
+    return os.getenv('JOB_STATUS_WRITE_BEHIND', 'true').strip().lower() in ('1', 'true', 'yes')
+
+
+def get_status_store() -> WriteBehindStatusStore:
+    """Returns the process-wide write-behind store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                interval_ms = int(os.getenv('JOB_STATUS_FLUSH_INTERVAL_MS', '500'))
+                _store = WriteBehindStatusStore(flush_interval=interval_ms / 1000.0)
+    return _store
+
+
+def pending_job_updates(job_id: str) -> Optional[Dict[str, Any]]:
+    """Buffered updates for job_id, or None if there are none (or no store was started)."""
+    store = _store
+    return store.pending(str(job_id)) if store is not None else None
+
+
+def flush_status_store():
+    """Write every buffered update, if the store was started."""
+    store = _store
+    if store is not None:
+        store.flush()
+
+
+def get_status_store_stats():
+    """Stats of the write-behind store, or None if it has not been started."""
+    store = _store
+    return store.stats() if store is not None else None
@@ -1,9 +1,17 @@
 import os
+import base64
 import boto3
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 import json
-from typing import Dict, List, Optional, Any
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+
+from .job_cache import get_job_cache, invalidate_cached_job, is_job_cache_enabled
+from .payload_codec import CODEC_KEY, decode_job_data, delete_job_blobs, encode_job_data
 
 # Resolve jobs table name (shared across agents)
 # Prefer explicit env var; otherwise default to the shared table.
@@ -13,15 +21,174 @@ if not os.environ.get("JOB_TABLE"):
 
 print(f"Using DynamoDB table: {TABLE_NAME}")
 
-# Initialize DynamoDB resource
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(TABLE_NAME)
+# Job records carry an `expires_at` epoch attribute (enable DynamoDB TTL on it).
+# In-progress jobs get a short lease renewed by every in-progress update;
+# terminal jobs are kept for the retention window.
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", 15 * 60))
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", 24 * 60 * 60))
+
+# Number of parallel segments used for whole-table scans (1 = serial scan)
+JOB_SCAN_SEGMENTS = int(os.environ.get("JOB_SCAN_SEGMENTS", 4))
+
+# Jobs carry `agent_status` = "<agent_name>#<environment>#<status>", the hash key
+# of the agent-status-index GSI, so per-agent listings only read that agent's rows.
+AGENT_STATUS_INDEX = os.environ.get("JOB_AGENT_STATUS_INDEX", "agent-status-index")
+JOB_STATUSES = ("inprogress", "completed", "failed", "aborted", "error")
+
+# Bulk writes: DynamoDB accepts at most 25 requests per BatchWriteItem call
+BATCH_WRITE_MAX_ITEMS = 25
+JOB_BATCH_WORKERS = int(os.environ.get("JOB_BATCH_WORKERS", 4))
+JOB_BATCH_MAX_RETRIES = int(os.environ.get("JOB_BATCH_MAX_RETRIES", 5))
+
+# Errors worth retrying with backoff: DynamoDB is shedding load, not refusing the request
+RETRYABLE_ERROR_CODES = ("ProvisionedThroughputExceededException", "ThrottlingException",
+                         "RequestLimitExceeded", "InternalServerError")
+
+# Attempts at taking a capacity lease while DynamoDB throttles, before the job is refused
+JOB_LEASE_MAX_RETRIES = int(os.environ.get("JOB_LEASE_MAX_RETRIES", 3))
+
+# Seconds the describe_table result behind get_table_info/health_check is reused
+JOB_TABLE_INFO_TTL_SECONDS = int(os.environ.get("JOB_TABLE_INFO_TTL_SECONDS", 300))
+
+# The DynamoDB resource is created on first use rather than at import, so
+# importing this module (cold starts, controllers) costs no AWS round trip.
+_table = None
+_table_lock = threading.Lock()
+_table_info: Optional[Dict[str, Any]] = None
+_table_info_at = 0.0
+_table_info_lock = threading.Lock()
+
+# boto3 resources are not thread-safe, so scan workers each get their own table handle
+_thread_local = threading.local()
+_scan_executor: Optional[ThreadPoolExecutor] = None
+_scan_executor_lock = threading.Lock()
+
+
+def get_table():
+    """Shared table handle, created and verified once on first use."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                # DYNAMODB_ENDPOINT_URL points at a local stand-in
+                resource = boto3.resource("dynamodb", endpoint_url=os.environ.get("DYNAMODB_ENDPOINT_URL") or None)
+                _table = resource.Table(TABLE_NAME)
+                _initialize_table()
+    return _table
+
+
+def __getattr__(name: str):
+    # Keeps `temp_db.table` working for callers that used the old module attribute
+    if name == "table":
+        return get_table()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _thread_table():
+    """Table handle owned by the calling thread."""
+    thread_table = getattr(_thread_local, "table", None)
+    if thread_table is None:
+        session = boto3.session.Session()
+        resource = session.resource("dynamodb", endpoint_url=os.environ.get("DYNAMODB_ENDPOINT_URL") or None)
+        thread_table = _thread_local.table = resource.Table(TABLE_NAME)
+    return thread_table
+
+
+def _get_scan_executor() -> ThreadPoolExecutor:
+    global _scan_executor
+    if _scan_executor is None:
+        with _scan_executor_lock:
+            if _scan_executor is None:
+                _scan_executor = ThreadPoolExecutor(
+                    max_workers=max(JOB_SCAN_SEGMENTS, 1), thread_name_prefix="job-scan")
+    return _scan_executor
+
+
+def agent_status_key(agent_name: Optional[str], environment: Optional[str], status: str) -> str:
+    """Value of the agent_status attribute for an agent, environment and status."""
+    return f"{agent_name or ''}#{environment or ''}#{status}"
+
+
+def with_agent_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of job with its agent_status set from its agent, environment and status."""
+    job = dict(job)
+    if job.get("status"):
+        job["agent_status"] = agent_status_key(job.get("agent_name"), job.get("environment"), job["status"])
+    return job
+
+
+_agent_index_ready: Optional[bool] = None
+
+
+def _has_agent_status_index() -> bool:
+    """Whether the agent-status-index GSI exists and is queryable; checked once per process."""
+    global _agent_index_ready
+    if _agent_index_ready is None:
+        try:
+            description = _describe_table()
+            _agent_index_ready = any(
+                gsi["IndexName"] == AGENT_STATUS_INDEX and gsi.get("IndexStatus", "ACTIVE") == "ACTIVE"
+                and not gsi.get("Backfilling", False)
+                for gsi in description.get("GlobalSecondaryIndexes", [])
+            )
+        except ClientError as e:
+            print(f"describe_table error while looking for {AGENT_STATUS_INDEX}: {e}")
+            return False
+        if not _agent_index_ready:
+            print(f"Warning: GSI {AGENT_STATUS_INDEX} not found on {TABLE_NAME}, agent listings will use status-index")
+    return _agent_index_ready
+
+
+def job_expires_at(status: Optional[str], now: Optional[float] = None) -> int:
+    """Epoch second at which a job with the given status should expire."""
+    now = time.time() if now is None else now
+    ttl = JOB_LEASE_SECONDS if status == "inprogress" else JOB_RETENTION_SECONDS
+    return int(now) + ttl
+
+
+def is_job_expired(item: Optional[Dict[str, Any]], now: Optional[float] = None) -> bool:
+    """DynamoDB TTL deletes lazily, so reads treat expired rows as absent."""
+    expires_at = item.get("expires_at") if item else None
+    if expires_at is None:
+        return False
+    now = time.time() if now is None else now
+    return float(expires_at) <= now
+
 
-def get_table_info() -> Dict[str, Any]:
-    """Get information about the DynamoDB table"""
+def _drop_expired(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    now = time.time()
+    return [item for item in items if not is_job_expired(item, now)]
+
+
+def _decode_job(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Decode a compressed or offloaded `data` attribute in place (see payload_codec)."""
+    if item and isinstance(item.get("data"), dict) and CODEC_KEY in item["data"]:
+        item["data"] = decode_job_data(item["data"])
+    return item
+
+
+def _read_items(items: List[Dict[str, Any]], include_expired: bool = False) -> List[Dict[str, Any]]:
+    """Items of a query/scan page as callers see them: unexpired and decoded."""
+    return [_decode_job(item) for item in (items if include_expired else _drop_expired(items))]
+
+def _describe_table(max_age: Optional[float] = None) -> Dict[str, Any]:
+    """describe_table output, reused for max_age seconds (JOB_TABLE_INFO_TTL_SECONDS by default)."""
+    global _table_info, _table_info_at
+    max_age = JOB_TABLE_INFO_TTL_SECONDS if max_age is None else max_age
+    with _table_info_lock:
+        if _table_info is not None and time.monotonic() - _table_info_at < max_age:
+            return _table_info
+    response = get_table().meta.client.describe_table(TableName=TABLE_NAME)
+    with _table_info_lock:
+        _table_info = response['Table']
+        _table_info_at = time.monotonic()
+        return _table_info
+
+
+def get_table_info(max_age: Optional[float] = None) -> Dict[str, Any]:
+    """Get information about the DynamoDB table (cached, see _describe_table)"""
     try:
-        response = table.meta.client.describe_table(TableName=TABLE_NAME)
-        table_info = response['Table']
+        table_info = _describe_table(max_age)
         return {
             "table_name": table_info['TableName'],
             "table_status": table_info['TableStatus'],
@@ -41,25 +208,43 @@ def get_table_info() -> Dict[str, Any]:
         print(f"get_table_info error: {e}")
         return {"error": str(e)}
 
-def get_job(job_id: str) -> Optional[Dict[str, Any]]:
-    """Get a specific job by ID"""
-    print("GET JOB IS CALLED")
-    print(f"get_job called with job_id: {job_id}")
+def get_job(job_id: str, projection: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Get a specific job by ID, optionally reading only the `projection` attributes"""
     if not job_id:
         print("get_job error: job_id is empty")
         return None
     try:
-        response = table.get_item(Key={"id": job_id})
-        print(f"get_job response: {response}")
-        return response.get("Item")
+        response = get_table().get_item(Key={"id": job_id}, **_projection_kwargs(projection, ["id"]))
+        item = response.get("Item")
+        if is_job_expired(item):
+            print(f"get_job: job {job_id} has expired")
+            return None
+        return _decode_job(item)
     except ClientError as e:
         print(f"get_job error: {e}")
         return None
 
+def get_cached_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    get_job through the short-TTL read-through cache, for hot polling paths
+    such as /status. Jobs written by this process are invalidated at once;
+    writes from other processes show up within JOB_CACHE_TTL_MS.
+    """
+    if not job_id or not is_job_cache_enabled():
+        return get_job(job_id)
+    return get_job_cache().get(str(job_id), get_job)
+
+
 def add_job(job: Dict[str, Any]) -> bool:
     """Add a new job to the table"""
     try:
-        table.put_item(Item=job)
+        job = with_agent_status(job)
+        job.setdefault("expires_at", job_expires_at(job.get("status")))
+        if "data" in job:
+            job["data"] = encode_job_data(job["id"], job["data"])
+        response = get_table().put_item(Item=job, ReturnValues="ALL_OLD")
+        invalidate_cached_job(job.get("id"))
+        _record_status_change(response.get("Attributes"), job)
         print(f"Added job: {job.get('id', 'unknown')} to table {TABLE_NAME}")
         return True
     except ClientError as e:
@@ -69,13 +254,137 @@ def add_job(job: Dict[str, Any]) -> bool:
 def remove_job(job_id: str) -> bool:
     """Remove a job from the table"""
     try:
-        table.delete_item(Key={"id": job_id})
+        response = get_table().delete_item(Key={"id": job_id}, ReturnValues="ALL_OLD")
+        invalidate_cached_job(job_id)
+        old_job = response.get("Attributes")
+        _record_status_change(old_job, None)
+        if old_job and isinstance(old_job.get("data"), dict) and old_job["data"].get(CODEC_KEY) == "blob":
+            delete_job_blobs([job_id])
         print(f"Removed job: {job_id} from table {TABLE_NAME}")
         return True
     except ClientError as e:
         print(f"remove_job error: {e}")
         return False
 
+def _write_batch(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Send one BatchWriteItem of at most 25 requests, retrying unprocessed
+    items with exponential backoff.
+
+    Returns:
+        list: Requests still unprocessed after the last retry
+    """
+    client = _thread_table().meta.client
+    pending = requests
+    for attempt in range(JOB_BATCH_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(min(0.05 * 2 ** (attempt - 1), 2.0))
+        try:
+            response = client.batch_write_item(RequestItems={TABLE_NAME: pending})
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code not in RETRYABLE_ERROR_CODES:
+                print(f"batch_write_item error: {e}")
+                return pending
+            continue
+        pending = response.get("UnprocessedItems", {}).get(TABLE_NAME, [])
+        if not pending:
+            return []
+    return pending
+
+
+def batch_write_jobs(puts: Optional[List[Dict[str, Any]]] = None,
+                     delete_ids: Optional[List[str]] = None,
+                     workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Put and delete many jobs with BatchWriteItem.
+
+    Requests are chunked into batches of 25, unprocessed items are retried
+    with backoff, and batches are sent from up to `workers` threads
+    (JOB_BATCH_WORKERS by default). A job id may appear once per call.
+
+    Returns:
+        dict: {"written": n, "deleted": n, "failed": n, "failed_ids": [...]}
+    """
+    put_items = {}
+    for job in puts or []:
+        job = with_agent_status(job)
+        job.setdefault("expires_at", job_expires_at(job.get("status")))
+        if "data" in job:
+            job["data"] = encode_job_data(job["id"], job["data"])
+        put_items[job["id"]] = job
+    delete_ids = [job_id for job_id in dict.fromkeys(delete_ids or []) if job_id and job_id not in put_items]
+
+    requests = [{"PutRequest": {"Item": job}} for job in put_items.values()]
+    requests += [{"DeleteRequest": {"Key": {"id": job_id}}} for job_id in delete_ids]
+    if not requests:
+        return {"written": 0, "deleted": 0, "failed": 0, "failed_ids": []}
+
+    batches = [requests[i:i + BATCH_WRITE_MAX_ITEMS] for i in range(0, len(requests), BATCH_WRITE_MAX_ITEMS)]
+    workers = min(workers or JOB_BATCH_WORKERS, len(batches))
+    try:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-batch") as executor:
+                unprocessed = [req for left in executor.map(_write_batch, batches) for req in left]
+        else:
+            unprocessed = [req for batch in batches for req in _write_batch(batch)]
+    finally:
+        # Invalidate once the writes have landed, so no reader re-caches the old record meanwhile
+        for job_id in [*put_items, *delete_ids]:
+            invalidate_cached_job(job_id)
+
+    failed_puts = {req["PutRequest"]["Item"]["id"] for req in unprocessed if "PutRequest" in req}
+    failed_ids = [req["DeleteRequest"]["Key"]["id"] for req in unprocessed if "DeleteRequest" in req]
+    # Bulk puts are counted as new jobs; deleted jobs are counted by remove_jobs
+    _adjust_job_counts(_count_deltas(
+        [job for job_id, job in put_items.items() if job_id not in failed_puts], 1))
+
+    result = {
+        "written": len(put_items) - len(failed_puts),
+        "deleted": len(delete_ids) - len(failed_ids),
+        "failed": len(unprocessed),
+        "failed_ids": [*failed_puts, *failed_ids],
+    }
+    if result["failed"]:
+        print(f"batch_write_jobs: {result['failed']} requests unprocessed after retries in table {TABLE_NAME}")
+    return result
+
+
+def remove_jobs(job_ids: List[str], workers: Optional[int] = None,
+                records: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+    """Remove several jobs using batched deletes.
+
+    Args:
+        job_ids: Jobs to remove
+        workers: Threads sending batches (JOB_BATCH_WORKERS by default)
+        records: Already-read jobs by id (with status, agent_name and
+            environment) used to update the job counters; jobs missing from
+            it are read with BatchGetItem first
+
+    Returns:
+        int: Number of jobs removed
+    """
+    try:
+        job_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id]
+        records = dict(records or {})
+        missing = [job_id for job_id in job_ids if job_id not in records]
+        if missing:
+            records.update(_get_job_records(missing))
+
+        result = batch_write_jobs(delete_ids=job_ids, workers=workers)
+        failed = set(result["failed_ids"])
+        _adjust_job_counts(_count_deltas(
+            [records[job_id] for job_id in job_ids if job_id in records and job_id not in failed], -1))
+        delete_job_blobs([job_id for job_id in job_ids if job_id not in failed])
+
+        removed = result["deleted"]
+        if removed:
+            print(f"Removed {removed} jobs from table {TABLE_NAME}")
+        return removed
+    except Exception as e:
+        print(f"remove_jobs error: {e}")
+        return 0
+
 def _build_filter_expression(filters: Optional[Dict[str, Any]]):
     """Build a DynamoDB Attr-based filter expression from a simple dict."""
     if not filters:
@@ -87,77 +396,251 @@ def _build_filter_expression(filters: Optional[Dict[str, Any]]):
     return expr
 
 
-def list_active_jobs(status_filter: str = "inprogress", filters: Optional[Dict[str, Any]] = None, strong_consistent: bool = False) -> List[Dict[str, Any]]:
+def encode_cursor(key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a DynamoDB start key as an opaque, URL-safe cursor string."""
+    if not key:
+        return None
+    raw = json.dumps({k: str(v) if isinstance(v, str) else int(v) for k, v in key.items()}, sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor back into a start key."""
+    if not cursor:
+        return None
+    return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+
+
+def _projection_kwargs(projection: Optional[List[str]], key_attrs: List[str]) -> Dict[str, Any]:
+    """ProjectionExpression for the given attributes plus the keys and expiry reads rely on."""
+    if not projection:
+        return {}
+    attrs = list(dict.fromkeys(list(projection) + key_attrs + ["expires_at"]))
+    names = {f"#p{i}": attr for i, attr in enumerate(attrs)}
+    return {
+        "ProjectionExpression": ", ".join(names.keys()),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def _listing_request(status: Optional[str], filters: Optional[Dict[str, Any]],
+                     projection: Optional[List[str]], strong_consistent: bool):
+    """Build the query/scan call, its kwargs and key attributes for a job listing."""
+    filter_expr = _build_filter_expression(filters)
+
+    filters = filters or {}
+    if (status is not None and not strong_consistent and "agent_name" in filters
+            and "environment" in filters and _has_agent_status_index()):
+        # Agent-scoped GSI query; only this agent's rows with the status are read
+        key_attrs = ["id", "agent_status"]
+        rest = {k: v for k, v in filters.items() if k not in ("agent_name", "environment")}
+        kwargs: Dict[str, Any] = {
+            "IndexName": AGENT_STATUS_INDEX,
+            "KeyConditionExpression": Key("agent_status").eq(
+                agent_status_key(filters["agent_name"], filters["environment"], status)),
+        }
+        rest_expr = _build_filter_expression(rest)
+        if rest_expr is not None:
+            kwargs["FilterExpression"] = rest_expr
+        kwargs.update(_projection_kwargs(projection, key_attrs))
+        return get_table().query, kwargs, key_attrs
+
+    if status is not None and not strong_consistent:
+        # GSI query; the start key of a status-index page holds both keys
+        key_attrs = ["id", "status"]
+        kwargs = {
+            "IndexName": "status-index",
+            "KeyConditionExpression": Key("status").eq(status),
+        }
+        if filter_expr is not None:
+            kwargs["FilterExpression"] = filter_expr
+        kwargs.update(_projection_kwargs(projection, key_attrs))
+        return get_table().query, kwargs, key_attrs
+
+    # Scan; skip bookkeeping records (e.g. capacity leases) that share the table
+    key_attrs = ["id"]
+    scan_filter = Attr("record_type").not_exists()
+    if status is not None:
+        scan_filter = scan_filter & Attr("status").eq(status)
+    if filter_expr is not None:
+        scan_filter = scan_filter & filter_expr
+    kwargs = {"FilterExpression": scan_filter}
+    if strong_consistent:
+        kwargs["ConsistentRead"] = True
+    kwargs.update(_projection_kwargs(projection, key_attrs))
+    return get_table().scan, kwargs, key_attrs
+
+
+def iter_job_pages(status: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                   projection: Optional[List[str]] = None, page_size: Optional[int] = None,
+                   cursor: Optional[str] = None, strong_consistent: bool = False,
+                   include_expired: bool = False):
+    """
+    Lazily yield pages of jobs as (items, next_cursor), following LastEvaluatedKey.
+
+    With a status, the status-index GSI is queried (or the table scanned with
+    ConsistentRead if strong_consistent); without one, the table is scanned.
+    next_cursor is None on the last page. Expired jobs are left out unless
+    include_expired is set (cleanup sweeps want them).
+    """
+    call, kwargs, _ = _listing_request(status, filters, projection, strong_consistent)
+    if page_size:
+        kwargs["Limit"] = page_size
+    start_key = decode_cursor(cursor)
+
+    while True:
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = call(**kwargs)
+        start_key = response.get("LastEvaluatedKey")
+        items = response.get("Items", [])
+        yield _read_items(items, include_expired), encode_cursor(start_key)
+        if not start_key:
+            return
+
+
+def iter_jobs(status: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+              limit: Optional[int] = None, projection: Optional[List[str]] = None,
+              page_size: Optional[int] = None, cursor: Optional[str] = None,
+              strong_consistent: bool = False, include_expired: bool = False):
+    """
+    Lazily yield jobs one by one across pages, stopping after `limit` items.
+
+    Pages are only fetched as the caller iterates, so stopping early (e.g. once
+    enough active jobs were seen) avoids reading the rest of the table.
+    """
+    count = 0
+    for items, _ in iter_job_pages(status, filters, projection, page_size, cursor,
+                                   strong_consistent, include_expired):
+        for item in items:
+            yield item
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def list_jobs_page(status: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                   limit: int = 100, projection: Optional[List[str]] = None,
+                   cursor: Optional[str] = None, strong_consistent: bool = False) -> Dict[str, Any]:
+    """
+    Return up to `limit` jobs and a cursor to resume after the last one.
+
+    Returns:
+        dict: {"items": [...], "cursor": str or None when there are no more jobs}
+    """
+    _, _, key_attrs = _listing_request(status, filters, projection, strong_consistent)
+    items: List[Dict[str, Any]] = []
+    for page, page_cursor in iter_job_pages(status, filters, projection, limit, cursor, strong_consistent):
+        for item in page:
+            if len(items) == limit:
+                # Stopped mid-page: resume right after the last item handed out
+                last = items[-1]
+                return {"items": items, "cursor": encode_cursor({k: last[k] for k in key_attrs if k in last})}
+            items.append(item)
+        if not page_cursor or len(items) == limit:
+            return {"items": items, "cursor": page_cursor}
+    return {"items": items, "cursor": None}
+
+
+def iter_jobs_parallel(filters: Optional[Dict[str, Any]] = None, projection: Optional[List[str]] = None,
+                       segments: Optional[int] = None, include_expired: bool = False):
+    """
+    Scan the whole table as `segments` parallel segments (Segment/TotalSegments)
+    and yield jobs as soon as any segment returns a page.
+
+    Items from different segments are interleaved; no order is guaranteed.
+    Falls back to a serial scan when segments is 1.
+    """
+    segments = segments or JOB_SCAN_SEGMENTS
+    if segments <= 1:
+        yield from iter_jobs(filters=filters, projection=projection, include_expired=include_expired)
+        return
+
+    _, kwargs, _ = _listing_request(None, filters, projection, strong_consistent=False)
+    pages: "queue.Queue" = queue.Queue(maxsize=segments * 2)
+    stop = threading.Event()
+
+    def scan_segment(segment: int):
+        try:
+            seg_kwargs = {**kwargs, "Segment": segment, "TotalSegments": segments}
+            if "ExpressionAttributeNames" in seg_kwargs:
+                seg_kwargs["ExpressionAttributeNames"] = dict(seg_kwargs["ExpressionAttributeNames"])
+            seg_table = _thread_table()
+            while not stop.is_set():
+                response = seg_table.scan(**seg_kwargs)
+                items = response.get("Items", [])
+                pages.put(("items", _read_items(items, include_expired)))
+                if "LastEvaluatedKey" not in response:
+                    break
+                seg_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except Exception as e:
+            pages.put(("error", e))
+        finally:
+            pages.put(("done", None))
+
+    executor = _get_scan_executor()
+    for segment in range(segments):
+        executor.submit(scan_segment, segment)
+
+    finished = 0
+    try:
+        while finished < segments:
+            kind, value = pages.get()
+            if kind == "done":
+                finished += 1
+            elif kind == "error":
+                raise value
+            else:
+                yield from value
+    finally:
+        # Stop the remaining segments and unblock any waiting on a full queue
+        stop.set()
+        while finished < segments:
+            if pages.get()[0] == "done":
+                finished += 1
+
+
+def list_active_jobs(status_filter: str = "inprogress", filters: Optional[Dict[str, Any]] = None,
+                     strong_consistent: bool = False, limit: Optional[int] = None,
+                     projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """List jobs with specific status.
 
     If strong_consistent is True, perform a strongly consistent Scan on the base table
     (GSIs do not support consistent reads). Otherwise, use the status-index GSI.
+    All pages are read unless `limit` stops the listing early.
     """
     try:
-        filter_expr = _build_filter_expression(filters)
-
-        if strong_consistent:
-            scan_filters = Attr("status").eq(status_filter)
-            if filter_expr is not None:
-                scan_filters = scan_filters & filter_expr
-            response = table.scan(
-                FilterExpression=scan_filters,
-                ConsistentRead=True,
-            )
-            jobs = response.get("Items", [])
-            print(f"Strong-consistent scan found {len(jobs)} jobs with status '{status_filter}' in table {TABLE_NAME} filters={filters}")
-            return jobs
-
-        # Default: use GSI for performance
-        key_cond = boto3.dynamodb.conditions.Key("status").eq(status_filter)
-        if filter_expr is not None:
-            response = table.query(
-                IndexName="status-index",
-                KeyConditionExpression=key_cond,
-                FilterExpression=filter_expr,
-            )
-        else:
-            response = table.query(
-                IndexName="status-index",
-                KeyConditionExpression=key_cond,
-            )
-        jobs = response.get("Items", [])
-        print(f"GSI query found {len(jobs)} jobs with status '{status_filter}' in table {TABLE_NAME} filters={filters}")
+        jobs = list(iter_jobs(status_filter, filters, limit=limit, projection=projection,
+                              strong_consistent=strong_consistent))
+        path = "Strong-consistent scan" if strong_consistent else "GSI query"
+        print(f"{path} found {len(jobs)} jobs with status '{status_filter}' in table {TABLE_NAME} filters={filters}")
         return jobs
     except ClientError as e:
         print(f"list_active_jobs error (primary path): {e}")
         # Fallback to eventually-consistent scan
         try:
-            scan_filters = Attr("status").eq(status_filter)
-            extra = _build_filter_expression(filters)
-            if extra is not None:
-                scan_filters = scan_filters & extra
-            response = table.scan(
-                FilterExpression=scan_filters
-            )
-            jobs = response.get("Items", [])
+            call, kwargs, _ = _listing_request(status_filter, filters, projection, strong_consistent=True)
+            kwargs.pop("ConsistentRead", None)
+            jobs: List[Dict[str, Any]] = []
+            while True:
+                response = call(**kwargs)
+                jobs.extend(_read_items(response.get("Items", [])))
+                if "LastEvaluatedKey" not in response or (limit is not None and len(jobs) >= limit):
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            jobs = jobs[:limit] if limit is not None else jobs
             print(f"Fallback scan found {len(jobs)} jobs with status '{status_filter}' in table {TABLE_NAME} filters={filters}")
             return jobs
         except ClientError as scan_error:
             print(f"list_active_jobs scan fallback error: {scan_error}")
             return []
 
-def list_all_jobs(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-    """List all jobs in the table, with optional filters."""
+def list_all_jobs(filters: Optional[Dict[str, Any]] = None,
+                  projection: Optional[List[str]] = None,
+                  segments: Optional[int] = None) -> List[Dict[str, Any]]:
+    """List all jobs in the table, with optional filters, using a parallel segmented scan."""
     try:
-        scan_kwargs: Dict[str, Any] = {}
-        filter_expr = _build_filter_expression(filters)
-        if filter_expr is not None:
-            scan_kwargs["FilterExpression"] = filter_expr
-
-        response = table.scan(**scan_kwargs)
-        jobs = response.get("Items", [])
-
-        # Handle pagination if there are more items
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **scan_kwargs)
-            jobs.extend(response.get("Items", []))
-
+        jobs = list(iter_jobs_parallel(filters=filters, projection=projection, segments=segments))
         print(f"Found {len(jobs)} total jobs in table {TABLE_NAME} with filters={filters}")
         return jobs
     except ClientError as e:
@@ -170,40 +653,105 @@ def update_job_fields(job_id: str, updates: Dict[str, Any]) -> bool:
     
     Args:
         job_id: The job ID to update
-        updates: Dictionary of field names and values to update
+        updates: Dictionary of field names and values to update. A status
+            change may carry the job's agent_name/environment (from its job
+            context); the current agent's are assumed otherwise.
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        # Build update expression
-        update_expr = "SET " + ", ".join(f"#{k} = :{k}" for k in updates.keys())
-        expression_attrs = {f"#{k}": k for k in updates.keys()}
-        value_attrs = {f":{k}": v for k, v in updates.items()}
-        
-        table.update_item(
+        # Any status change moves the expiry; in-progress updates act as heartbeats
+        if "status" in updates and "expires_at" not in updates:
+            updates = {**updates, "expires_at": job_expires_at(updates["status"])}
+
+        if "data" in updates:
+            updates = {**updates, "data": encode_job_data(job_id, updates["data"])}
+
+        # A status change also writes agent_status, so it is conditional on the job's
+        # owner; if the job belongs to another agent, retry once with the stored owner
+        owner: Dict[str, Any] = {}
+        if "status" in updates:
+            owner = {attr: updates.get(attr, os.getenv(attr.upper(), "")) for attr in ("agent_name", "environment")}
+
+        for attempt in range(2):
+            fields = dict(updates)
+            kwargs: Dict[str, Any] = {}
+            if owner:
+                fields.update(owner)
+                fields["agent_status"] = agent_status_key(owner["agent_name"], owner["environment"], updates["status"])
+                kwargs = {
+                    "ConditionExpression": "(attribute_not_exists(#agent_name) OR #agent_name = :agent_name) "
+                                           "AND (attribute_not_exists(#environment) OR #environment = :environment)",
+                    "ReturnValues": "UPDATED_OLD",
+                }
+
+            # Build update expression
+            update_expr = "SET " + ", ".join(f"#{k} = :{k}" for k in fields.keys())
+            expression_attrs = {f"#{k}": k for k in fields.keys()}
+            value_attrs = {f":{k}": v for k, v in fields.items()}
+
+            try:
+                response = get_table().update_item(
+                    Key={"id": job_id},
+                    UpdateExpression=update_expr,
+                    ExpressionAttributeNames=expression_attrs,
+                    ExpressionAttributeValues=value_attrs,
+                    **kwargs
+                )
+                break
+            except ClientError as e:
+                if not owner or attempt or e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                stored = get_table().get_item(
+                    Key={"id": job_id},
+                    ProjectionExpression="#agent_name, #environment",
+                    ExpressionAttributeNames={"#agent_name": "agent_name", "#environment": "environment"},
+                    ConsistentRead=True,
+                ).get("Item", {})
+                owner = {attr: stored.get(attr, "") for attr in owner}
+
+        invalidate_cached_job(job_id)
+        if owner:
+            # UPDATED_OLD holds the old status and owner, all the counters need
+            _record_status_change(response.get("Attributes") or {}, fields)
+        print(f"Updated job {job_id} with fields: {list(fields.keys())} in table {TABLE_NAME}")
+        return True
+    except ClientError as e:
+        print(f"update_job_fields error: {e}")
+        return False
+
+def heartbeat_job(job_id: str) -> bool:
+    """Extend the lease of an in-progress job and mark it as seen alive, without touching its other fields."""
+    try:
+        now = int(time.time())
+        get_table().update_item(
             Key={"id": job_id},
-            UpdateExpression=update_expr,
-            ExpressionAttributeNames=expression_attrs,
-            ExpressionAttributeValues=value_attrs
+            UpdateExpression="SET #expires_at = :expires_at, #heartbeat_at = :now",
+            ConditionExpression="#status = :inprogress",
+            ExpressionAttributeNames={"#expires_at": "expires_at", "#heartbeat_at": "heartbeat_at", "#status": "status"},
+            ExpressionAttributeValues={
+                ":expires_at": job_expires_at("inprogress", now),
+                ":now": now,
+                ":inprogress": "inprogress",
+            },
         )
-        print(f"Updated job {job_id} with fields: {list(updates.keys())} in table {TABLE_NAME}")
         return True
     except ClientError as e:
-        print(f"update_job_fields error: {e}")
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            print(f"heartbeat_job error: {e}")
         return False
 
 def get_jobs_by_status(status: str) -> List[Dict[str, Any]]:
     """Get all jobs with a specific status (alias for list_active_jobs)"""
     return list_active_jobs(status)
 
-def get_job_count_by_status() -> Dict[str, int]:
+def get_job_count_by_status(segments: Optional[int] = None) -> Dict[str, int]:
     """Get count of jobs grouped by status"""
     try:
-        all_jobs = list_all_jobs()
         status_counts = {}
-        
-        for job in all_jobs:
+
+        for job in iter_jobs_parallel(projection=["status"], segments=segments):
             status = job.get("status", "unknown")
             status_counts[status] = status_counts.get(status, 0) + 1
         
@@ -229,16 +777,18 @@ def cleanup_completed_jobs(max_age_hours: int = 24) -> int:
         cutoff_time = datetime.datetime.utcnow() - datetime.timedelta(hours=max_age_hours)
         cutoff_timestamp = cutoff_time.timestamp()
         
-        completed_jobs = get_jobs_by_status("completed")
-        cleaned_count = 0
-        
+        completed_jobs = iter_jobs("completed", projection=["completed_at", "updated_at", *COUNT_ATTRIBUTES],
+                                   include_expired=True)
+        expired = {}
+
         for job in completed_jobs:
             # Assuming jobs have a 'completed_at' or 'updated_at' timestamp
             job_timestamp = job.get('completed_at') or job.get('updated_at')
             
             if job_timestamp and float(job_timestamp) < cutoff_timestamp:
-                if remove_job(job['id']):
-                    cleaned_count += 1
+                expired[job['id']] = job
+
+        cleaned_count = remove_jobs(list(expired), records=expired)
         
         print(f"Cleaned up {cleaned_count} completed jobs older than {max_age_hours} hours from table {TABLE_NAME}")
         return cleaned_count
@@ -259,33 +809,432 @@ def _current_agent_filters() -> Dict[str, Any]:
     return filters
 
 
-def cleanup_stale_jobs(max_age_seconds: int = 900) -> int:
+def cleanup_stale_jobs(max_age_seconds: int = 900, segments: Optional[int] = None) -> int:
     """Remove this agent's jobs that are no longer active or are older than the given age."""
     try:
-        import time
-
         now = time.time()
         filters = _current_agent_filters()
-        all_jobs = list_all_jobs(filters=filters)
-        cleaned = 0
+        projection = ["timestamp", "heartbeat_at", *COUNT_ATTRIBUTES]
+        if len(filters) == 2 and _has_agent_status_index():
+            # One agent-scoped query per status this agent may hold
+            statuses = sorted(set(JOB_STATUSES) | set(get_job_counts(filters["agent_name"], filters["environment"])))
+            all_jobs = (job for status in statuses
+                        for job in iter_jobs(status, filters, projection=projection, include_expired=True))
+        else:
+            all_jobs = iter_jobs_parallel(filters=filters, projection=projection,
+                                          segments=segments, include_expired=True)
+        stale = {}
 
         for job in all_jobs:
             job_id = job.get("id")
             status = job.get("status")
-            timestamp = float(job.get("timestamp", 0))
+            # Age counts from the last heartbeat, so long-running jobs are not reaped mid-run
+            timestamp = float(job.get("heartbeat_at") or job.get("timestamp", 0))
 
-            if status != "inprogress" or (timestamp and now - timestamp > max_age_seconds):
-                if job_id and remove_job(job_id):
-                    cleaned += 1
+            if job_id and (status != "inprogress" or (timestamp and now - timestamp > max_age_seconds)
+                           or is_job_expired(job, now)):
+                stale[job_id] = job
 
+        cleaned = remove_jobs(list(stale), records=stale)
         if cleaned:
             print(f"Cleaned up {cleaned} stale jobs from table {TABLE_NAME} for filters={filters}")
 
+        # Frees any leases still held by the jobs removed above
+        reconcile_capacity_leases()
+
         return cleaned
     except Exception as e:
         print(f"cleanup_stale_jobs error: {e}")
         return 0
 
+# Per-status job counters: one aggregate item per agent/environment holding a
+# `count_<status>` number per status, adjusted with ADD on every status change.
+# The ADD is a separate UpdateItem after the job write rather than part of one
+# transaction (which would need the old status up front and make every job write
+# contend on the counters item), so the counts are eventually consistent: a
+# failed or lost ADD and TTL deletes leave them off until reconcile_job_counts
+# rebuilds them, every JOB_COUNTS_RECONCILE_SECONDS. Use them for metrics, not
+# for admission decisions.
+COUNT_ATTRIBUTES = ["status", "agent_name", "environment"]
+
+
+def _counts_key(agent_name: str, environment: str) -> str:
+    """Key of the counters record for an agent/environment."""
+    return f"counts#{agent_name}#{environment}"
+
+
+def _count_deltas(jobs: List[Optional[Dict[str, Any]]], sign: int) -> Dict[Tuple[str, str], Dict[str, int]]:
+    """Group +1/-1 per (agent_name, environment) and status for the given jobs."""
+    deltas: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for job in jobs:
+        if not job or not job.get("status"):
+            continue
+        by_status = deltas.setdefault((job.get("agent_name", ""), job.get("environment", "")), {})
+        by_status[job["status"]] = by_status.get(job["status"], 0) + sign
+    return deltas
+
+
+def _adjust_job_counts(deltas: Dict[Tuple[str, str], Dict[str, int]]) -> None:
+    """
+    Apply counter deltas, one atomic UpdateItem per agent/environment, after
+    the job write they describe; if this fails or the process dies first, the
+    counters stay off until the next reconcile.
+    """
+    for (agent_name, environment), by_status in deltas.items():
+        by_status = {status: delta for status, delta in by_status.items() if delta}
+        if not by_status:
+            continue
+        names = {"#record_type": "record_type", "#version": "version"}
+        values: Dict[str, Any] = {":record_type": "counts", ":one": 1}
+        adds = ["#version :one"]
+        for i, (status, delta) in enumerate(by_status.items()):
+            names[f"#c{i}"] = f"count_{status}"
+            values[f":d{i}"] = delta
+            adds.append(f"#c{i} :d{i}")
+        try:
+            get_table().update_item(
+                Key={"id": _counts_key(agent_name, environment)},
+                UpdateExpression="SET #record_type = :record_type ADD " + ", ".join(adds),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+        except ClientError as e:
+            # Counters drift until the next reconcile_job_counts; the job write itself succeeded
+            print(f"_adjust_job_counts error: {e}")
+
+
+def _record_status_change(old_job: Optional[Dict[str, Any]], new_job: Optional[Dict[str, Any]]) -> None:
+    """Move one job between status counters after a put, update or delete."""
+    def counted_as(job):
+        return tuple((job or {}).get(attr) for attr in COUNT_ATTRIBUTES)
+
+    if counted_as(old_job) == counted_as(new_job):
+        return
+    deltas = _count_deltas([old_job], -1)
+    for key, by_status in _count_deltas([new_job], 1).items():
+        merged = deltas.setdefault(key, {})
+        for status, delta in by_status.items():
+            merged[status] = merged.get(status, 0) + delta
+    _adjust_job_counts(deltas)
+
+
+def _get_job_records(job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Read the counter attributes of several jobs with BatchGetItem (100 keys per call)."""
+    records: Dict[str, Dict[str, Any]] = {}
+    client = get_table().meta.client
+    names = {f"#p{i}": attr for i, attr in enumerate(["id", *COUNT_ATTRIBUTES])}
+    for start in range(0, len(job_ids), 100):
+        request = {TABLE_NAME: {
+            "Keys": [{"id": job_id} for job_id in job_ids[start:start + 100]],
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }}
+        for attempt in range(JOB_BATCH_MAX_RETRIES + 1):
+            try:
+                response = client.batch_get_item(RequestItems=request)
+            except ClientError as e:
+                print(f"_get_job_records error: {e}")
+                break
+            for item in response.get("Responses", {}).get(TABLE_NAME, []):
+                records[item["id"]] = item
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            time.sleep(min(0.05 * 2 ** attempt, 2.0))
+    return records
+
+
+def get_job_counts(agent_name: Optional[str] = None, environment: Optional[str] = None) -> Dict[str, int]:
+    """
+    Read the per-status job counts of an agent/environment (the current one by
+    default) with a single GetItem. The counts are eventually consistent and
+    only as fresh as the last reconcile (JOB_COUNTS_RECONCILE_SECONDS).
+    """
+    if agent_name is None:
+        agent_name = os.getenv('AGENT_NAME', '')
+    if environment is None:
+        environment = os.getenv('ENVIRONMENT', '')
+    try:
+        response = get_table().get_item(Key={"id": _counts_key(agent_name, environment)})
+        item = response.get("Item", {})
+        return {
+            name[len("count_"):]: int(value)
+            for name, value in item.items()
+            if name.startswith("count_") and int(value) > 0
+        }
+    except ClientError as e:
+        print(f"get_job_counts error: {e}")
+        return {}
+
+
+def reconcile_job_counts(filters: Optional[Dict[str, Any]] = None,
+                         segments: Optional[int] = None) -> Dict[Tuple[str, str], Dict[str, int]]:
+    """
+    Rebuild the counters records from a scan of the jobs matching filters
+    (every agent by default), e.g. after TTL deletes or a crash between a job
+    write and its counter update.
+
+    Every counter adjustment bumps the record's version; a record whose version
+    moved during the scan is left alone (the scan may have missed that change)
+    and picked up by the next reconcile.
+
+    Returns:
+        dict: Counts by (agent_name, environment) and status as written
+    """
+    versions = _get_counts_versions(filters)
+    counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for job in iter_jobs_parallel(filters=filters, projection=COUNT_ATTRIBUTES,
+                                  segments=segments, include_expired=True):
+        for key, by_status in _count_deltas([job], 1).items():
+            merged = counts.setdefault(key, {})
+            for status, delta in by_status.items():
+                merged[status] = merged.get(status, 0) + delta
+
+    # Agents named by the filters are rewritten even when they have no jobs left
+    filters = filters or {}
+    if "agent_name" in filters and "environment" in filters:
+        counts.setdefault((filters["agent_name"], filters["environment"]), {})
+
+    written: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for (agent_name, environment), by_status in counts.items():
+        key = _counts_key(agent_name, environment)
+        version = versions.get(key)
+        item = {"id": key, "record_type": "counts", "version": (version or 0) + 1}
+        item.update({f"count_{status}": count for status, count in by_status.items()})
+        if version is None:
+            condition = {"ConditionExpression": "attribute_not_exists(#id) OR attribute_not_exists(#version)",
+                         "ExpressionAttributeNames": {"#id": "id", "#version": "version"}}
+        else:
+            condition = {"ConditionExpression": "#version = :version",
+                         "ExpressionAttributeNames": {"#version": "version"},
+                         "ExpressionAttributeValues": {":version": version}}
+        try:
+            get_table().put_item(Item=item, **condition)
+            written[(agent_name, environment)] = by_status
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                print(f"reconcile_job_counts: counters of {agent_name}#{environment} changed during the scan; skipped")
+            else:
+                print(f"reconcile_job_counts error: {e}")
+    print(f"Reconciled job counts for {len(written)} of {len(counts)} agents in table {TABLE_NAME}")
+    return written
+
+
+def _get_counts_versions(filters: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[int]]:
+    """
+    Versions of the counters records a reconcile may rewrite, read before its
+    scan: the filtered agent's record, or every counters record.
+    """
+    filters = filters or {}
+    names = {"#id": "id", "#version": "version"}
+    try:
+        if "agent_name" in filters and "environment" in filters:
+            response = get_table().get_item(
+                Key={"id": _counts_key(filters["agent_name"], filters["environment"])},
+                ProjectionExpression="#id, #version",
+                ExpressionAttributeNames=names,
+                ConsistentRead=True,
+            )
+            items = [response["Item"]] if "Item" in response else []
+        else:
+            items = []
+            kwargs = {"FilterExpression": Attr("record_type").eq("counts"),
+                      "ProjectionExpression": "#id, #version",
+                      "ExpressionAttributeNames": names,
+                      "ConsistentRead": True}
+            while True:
+                response = get_table().scan(**kwargs)
+                items.extend(response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    except ClientError as e:
+        print(f"_get_counts_versions error: {e}")
+        return {}
+    return {item["id"]: int(item["version"]) if "version" in item else None for item in items}
+
+
+def backfill_agent_status(segments: Optional[int] = None) -> int:
+    """
+    Set agent_status on jobs written before it existed, so they show up in
+    agent-status-index queries. Safe to run more than once.
+
+    Returns:
+        int: Number of jobs updated
+    """
+    updated = 0
+    for job in iter_jobs_parallel(projection=["agent_status", *COUNT_ATTRIBUTES],
+                                  segments=segments, include_expired=True):
+        if not job.get("status"):
+            continue
+        expected = with_agent_status(job)["agent_status"]
+        if job.get("agent_status") == expected:
+            continue
+        try:
+            get_table().update_item(
+                Key={"id": job["id"]},
+                UpdateExpression="SET #agent_status = :agent_status",
+                ConditionExpression="attribute_exists(id)",
+                ExpressionAttributeNames={"#agent_status": "agent_status"},
+                ExpressionAttributeValues={":agent_status": expected},
+            )
+            updated += 1
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                print(f"backfill_agent_status error: {e}")
+    print(f"Backfilled agent_status on {updated} jobs in table {TABLE_NAME}")
+    return updated
+
+
+def _capacity_key() -> str:
+    """Key of the capacity record holding this agent/environment's leases."""
+    return f"capacity#{os.getenv('AGENT_NAME', '')}#{os.getenv('ENVIRONMENT', '')}"
+
+
+_capacity_record_ready = False
+
+
+def _ensure_capacity_record() -> None:
+    """Create this agent's capacity record with an empty lease map, once per process."""
+    global _capacity_record_ready
+    if _capacity_record_ready:
+        return
+    try:
+        get_table().put_item(
+            Item={"id": _capacity_key(), "record_type": "capacity", "leases": {}},
+            ConditionExpression="attribute_not_exists(id)",
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            raise
+    _capacity_record_ready = True
+
+
+def acquire_capacity_lease(job_id: str, limit: int) -> bool:
+    """
+    Atomically take one of this agent's `limit` execution slots for job_id.
+
+    Leases are kept as a map of job id -> acquisition time in a single
+    capacity record, so admission is one conditional UpdateItem that cannot
+    over-admit under concurrency. Re-acquiring a held lease succeeds.
+
+    Throttling is retried with backoff (JOB_LEASE_MAX_RETRIES). Any other
+    error refuses the job: admitting it without a lease could exceed the limit.
+
+    Returns:
+        bool: True if the job holds a lease, False if the agent is at capacity
+        or the lease could not be taken
+    """
+    job_id = str(job_id)
+    for attempt in range(JOB_LEASE_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(min(0.05 * 2 ** (attempt - 1), 1.0))
+        try:
+            _ensure_capacity_record()
+            get_table().update_item(
+                Key={"id": _capacity_key()},
+                UpdateExpression="SET #leases.#job = :now",
+                ConditionExpression="attribute_exists(#leases.#job) OR size(#leases) < :limit",
+                ExpressionAttributeNames={"#leases": "leases", "#job": job_id},
+                ExpressionAttributeValues={":now": int(time.time()), ":limit": limit},
+            )
+            print(f"Acquired capacity lease for job {job_id} in table {TABLE_NAME}")
+            return True
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "ConditionalCheckFailedException":
+                print(f"Capacity limit {limit} reached, no lease for job {job_id}")
+                return False
+            if code not in RETRYABLE_ERROR_CODES:
+                print(f"acquire_capacity_lease error: {e}")
+                return False
+    print(f"acquire_capacity_lease: still throttled after {JOB_LEASE_MAX_RETRIES} retries; refusing job {job_id}")
+    return False
+
+
+def release_capacity_lease(job_id: str) -> bool:
+    """
+    Release the execution slot held by job_id. Safe to call more than once.
+
+    Returns:
+        bool: True if a lease was released, False if the job held none
+    """
+    job_id = str(job_id)
+    try:
+        get_table().update_item(
+            Key={"id": _capacity_key()},
+            UpdateExpression="REMOVE #leases.#job",
+            ConditionExpression="attribute_exists(#leases.#job)",
+            ExpressionAttributeNames={"#leases": "leases", "#job": job_id},
+        )
+        print(f"Released capacity lease for job {job_id} in table {TABLE_NAME}")
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            print(f"release_capacity_lease error: {e}")
+        return False
+
+
+def release_capacity_leases(job_ids: List[str]) -> int:
+    """
+    Release the execution slots held by several jobs with one UpdateItem per
+    100 jobs. Jobs holding no lease are ignored.
+
+    Returns:
+        int: Number of jobs whose leases were targeted
+    """
+    job_ids = [str(job_id) for job_id in dict.fromkeys(job_ids) if job_id]
+    released = 0
+    for start in range(0, len(job_ids), 100):
+        chunk = job_ids[start:start + 100]
+        names = {"#leases": "leases", **{f"#j{i}": job_id for i, job_id in enumerate(chunk)}}
+        try:
+            get_table().update_item(
+                Key={"id": _capacity_key()},
+                UpdateExpression="REMOVE " + ", ".join(f"#leases.#j{i}" for i in range(len(chunk))),
+                ConditionExpression="attribute_exists(#leases)",
+                ExpressionAttributeNames=names,
+            )
+            released += len(chunk)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                print(f"release_capacity_leases error: {e}")
+    if released:
+        print(f"Released capacity leases for {released} jobs in table {TABLE_NAME}")
+    return released
+
+
+def list_capacity_leases() -> Dict[str, int]:
+    """Return the jobs holding this agent's execution slots, mapped to when they took them."""
+    try:
+        response = get_table().get_item(Key={"id": _capacity_key()}, ConsistentRead=True)
+        leases = response.get("Item", {}).get("leases", {})
+        return {job_id: int(acquired_at) for job_id, acquired_at in leases.items()}
+    except ClientError as e:
+        print(f"list_capacity_leases error: {e}")
+        return {}
+
+
+def reconcile_capacity_leases(grace_seconds: int = 60) -> int:
+    """
+    Release leases whose job is no longer in progress, or whose job record
+    never appeared within grace_seconds (e.g. the process crashed mid-admission).
+    """
+    now = time.time()
+    released = 0
+    for job_id, acquired_at in list_capacity_leases().items():
+        job = get_job(job_id, projection=["status"])
+        if job and job.get("status") == "inprogress":
+            continue
+        if not job and now - acquired_at < grace_seconds:
+            continue
+        if release_capacity_lease(job_id):
+            released += 1
+    if released:
+        print(f"Reconciled {released} orphaned capacity leases in table {TABLE_NAME}")
+    return released
+
+
 def health_check() -> Dict[str, Any]:
     """Perform a health check on the DynamoDB table"""
     try:
@@ -300,7 +1249,7 @@ def health_check() -> Dict[str, Any]:
             }
         
         # Try a simple query
-        test_response = table.scan(Limit=1)
+        test_response = get_table().scan(Limit=1)
         
         return {
             "status": "healthy",
@@ -317,11 +1266,10 @@ def health_check() -> Dict[str, Any]:
             "error": str(e)
         }
 
-# Initialize and verify table on import
 def _initialize_table():
-    """Initialize and verify the table exists"""
+    """Verify the table exists; runs once, when the table handle is first created"""
     try:
-        table_info = get_table_info()
+        table_info = get_table_info(max_age=0)
         if "error" not in table_info:
             print(f"Successfully connected to DynamoDB table: {TABLE_NAME}")
             print(f"Table status: {table_info.get('table_status')}")
@@ -336,6 +1284,3 @@ def _initialize_table():
             print(f"Warning: Could not connect to table {TABLE_NAME}: {table_info.get('error')}")
     except Exception as e:
         print(f"Warning: Table initialization check failed: {e}")
-
-# Run initialization check
-_initialize_table()
@@ -1,9 +1,9 @@
-import json
-import requests
 from ..utils.error_handling import error_handler
 from ..config.logger import Logger
-from ..utils.helper import update_task_status
-from ..utils.temp_db import get_job  # Replaced temp_data
+from ..utils.helper import update_task_status, TERMINAL_STATUSES
+from ..utils.job_store import get_job  # Replaced temp_data
+from ..utils.job_context import get_job_context
+from ..utils.webhook_dispatcher import get_dispatch_mode, get_webhook_dispatcher, should_flush_on_terminal
 
 logger = Logger()
 
@@ -21,15 +21,27 @@ def call_webhook_with_success(job_id: str, response: dict):
     # 1) Update your persistent status store
     update_task_status(job_id, status, data)
 
-    # 2) Load job from file-based store
-    job = get_job(job_id)
-    webhook_url = job.get("webhookUrl") if job else None
+    # 2) Use the job's execution context; only jobs started elsewhere need a lookup
+    context = get_job_context(job_id)
+    if context is not None:
+        context.status = status
+        webhook_url = context.webhook_url
+    else:
+        job = get_job(job_id, projection=["webhookUrl"])
+        webhook_url = job.get("webhookUrl") if job else None
 
     if webhook_url:
-        payload = json.dumps({"id": job_id, "status": status, "data": data})
-        resp = requests.post(webhook_url, data=payload)
+        payload = {"id": job_id, "status": status, "data": data}
+        dispatcher = get_webhook_dispatcher()
 
-        return resp
+        if get_dispatch_mode() == "sync":
+            return dispatcher.send(webhook_url, payload)
+
+        # 3) Queue for background delivery so the turn doesn't wait on the receiver
+        dispatcher.enqueue(job_id, webhook_url, payload)
+        if status in TERMINAL_STATUSES and should_flush_on_terminal():
+            dispatcher.flush(job_id, timeout=dispatcher.timeout)
+        return None
 
     logger.info("Webhook URL not found for job %s", job_id)
     return None
@@ -0,0 +1,184 @@
+import json
+import os
+import queue
+import threading
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config.logger import Logger
+
+logger = Logger()
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes')
+
+
+def get_dispatch_mode() -> str:
+    """
+    Returns how webhooks are delivered:
+      - "sync": sent inline by the caller, which gets the receiver's response back (default)
+      - "background": queued per job and sent by dispatcher threads; callers get None
+    """
+    return os.getenv('WEBHOOK_DISPATCH_MODE', 'sync').strip().lower()
+
+
+def should_flush_on_terminal() -> bool:
+    """
+    Whether a terminal status waits for the job's queued webhooks to be sent.
+    Defaults to on for Lambda, which freezes background threads after the response.
+    """
+    return _env_flag('WEBHOOK_FLUSH_ON_TERMINAL', bool(os.getenv('AWS_LAMBDA_FUNCTION_NAME')))
+
+
+def _build_session(pool_size: int) -> requests.Session:
+    """Session with a keep-alive connection pool shared by all deliveries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _output_only(payload: dict) -> bool:
+    data = payload.get('data')
+    return isinstance(data, dict) and len(data) == 1 and ('output' in data or 'outputs' in data)
+
+
+def _outputs(payload: dict) -> list:
+    data = payload['data']
+    return list(data['outputs']) if 'outputs' in data else [data['output']]
+
+
+class WebhookDispatcher:
+    """
+    Delivers webhook events in the background over a pooled keep-alive session.
+
+    Events are queued per job and a job is drained by one worker at a time, so
+    each job's events arrive in the order they were queued. With `coalesce`
+    on, adjacent in-progress output events of the same job are merged into a
+    single delivery whose data carries an `outputs` list.
+    """
+
+    def __init__(self, workers: int = 4, coalesce: bool = False, timeout: float = 10.0):
+        self.coalesce = coalesce
+        self.timeout = timeout
+        self._session = _build_session(max(workers, 1) * 2)
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._scheduled = set()
+        self._ready = queue.Queue()
+        self._stats = {'queued': 0, 'delivered': 0, 'coalesced': 0, 'failed': 0}
+        self._threads = []
+        for i in range(max(workers, 1)):
+            thread = threading.Thread(target=self._work, name=f'webhook-dispatcher-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def enqueue(self, job_id: str, url: str, payload: dict):
+        """Queue one event for delivery after any earlier events of the same job."""
+        with self._cond:
+            self._queues.setdefault(job_id, deque()).append((url, payload))
+            self._stats['queued'] += 1
+            if job_id not in self._scheduled:
+                self._scheduled.add(job_id)
+                self._ready.put(job_id)
+
+    def send(self, url: str, payload: dict):
+        """Deliver one event inline over the pooled session."""
+        return self._session.post(url, data=json.dumps(payload), timeout=self.timeout)
+
+    def flush(self, job_id: str = None, timeout: float = None) -> bool:
+        """
+        Wait until the job's queued events (or all events) have been sent.
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self._cond:
+            if job_id is None:
+                return self._cond.wait_for(lambda: not self._scheduled, timeout)
+            return self._cond.wait_for(lambda: job_id not in self._scheduled, timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._stats, 'pending_jobs': len(self._scheduled)}
+
+    def _next(self, job_id: str):
+        """Pop the job's next delivery, merging adjacent output events if allowed."""
+        with self._cond:
+            pending = self._queues.get(job_id)
+            if not pending:
+                self._queues.pop(job_id, None)
+                self._scheduled.discard(job_id)
+                self._cond.notify_all()
+                return None
+
+            url, payload = pending.popleft()
+            if self.coalesce and payload.get('status') == 'inprogress' and _output_only(payload):
+                outputs = _outputs(payload)
+                while pending:
+                    next_url, next_payload = pending[0]
+                    if (next_url != url or next_payload.get('status') != 'inprogress'
+                            or not _output_only(next_payload)):
+                        break
+                    pending.popleft()
+                    outputs.extend(_outputs(next_payload))
+                    self._stats['coalesced'] += 1
+                if len(outputs) > 1:
+                    payload = {**payload, 'data': {'outputs': outputs}}
+            return url, payload
+
+    def _work(self):
+        while True:
+            job_id = self._ready.get()
+            while True:
+                item = self._next(job_id)
+                if item is None:
+                    break
+                url, payload = item
+                try:
+                    resp = self.send(url, payload)
+                    with self._cond:
+                        self._stats['delivered'] += 1
+                    if resp.status_code >= 400:
+                        logger.warning('Webhook for job %s returned status' % job_id, resp.status_code)
+                except Exception as e:
+                    with self._cond:
+                        self._stats['failed'] += 1
+                    logger.error('Webhook delivery failed for job %s:' % job_id, str(e))
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Returns the process-wide dispatcher, creating it on first use."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = WebhookDispatcher(
+                    workers=int(os.getenv('WEBHOOK_WORKERS', '4')),
+                    coalesce=_env_flag('WEBHOOK_COALESCE_OUTPUTS', False),
+                    timeout=float(os.getenv('WEBHOOK_TIMEOUT', '10')),
+                )
+    return _dispatcher
+
+
+def flush_webhooks(timeout: float = 5.0) -> bool:
+    """Wait for all queued webhooks to be sent, if the dispatcher was started."""
+    dispatcher = _dispatcher
+    return dispatcher.flush(timeout=timeout) if dispatcher is not None else True
+
+
+def get_webhook_dispatcher_stats():
+    """Stats of the dispatcher, or None if it has not been started."""
+    dispatcher = _dispatcher
+    return dispatcher.stats() if dispatcher is not None else None
@@ -0,0 +1,231 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config.logger import Logger
+
+logger = Logger()
+
+
+def get_execute_mode() -> str:
+    """
+    Returns how /execute runs a job:
+      - "sync": the request waits for the job to finish (default)
+      - "background": the job is handed to the worker pool and /execute returns 202
+      - "asyncio": the job runs as a coroutine on a shared event loop and /execute returns 202.
+        Only base_agent has an async entry point; the daiquiri, gimlet, mojito and
+        oldFashioned variants run on the sync client and need "sync" or "background".
+    """
+    return os.getenv('EXECUTE_MODE', 'sync').strip().lower()
+
+
+class ExecutionPool:
+    """
+    Bounded, long-lived pool of worker threads for background job execution.
+
+    At most `max_workers` jobs run at once and at most `max_pending` more may
+    wait for a worker; anything beyond that is refused instead of queued.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int = 0):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='execute-worker')
+        self._lock = threading.Lock()
+        self._active = 0
+        self._submitted = 0
+        self._rejected = 0
+
+    def submit(self, fn, *args, **kwargs) -> bool:
+        """
+        Schedules fn(*args, **kwargs) on the pool.
+
+        Returns:
+            bool: False if the pool is full and the call was not scheduled.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            return False
+
+        def _run():
+            with self._lock:
+                self._active += 1
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.error('Unhandled error in execution pool worker:', str(e))
+            finally:
+                with self._lock:
+                    self._active -= 1
+                self._slots.release()
+
+        try:
+            self._executor.submit(_run)
+        except RuntimeError:
+            # Executor already shut down
+            self._slots.release()
+            return False
+
+        with self._lock:
+            self._submitted += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'active': self._active,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_execution_pool() -> ExecutionPool:
+    """Returns the process-wide execution pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                default_workers = os.getenv('AGENT_EXECUTE_LIMIT', '4')
+                max_workers = int(os.getenv('EXECUTE_WORKERS', default_workers))
+                max_pending = int(os.getenv('EXECUTE_QUEUE_SIZE', '0'))
+                _pool = ExecutionPool(max_workers, max_pending)
+                print(f"Execution pool started with {max_workers} workers, {max_pending} pending slots")
+    return _pool
+
+
+def shutdown_execution_pool(wait: bool = False):
+    """Stops the execution pool if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
+
+
+def get_execution_pool_stats():
+    """Stats of the execution pool, or None if it has not been started."""
+    pool = _pool
+    return pool.stats() if pool is not None else None
+
+
+class AsyncRunner:
+    """
+    Long-lived event loop on a dedicated thread for asyncio job execution.
+
+    Jobs are coroutines, so in-flight model calls cost no thread each. At most
+    `max_concurrency` jobs are admitted at a time; further submissions are refused.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='execute-event-loop', daemon=True)
+        self._thread.start()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._closed = False
+
+    def submit(self, coro_fn, *args, **kwargs) -> bool:
+        """
+        Schedules coro_fn(*args, **kwargs) on the loop.
+
+        Returns:
+            bool: False if the runner is full and the coroutine was not scheduled.
+        """
+        if self._closed or not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            return False
+
+        async def _run():
+            with self._lock:
+                self._active += 1
+            try:
+                await coro_fn(*args, **kwargs)
+            except Exception as e:
+                logger.error('Unhandled error in async execution:', str(e))
+            finally:
+                with self._lock:
+                    self._active -= 1
+                self._slots.release()
+
+        asyncio.run_coroutine_threadsafe(_run(), self._loop)
+        with self._lock:
+            self._submitted += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'active': self._active,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+            }
+
+    async def _drain(self):
+        """Cancels the jobs still running and closes the loop's pooled OpenAI client."""
+        from ..agent.openai_client import close_async_openai_client
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        # Cancelled jobs report their failure before they finish
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_async_openai_client()
+
+    def shutdown(self, timeout: float = 5.0):
+        self._closed = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result(timeout)
+        except Exception as e:
+            logger.error('Async runner did not drain cleanly:', str(e))
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+
+
+_runner = None
+
+
+def get_async_runner() -> AsyncRunner:
+    """Returns the process-wide asyncio runner, creating it on first use."""
+    global _runner
+    if _runner is None:
+        with _pool_lock:
+            if _runner is None:
+                max_concurrency = int(os.getenv('EXECUTE_ASYNC_CONCURRENCY', '200'))
+                _runner = AsyncRunner(max_concurrency)
+                print(f"Async execution runner started with concurrency {max_concurrency}")
+    return _runner
+
+
+def shutdown_async_runner():
+    """Stops the asyncio runner if it was started."""
+    global _runner
+    with _pool_lock:
+        if _runner is not None:
+            _runner.shutdown()
+            _runner = None
+
+
+def get_async_runner_stats():
+    """Stats of the asyncio runner, or None if it has not been started."""
+    runner = _runner
+    return runner.stats() if runner is not None else None
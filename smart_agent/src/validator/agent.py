@@ -1,23 +1,14 @@
-import os
-import json
 from pydantic import BaseModel
 from typing import List, Optional, Any
+from ..config.manifest import get_manifest
 
 
 def get_agent_inputs():
-    current_directory = os.path.dirname(__file__)
-    file_path = os.path.normpath(
-        os.path.join(current_directory, '../config/agent.json'))
-
     inputs = []
-    with open(file_path, "r") as json_file:
-        data = json.load(json_file)
-        inputs_data = data.get('inputs', [])
-
-        for input_data in inputs_data:
-            input_data.setdefault('data', 'string')
-            input_item = InputItem(**input_data)
-            inputs.append(input_item)
+    for input_data in get_manifest().doc.get('inputs', []):
+        # Copy so the shared manifest is left untouched
+        input_item = InputItem(**{'data': 'string', **input_data})
+        inputs.append(input_item)
 
     return inputs
 
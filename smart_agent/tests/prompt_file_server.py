@@ -0,0 +1,93 @@
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Concurrent downloads open many connections at once; the default backlog of 5 drops some
+    request_queue_size = 128
+
+
+class PromptFileServer:
+    """
+    Local stand-in for raw.githubusercontent.com: serves the files under a
+    directory with strong ETags and answers a matching If-None-Match with
+    304. `latency` delays every response to imitate a network round trip.
+
+    Point the downloader at it with PROMPT_BASE_URL=server.base_url.
+    """
+
+    def __init__(self, directory, host='127.0.0.1', port=0, latency=0.0):
+        self.directory = os.path.abspath(directory)
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so pooled client connections are reused as with GitHub
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                path = os.path.normpath(os.path.join(server.directory, unquote(self.path.split('?', 1)[0]).lstrip('/')))
+                if not path.startswith(server.directory + os.sep) or not os.path.isfile(path):
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                with open(path, 'rb') as file:
+                    body = file.read()
+                etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        # A short poll interval keeps stop() quick between tests
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                        name='prompt-file-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from smart_agent.src.agent import conversation_store
+from smart_agent.src.agent.context_window import SUMMARY_KEY, ConversationTurn, context_messages
+from smart_agent.src.agent.conversation_store import LocalConversationStore
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    store = LocalConversationStore(str(tmp_path))
+    monkeypatch.setattr(conversation_store, '_store', store)
+    return store
+
+
+def test_context_messages_use_the_current_system_prompt():
+    # Conversations stored before the prompt was left out still start with it
+    stored = [
+        {'role': 'system', 'content': 'old prompt'},
+        {'role': 'user', 'content': 'a'},
+        {'role': 'assistant', 'content': 'b'},
+        {'role': 'system', 'content': 'summary', SUMMARY_KEY: 2},
+    ]
+    assert context_messages(stored, 'new prompt') == [
+        {'role': 'system', 'content': 'new prompt'},
+        {'role': 'system', 'content': 'summary'},
+        {'role': 'assistant', 'content': 'b'},
+    ]
+
+
+def test_turns_store_messages_and_chain_without_the_system_prompt(store):
+    turn = ConversationTurn('prompt v1', 'hello')
+    assert turn.window()[0] == {'role': 'system', 'content': 'prompt v1'}
+    handle = turn.record('question one', response_id='resp_1', chain_tokens=10)
+
+    messages, meta = store.load_with_meta(handle)
+    assert [m['role'] for m in messages] == ['user', 'assistant']
+    assert meta == {'response_id': 'resp_1', 'chain_tokens': 10}
+
+    # The next turn chains on the stored response and sends the new prompt in fresh windows
+    turn = ConversationTurn('prompt v2', 'answer', handle)
+    assert turn.responses_input() == {'previous_response_id': 'resp_1',
+                                      'input': [{'role': 'user', 'content': 'answer'}]}
+    assert turn.window()[0]['content'] == 'prompt v2'
+
+    # A fallback answer ends the chain
+    turn.record('question two')
+    assert store.load_with_meta(handle)[1] == {}
+    assert 'previous_response_id' not in ConversationTurn('prompt v2', 'x', handle).responses_input()
+
+
+def test_legacy_json_history_drops_its_system_prompt(store):
+    legacy = json.dumps([
+        {'role': 'system', 'content': 'old prompt'},
+        {'role': 'user', 'content': 'a'},
+        {'role': 'assistant', 'content': 'b'},
+    ])
+    turn = ConversationTurn('new prompt', 'c', legacy)
+    assert [m['content'] for m in turn.window()] == ['new prompt', 'a', 'b', 'c']
+
+    handle = turn.record('d')
+    assert [m['content'] for m in store.load(handle)] == ['a', 'b', 'c', 'd']
@@ -0,0 +1,74 @@
+import pytest
+
+from smart_agent.src.agent.conversation_store import (
+    ConversationStore,
+    LocalConversationStore,
+    is_conversation_handle,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalConversationStore(str(tmp_path))
+
+
+def _message(role, content):
+    return {'role': role, 'content': content}
+
+
+def test_conversation_store_is_abstract():
+    with pytest.raises(TypeError):
+        ConversationStore()
+
+
+def test_create_load_and_append(store, tmp_path):
+    handle = store.create([_message('system', 'prompt'), _message('user', 'hi')])
+    assert is_conversation_handle(handle)
+    assert not is_conversation_handle('resp_123')
+
+    store.append(handle, [_message('assistant', 'hello')], start=2)
+    store.append(handle, [_message('user', 'bye')])
+    expected = ['prompt', 'hi', 'hello', 'bye']
+    assert [m['content'] for m in store.load(handle)] == expected
+
+    # A fresh store (another process) reads the same history from disk
+    assert [m['content'] for m in LocalConversationStore(str(tmp_path)).load(handle)] == expected
+
+
+def test_load_reads_only_new_records(store, tmp_path):
+    handle = store.create([_message('user', 'one')])
+    store.load(handle)
+
+    reads = []
+    original = store._read_from
+
+    def counting_read_from(h, start):
+        reads.append(start)
+        return original(h, start)
+
+    store._read_from = counting_read_from
+    LocalConversationStore(str(tmp_path)).append(handle, [_message('assistant', 'two')])
+    assert [m['content'] for m in store.load(handle)] == ['one', 'two']
+    assert reads == [1]
+
+
+def test_meta_is_written_with_the_messages(store):
+    handle = store.create([_message('user', 'hi')])
+    assert store.load_with_meta(handle)[1] == {}
+
+    store.append(handle, [_message('assistant', 'hello')], start=1, meta={'response_id': 'resp_1'})
+    messages, meta = store.load_with_meta(handle)
+    assert [m['content'] for m in messages] == ['hi', 'hello']
+    assert meta == {'response_id': 'resp_1'}
+
+    # meta=None leaves it alone; an empty dict clears it
+    store.append(handle, [_message('user', 'next')])
+    assert store.load_with_meta(handle)[1] == {'response_id': 'resp_1'}
+    store.append(handle, [_message('assistant', 'done')], meta={})
+    assert store.load_with_meta(handle)[1] == {}
+
+
+def test_empty_append_writes_nothing(store):
+    handle = store.create([_message('user', 'hi')])
+    store.append(handle, [])
+    assert len(store.load(handle)) == 1
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from smart_agent.src.agent import get_prompt_from_git as downloader
+from smart_agent.tests.prompt_file_server import PromptFileServer
+
+PROMPT = "prompt: |\n  <message role=\"system\">Be brief.</message>\n  <message role=\"user\">{{user_input}}</message>\n"
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    directory = tmp_path / 'upstream'
+    directory.mkdir()
+    (directory / 'a.yaml').write_text(PROMPT)
+    (directory / 'b.yaml').write_text(PROMPT.replace('brief', 'kind'))
+    with PromptFileServer(str(directory)) as server:
+        yield directory, server
+
+
+@pytest.fixture(autouse=True)
+def local(monkeypatch, tmp_path, upstream):
+    save_directory = tmp_path / 'Prompt'
+    monkeypatch.setattr(downloader, 'save_directory', str(save_directory))
+    monkeypatch.setenv('PROMPT_BASE_URL', upstream[1].base_url)
+    monkeypatch.delenv('GH_TOKEN', raising=False)
+    return save_directory
+
+
+def _statuses(results):
+    return {result['file']: result['status'] for result in results}
+
+
+def test_first_download_writes_files_and_cache(local, upstream):
+    results = downloader.main(['a.yaml', 'b.yaml'])
+
+    assert _statuses(results) == {'a.yaml': 'downloaded', 'b.yaml': 'downloaded'}
+    assert (local / 'a.yaml').read_text() == PROMPT
+    index = downloader.load_cache_index()
+    assert set(index) == {'a.yaml', 'b.yaml'}
+    assert all(entry['etag'] for entry in index.values())
+    assert os.path.exists(downloader._object_path(index['a.yaml']['sha256']))
+
+
+def test_unchanged_files_are_not_downloaded_again(local, upstream):
+    downloader.main(['a.yaml', 'b.yaml'])
+    (upstream[0] / 'b.yaml').write_text(PROMPT.replace('brief', 'precise'))
+
+    results = downloader.main(['a.yaml', 'b.yaml'])
+
+    assert _statuses(results) == {'a.yaml': 'not_modified', 'b.yaml': 'downloaded'}
+    assert 'precise' in (local / 'b.yaml').read_text()
+
+
+def test_not_modified_restores_the_local_copy_from_the_cache(local, upstream):
+    downloader.main(['a.yaml'])
+    (local / 'a.yaml').unlink()
+
+    assert _statuses(downloader.main(['a.yaml'])) == {'a.yaml': 'not_modified'}
+    assert (local / 'a.yaml').read_text() == PROMPT
+
+    (local / 'a.yaml').write_text('edited locally')
+    assert _statuses(downloader.main(['a.yaml'])) == {'a.yaml': 'not_modified'}
+    assert (local / 'a.yaml').read_text() == PROMPT
+
+
+def test_invalid_and_missing_files_keep_the_local_version(local, upstream):
+    downloader.main(['a.yaml'])
+    (upstream[0] / 'a.yaml').write_text('prompt: [unclosed')
+
+    results = downloader.main(['a.yaml', 'missing.yaml'])
+
+    assert _statuses(results) == {'a.yaml': 'invalid', 'missing.yaml': 'failed'}
+    assert (local / 'a.yaml').read_text() == PROMPT
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from smart_agent.src.utils.job_cache import JobCache
+
+
+class BlockingLoader:
+    """Loader that returns the current record only once it is released."""
+
+    def __init__(self, record):
+        self.record = record
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, job_id):
+        self.calls += 1
+        snapshot = dict(self.record)
+        self.started.set()
+        assert self.release.wait(5)
+        return snapshot
+
+
+def _in_thread(target, *args):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', target(*args)))
+    thread.start()
+    return thread, result
+
+
+def test_concurrent_misses_share_one_load():
+    cache = JobCache(ttl=60)
+    loader = BlockingLoader({'status': 'inprogress'})
+
+    leader, leader_result = _in_thread(cache.get, 'job', loader)
+    assert loader.started.wait(5)
+    followers = [_in_thread(cache.get, 'job', loader) for _ in range(4)]
+    while cache.stats()['shared_loads'] < 4:
+        time.sleep(0.001)
+    loader.release.set()
+
+    for thread, result in [(leader, leader_result), *followers]:
+        thread.join(5)
+        assert result['value'] == {'status': 'inprogress'}
+    assert loader.calls == 1
+    assert cache.get('job', loader) == {'status': 'inprogress'}
+    assert cache.stats()['hits'] == 1
+
+
+def test_invalidate_during_load_does_not_cache_stale_record():
+    cache = JobCache(ttl=60)
+    record = {'status': 'inprogress'}
+    loader = BlockingLoader(record)
+
+    thread, _ = _in_thread(cache.get, 'job', loader)
+    assert loader.started.wait(5)
+    # The job is written while the read is still in flight
+    record['status'] = 'completed'
+    cache.invalidate('job')
+    loader.release.set()
+    thread.join(5)
+
+    assert cache.stats()['size'] == 0
+    assert cache.get('job', lambda job_id: dict(record)) == {'status': 'completed'}
+
+
+def test_invalidate_during_load_with_a_full_cache():
+    cache = JobCache(ttl=60, max_entries=2)
+    for job_id in ('a', 'b'):
+        cache.invalidate(job_id)
+        cache.get(job_id, lambda job_id: {'id': job_id})
+    record = {'status': 'inprogress'}
+    loader = BlockingLoader(record)
+
+    thread, _ = _in_thread(cache.get, 'job', loader)
+    assert loader.started.wait(5)
+    record['status'] = 'completed'
+    cache.invalidate('job')
+    loader.release.set()
+    thread.join(5)
+
+    assert cache.get('job', lambda job_id: dict(record)) == {'status': 'completed'}
+
+
+def test_lru_eviction_and_expiry():
+    cache = JobCache(ttl=60, max_entries=2)
+    cache.get('a', lambda job_id: {'id': 'a'})
+    cache.get('b', lambda job_id: {'id': 'b'})
+    cache.get('a', lambda job_id: {'id': 'stale'})
+    cache.get('c', lambda job_id: {'id': 'c'})
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.get('b', lambda job_id: {'id': 'reloaded'}) == {'id': 'reloaded'}
+
+    cache.ttl = 0
+    cache.invalidate('a')
+    cache.get('a', lambda job_id: {'id': 'a'})
+    assert cache.get('a', lambda job_id: {'id': 'fresh'}) == {'id': 'fresh'}
+
+
+def test_failed_load_is_not_cached():
+    cache = JobCache(ttl=60)
+
+    def failing(job_id):
+        raise RuntimeError('boom')
+
+    try:
+        cache.get('job', failing)
+    except RuntimeError:
+        pass
+    assert cache.get('job', lambda job_id: {'id': job_id}) == {'id': 'job'}
@@ -0,0 +1,129 @@
+import os
+import time
+
+import pytest
+
+from smart_agent.src.utils import job_store
+from smart_agent.src.utils.job_store import JobStore
+from smart_agent.src.utils.job_store_memory import InMemoryJobStore
+from smart_agent.src.utils.job_store_sqlite import SQLiteJobStore
+
+
+@pytest.fixture(autouse=True)
+def agent_env(monkeypatch):
+    monkeypatch.setenv('AGENT_NAME', 'agent-ai-interviewer')
+    monkeypatch.setenv('ENVIRONMENT', 'test')
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return InMemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / 'jobs.sqlite3'))
+
+
+def _job(job_id, status='inprogress', **fields):
+    return {
+        'id': job_id,
+        'status': status,
+        'timestamp': int(time.time()),
+        'agent_name': 'agent-ai-interviewer',
+        'environment': 'test',
+        **fields,
+    }
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+    class Incomplete(JobStore):
+        def get_job(self, job_id, projection=None):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_add_update_and_project(store):
+    assert store.add_job(_job('a', data={'x': 1}))
+    assert store.get_job('a')['agent_status'] == 'agent-ai-interviewer#test#inprogress'
+
+    assert store.update_job_fields('a', {'status': 'completed', 'data': {'x': 2}})
+    job = store.get_job('a')
+    assert job['status'] == 'completed'
+    assert job['data'] == {'x': 2}
+    assert job['agent_status'] == 'agent-ai-interviewer#test#completed'
+
+    projected = store.get_job('a', projection=['status'])
+    assert 'data' not in projected and projected['status'] == 'completed'
+    assert store.get_job('missing') is None
+
+
+def test_heartbeat_only_renews_running_jobs(store):
+    store.add_job(_job('running'))
+    store.add_job(_job('done', status='completed'))
+
+    assert store.heartbeat_job('running')
+    assert store.get_job('running')['heartbeat_at'] >= int(time.time()) - 1
+    assert not store.heartbeat_job('done')
+    assert not store.heartbeat_job('missing')
+
+
+def test_cleanup_keeps_heartbeated_jobs(store):
+    old = int(time.time()) - 3600
+    store.add_job(_job('alive', timestamp=old))
+    store.add_job(_job('stale', timestamp=old))
+    store.heartbeat_job('alive')
+
+    assert store.cleanup_stale_jobs(max_age_seconds=900) == 1
+    assert store.get_job('alive') is not None
+    assert store.get_job('stale') is None
+
+
+def test_capacity_leases(store):
+    assert store.acquire_capacity_lease('a', 2)
+    assert store.acquire_capacity_lease('b', 2)
+    assert not store.acquire_capacity_lease('c', 2)
+    # Re-acquiring a held lease is allowed at the limit
+    assert store.acquire_capacity_lease('a', 2)
+
+    assert store.release_capacity_lease('a')
+    assert not store.release_capacity_lease('a')
+    assert set(store.list_capacity_leases()) == {'b'}
+
+
+def test_counts_and_listings(store):
+    store.add_job(_job('a'))
+    store.add_job(_job('b'))
+    store.add_job(_job('c', status='failed'))
+    store.add_job(_job('other', agent_name='someone-else'))
+
+    assert store.get_job_counts() == {'inprogress': 2, 'failed': 1}
+    assert {job['id'] for job in store.list_active_jobs(filters={'agent_name': 'agent-ai-interviewer'})} == {'a', 'b'}
+    assert store.remove_jobs(['a', 'b', 'a']) == 2
+    assert store.get_job_counts() == {'failed': 1}
+
+
+def test_sqlite_default_path_is_absolute(monkeypatch, tmp_path):
+    monkeypatch.setenv('JOB_STORE_BACKEND', 'sqlite')
+    monkeypatch.delenv('JOB_STORE_SQLITE_PATH', raising=False)
+    monkeypatch.setattr(job_store.tempfile, 'gettempdir', lambda: str(tmp_path / 'tmp'))
+    monkeypatch.setattr(job_store, '_store', None)
+    monkeypatch.chdir(tmp_path)
+
+    store = job_store.get_job_store()
+    assert store.path == os.path.join(str(tmp_path / 'tmp'), 'agent-jobs.sqlite3')
+    assert SQLiteJobStore('relative.sqlite3').path == os.path.join(str(tmp_path), 'relative.sqlite3')
+
+
+def test_listed_and_read_jobs_are_copies(store):
+    store.add_job(_job('a', data={'x': 1}))
+
+    listed = next(store.iter_jobs())
+    listed['status'] = 'completed'
+    store.get_job('a')['data'] = {'x': 2}
+
+    job = store.get_job('a')
+    assert job['status'] == 'inprogress'
+    assert job['data'] == {'x': 1}
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from smart_agent.src.config import manifest
+from smart_agent.src.routes.discover import router
+
+
+@pytest.fixture
+def agent_json(tmp_path, monkeypatch):
+    path = tmp_path / 'agent.json'
+    path.write_text(json.dumps({'name': 'agent-ai-interviewer', 'version': 1}))
+    monkeypatch.setattr(manifest, 'MANIFEST_PATH', str(path))
+    monkeypatch.setattr(manifest, '_manifest', None)
+    return path
+
+
+@pytest.fixture
+def client(agent_json):
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_discover_serves_the_manifest_with_an_etag(client):
+    response = client.get('/discover')
+
+    assert response.status_code == 200
+    assert response.json() == {'name': 'agent-ai-interviewer', 'version': 1}
+    assert response.headers['etag'] == manifest.get_manifest().etag
+    assert response.headers['cache-control'] == 'no-cache'
+
+
+def test_current_etag_gets_304_without_body(client):
+    etag = client.get('/discover').headers['etag']
+
+    for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+        response = client.get('/discover', headers={'If-None-Match': header})
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response.headers['etag'] == etag
+
+    assert client.get('/discover', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_changed_file_is_reloaded_when_watched(client, agent_json, monkeypatch):
+    monkeypatch.setenv('AGENT_MANIFEST_WATCH_SECONDS', '0.001')
+    old_etag = client.get('/discover').headers['etag']
+
+    agent_json.write_text(json.dumps({'name': 'agent-ai-interviewer', 'version': 2}))
+    # The watch compares mtime and size, so make the change visible even on coarse clocks
+    stat = os.stat(agent_json)
+    os.utime(agent_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    response = client.get('/discover', headers={'If-None-Match': old_etag})
+    assert response.status_code == 200
+    assert response.json()['version'] == 2
+    assert response.headers['etag'] != old_etag
+
+
+def test_unwatched_manifest_is_parsed_once(client, agent_json, monkeypatch):
+    monkeypatch.delenv('AGENT_MANIFEST_WATCH_SECONDS', raising=False)
+    etag = client.get('/discover').headers['etag']
+
+    agent_json.write_text('{"broken": ')
+    assert client.get('/discover', headers={'If-None-Match': etag}).status_code == 304
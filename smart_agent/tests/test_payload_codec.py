@@ -0,0 +1,83 @@
+import os
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+from smart_agent.src.utils import blob_store
+from smart_agent.src.utils.payload_codec import (
+    CODEC_KEY,
+    blob_key,
+    decode_job_data,
+    delete_job_blobs,
+    encode_job_data,
+)
+
+
+@pytest.fixture(autouse=True)
+def codec_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('JOB_DATA_COMPRESS_BYTES', '64')
+    monkeypatch.setenv('JOB_DATA_OFFLOAD_BYTES', '100000')
+    monkeypatch.delenv('JOB_BLOB_STORE', raising=False)
+    monkeypatch.setenv('JOB_BLOB_DIR', str(tmp_path / 'blobs'))
+    monkeypatch.setattr(blob_store, '_store', None)
+
+
+def _large(n=200):
+    return {'output': [f'line {i}' for i in range(n)], 'isComplete': False}
+
+
+def test_small_and_scalar_data_are_stored_as_is():
+    data = {'output': 'short'}
+    assert encode_job_data('job', data) is data
+    assert encode_job_data('job', 'text') == 'text'
+    assert decode_job_data(data) is data
+    assert decode_job_data(None) is None
+
+
+def test_large_data_round_trips_through_zlib():
+    data = _large()
+    encoded = encode_job_data('job', data)
+
+    assert encoded[CODEC_KEY] == 'zlib'
+    assert len(encoded['payload']) < encoded['size']
+    assert decode_job_data(encoded) == data
+    # Read back from DynamoDB the payload arrives wrapped in Binary
+    assert decode_job_data({**encoded, 'payload': Binary(encoded['payload'])}) == data
+
+
+def test_decimals_from_dynamodb_are_encoded_as_numbers():
+    data = {'score': Decimal('3'), 'ratio': Decimal('0.25'), 'padding': 'x' * 100}
+    assert decode_job_data(encode_job_data('job', data)) == {'score': 3, 'ratio': 0.25, 'padding': 'x' * 100}
+
+
+def test_oversized_data_is_offloaded_to_the_blob_store(monkeypatch, tmp_path):
+    monkeypatch.setenv('JOB_DATA_OFFLOAD_BYTES', '10')
+    monkeypatch.setenv('JOB_BLOB_STORE', 'local')
+    data = _large()
+
+    encoded = encode_job_data('job-1', data)
+    assert encoded == {CODEC_KEY: 'blob', 'store': 'local', 'key': blob_key('job-1'), 'size': encoded['size']}
+    assert decode_job_data(encoded) == data
+
+    # A later write of the same job overwrites its blob
+    updated = _large(300)
+    assert decode_job_data(encode_job_data('job-1', updated)) == updated
+
+    delete_job_blobs(['job-1'])
+    assert not os.listdir(tmp_path / 'blobs' / 'jobs' / 'job-1')
+    assert decode_job_data(encoded) == {'error': 'Stored job data could not be decoded.'}
+
+
+def test_oversized_data_stays_inline_without_a_blob_store(monkeypatch):
+    monkeypatch.setenv('JOB_DATA_OFFLOAD_BYTES', '10')
+    data = _large()
+
+    encoded = encode_job_data('job', data)
+    assert encoded[CODEC_KEY] == 'zlib'
+    assert decode_job_data(encoded) == data
+
+
+def test_unknown_codec_is_returned_unchanged():
+    data = {CODEC_KEY: 'brotli', 'payload': b''}
+    assert decode_job_data(data) is data
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from smart_agent.src.agent.prompt_registry import PromptRegistry, prompt_candidates
+
+
+def _prompt_file(system, user='Hello {{name}}', temperature=0.5):
+    return (
+        "model:\n"
+        "  name: gpt-test\n"
+        f"  temperature: {temperature}\n"
+        "prompt: |\n"
+        f"  <message role=\"system\">{system}</message>\n"
+        f"  <message role=\"user\">{user}</message>\n"
+    )
+
+
+def _write(path, content):
+    # Bump the mtime so a rewrite within the clock's resolution still counts as a change
+    previous = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, previous + 10 ** 9)))
+
+
+@pytest.fixture
+def prompt_path(tmp_path):
+    path = tmp_path / 'Interview.yaml'
+    _write(path, _prompt_file('first'))
+    return path
+
+
+def test_dev_mode_prefers_downloaded_prompts():
+    assert prompt_candidates('Interview.yaml', 'dev') == ('/tmp/Prompt/Interview.yaml', 'Prompt/Interview.yaml')
+    assert prompt_candidates('Interview.yaml', 'prod') == ('Prompt/Interview.yaml',)
+
+
+def test_register_compiles_once_and_serves_from_memory(prompt_path):
+    registry = PromptRegistry()
+    registry.register('interview', [str(prompt_path)])
+
+    prompt = registry.get('interview')
+    assert prompt.compiled.system_part == 'first'
+    assert prompt.compiled.render({'name': 'Ada'}) == 'Hello Ada'
+    assert prompt.compiled.model_params['name'] == 'gpt-test'
+
+    registry.refresh()
+    assert registry.get('interview') is prompt
+    assert registry.stats()['reloads'] == 0
+
+
+def test_refresh_swaps_in_a_changed_file(prompt_path):
+    registry = PromptRegistry()
+    registry.register('interview', [str(prompt_path)])
+
+    _write(prompt_path, _prompt_file('second'))
+    registry.refresh()
+
+    assert registry.get('interview').compiled.system_part == 'second'
+    assert registry.stats()['reloads'] == 1
+
+
+def test_broken_file_keeps_the_previous_version(prompt_path):
+    registry = PromptRegistry()
+    registry.register('interview', [str(prompt_path)])
+
+    _write(prompt_path, "prompt: no messages here\n")
+    registry.refresh()
+    registry.refresh()
+
+    assert registry.get('interview').compiled.system_part == 'first'
+    # The same broken version is reported once, not on every refresh
+    assert registry.stats()['failures'] == 1
+
+    _write(prompt_path, _prompt_file('fixed'))
+    registry.refresh()
+    assert registry.get('interview').compiled.system_part == 'fixed'
+
+
+def test_first_existing_candidate_wins(tmp_path, prompt_path):
+    downloaded = tmp_path / 'downloaded.yaml'
+    registry = PromptRegistry()
+    registry.register('interview', [str(downloaded), str(prompt_path)])
+    assert registry.get('interview').path == str(prompt_path)
+
+    _write(downloaded, _prompt_file('downloaded'))
+    registry.refresh()
+    assert registry.get('interview').path == str(downloaded)
+    assert registry.get('interview').compiled.system_part == 'downloaded'
+
+
+def test_missing_prompt_is_retried_on_get(tmp_path):
+    path = tmp_path / 'Late.yaml'
+    registry = PromptRegistry()
+    registry.register('late', [str(path)])
+
+    with pytest.raises(ValueError):
+        registry.get('late')
+    with pytest.raises(KeyError):
+        registry.get('unregistered')
+
+    _write(path, _prompt_file('late'))
+    assert registry.get('late').compiled.system_part == 'late'
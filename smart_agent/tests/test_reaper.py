@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from smart_agent.src.utils import job_store, reaper
+from smart_agent.src.utils.job_store_memory import InMemoryJobStore
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.setenv('AGENT_NAME', 'agent-ai-interviewer')
+    monkeypatch.setenv('ENVIRONMENT', 'test')
+    monkeypatch.setenv('JOB_REAPER_MAX_AGE_SECONDS', '60')
+    store = InMemoryJobStore()
+    monkeypatch.setattr(job_store, '_store', store)
+    yield store
+    reaper.stop_reaper()
+
+
+def _job(job_id, timestamp, status='inprogress'):
+    return {
+        'id': job_id,
+        'status': status,
+        'timestamp': timestamp,
+        'agent_name': 'agent-ai-interviewer',
+        'environment': 'test',
+    }
+
+
+def test_sweep_removes_only_stale_jobs(memory_store):
+    now = int(time.time())
+    memory_store.add_job(_job('stale', now - 3600))
+    memory_store.add_job(_job('fresh', now))
+    memory_store.add_job(_job('done', now, status='completed'))
+    before = reaper.get_reaper_stats()
+
+    assert reaper.reap_stale_jobs() == 2
+
+    assert memory_store.get_job('fresh') is not None
+    assert memory_store.get_job('stale') is None
+    assert memory_store.get_job('done') is None
+    stats = reaper.get_reaper_stats()
+    assert stats['sweeps'] == before['sweeps'] + 1
+    assert stats['jobs_reaped'] == before['jobs_reaped'] + 2
+    assert stats['last_jobs_reaped'] == 2
+
+
+def test_sweeps_do_not_overlap(memory_store):
+    memory_store.add_job(_job('stale', int(time.time()) - 3600))
+    with reaper._sweep_lock:
+        assert reaper.reap_stale_jobs() == 0
+    assert memory_store.get_job('stale') is not None
+
+
+def test_can_execute_does_not_sweep(memory_store, monkeypatch):
+    from smart_agent.src.controllers.StatusController import StatusController
+
+    monkeypatch.setattr(reaper, 'reap_stale_jobs', lambda: pytest.fail('swept on /execute'))
+    memory_store.add_job(_job('stale', int(time.time()) - 3600))
+
+    assert StatusController().can_execute()['status'] == 'available'
+    assert memory_store.get_job('stale') is not None
+
+
+def test_background_thread_starts_and_stops(monkeypatch):
+    monkeypatch.setenv('JOB_REAPER_INTERVAL_SECONDS', '3600')
+    reaper.start_reaper()
+    assert reaper.is_reaper_running()
+    reaper.stop_reaper(timeout=1.0)
+    assert not reaper.is_reaper_running()
+
+
+def test_disabled_reaper_does_not_start(monkeypatch):
+    monkeypatch.setenv('JOB_REAPER_ENABLED', 'false')
+    reaper.start_reaper()
+    assert not reaper.is_reaper_running()
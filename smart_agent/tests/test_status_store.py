@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from smart_agent.src.utils import status_store
+from smart_agent.src.utils.status_store import WriteBehindStatusStore
+
+
+class RecordingWriter:
+    """Stands in for update_job_fields; the first write can be held mid-flight."""
+
+    def __init__(self, hold_first=False):
+        self.writes = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        if not hold_first:
+            self.release.set()
+
+    def __call__(self, job_id, updates):
+        if not self.writes:
+            self.entered.set()
+            assert self.release.wait(5)
+        self.writes.append((job_id, dict(updates)))
+        return True
+
+
+@pytest.fixture
+def store():
+    # Flushes only when the test asks for them
+    store = WriteBehindStatusStore(flush_interval=3600)
+    yield store
+    store.stop()
+
+
+def test_updates_coalesce_into_one_write(store, monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(status_store, 'update_job_fields', writer)
+
+    store.update('job', {'status': 'inprogress', 'data': {'step': 1}})
+    store.update('job', {'data': {'step': 2}})
+    assert store.pending('job') == {'status': 'inprogress', 'data': {'step': 2}}
+
+    store.flush()
+    assert writer.writes == [('job', {'status': 'inprogress', 'data': {'step': 2}})]
+    assert store.pending('job') is None
+    assert store.stats()['coalesced'] == 1
+
+
+def test_durable_write_merges_buffered_updates(store, monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(status_store, 'update_job_fields', writer)
+
+    store.update('job', {'status': 'inprogress', 'progress': 50})
+    store.write('job', {'status': 'completed'})
+    store.flush()
+
+    assert writer.writes == [('job', {'status': 'completed', 'progress': 50})]
+
+
+def test_flush_in_flight_never_lands_after_a_terminal_write(store, monkeypatch):
+    writer = RecordingWriter(hold_first=True)
+    monkeypatch.setattr(status_store, 'update_job_fields', writer)
+
+    store.update('job', {'status': 'inprogress'})
+    flusher = threading.Thread(target=store.flush)
+    flusher.start()
+    assert writer.entered.wait(5)
+
+    # The terminal write arrives while the flush of the old status is still being sent
+    terminal = threading.Thread(target=store.write, args=('job', {'status': 'completed'}))
+    terminal.start()
+    terminal.join(0.1)
+    assert terminal.is_alive()
+
+    writer.release.set()
+    flusher.join(5)
+    terminal.join(5)
+
+    assert [updates['status'] for _, updates in writer.writes] == ['inprogress', 'completed']
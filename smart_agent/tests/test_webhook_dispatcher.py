@@ -0,0 +1,106 @@
+import random
+import threading
+import time
+
+from smart_agent.src.utils.webhook_dispatcher import WebhookDispatcher
+
+
+class Response:
+    status_code = 200
+
+
+class RecordingSender:
+    """Stands in for the HTTP post; deliveries block while `gate` is clear."""
+
+    def __init__(self, jitter=0.0):
+        self.sent = []
+        self.jitter = jitter
+        self.gate = threading.Event()
+        self.gate.set()
+        self.waiting = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, url, payload):
+        self.waiting.set()
+        assert self.gate.wait(5)
+        if self.jitter:
+            time.sleep(random.uniform(0, self.jitter))
+        with self._lock:
+            self.sent.append((url, payload))
+        return Response()
+
+
+def _output(text):
+    return {'status': 'inprogress', 'data': {'output': text}}
+
+
+def test_each_jobs_events_arrive_in_order():
+    dispatcher = WebhookDispatcher(workers=4)
+    dispatcher.send = sender = RecordingSender(jitter=0.002)
+
+    for i in range(20):
+        for job_id in ('a', 'b', 'c'):
+            dispatcher.enqueue(job_id, f'http://hook/{job_id}', {'id': job_id, 'seq': i})
+    assert dispatcher.flush(timeout=5)
+
+    for job_id in ('a', 'b', 'c'):
+        assert [p['seq'] for _, p in sender.sent if p['id'] == job_id] == list(range(20))
+    assert dispatcher.stats()['delivered'] == 60
+
+
+def test_queued_outputs_coalesce_up_to_a_status_change():
+    dispatcher = WebhookDispatcher(workers=1, coalesce=True)
+    dispatcher.send = sender = RecordingSender()
+    sender.gate.clear()
+
+    dispatcher.enqueue('job', 'http://hook', _output('first'))
+    # Hold the first delivery so the rest queue up behind it
+    assert sender.waiting.wait(5)
+    for text in ('a', 'b', 'c'):
+        dispatcher.enqueue('job', 'http://hook', _output(text))
+    dispatcher.enqueue('job', 'http://hook', {'status': 'completed', 'data': {'output': 'done'}})
+    dispatcher.enqueue('job', 'http://hook', _output('late'))
+    sender.gate.set()
+    assert dispatcher.flush('job', timeout=5)
+
+    assert [payload for _, payload in sender.sent] == [
+        _output('first'),
+        {'status': 'inprogress', 'data': {'outputs': ['a', 'b', 'c']}},
+        {'status': 'completed', 'data': {'output': 'done'}},
+        _output('late'),
+    ]
+    assert dispatcher.stats()['coalesced'] == 2
+
+
+def test_no_coalescing_unless_enabled():
+    dispatcher = WebhookDispatcher(workers=1)
+    dispatcher.send = sender = RecordingSender()
+    sender.gate.clear()
+
+    dispatcher.enqueue('job', 'http://hook', _output('first'))
+    assert sender.waiting.wait(5)
+    dispatcher.enqueue('job', 'http://hook', _output('a'))
+    dispatcher.enqueue('job', 'http://hook', _output('b'))
+    sender.gate.set()
+    assert dispatcher.flush(timeout=5)
+
+    assert [payload for _, payload in sender.sent] == [_output('first'), _output('a'), _output('b')]
+
+
+def test_failed_delivery_does_not_stop_the_job():
+    dispatcher = WebhookDispatcher(workers=1)
+    sent = []
+
+    def flaky(url, payload):
+        if payload['seq'] == 0:
+            raise ConnectionError('refused')
+        sent.append(payload['seq'])
+        return Response()
+
+    dispatcher.send = flaky
+    for i in range(3):
+        dispatcher.enqueue('job', 'http://hook', {'seq': i})
+    assert dispatcher.flush(timeout=5)
+
+    assert sent == [1, 2]
+    assert dispatcher.stats()['failed'] == 1
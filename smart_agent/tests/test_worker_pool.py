@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from smart_agent.src.utils.worker_pool import AsyncRunner, ExecutionPool, get_execute_mode
+
+
+@pytest.fixture
+def pool():
+    pool = ExecutionPool(max_workers=2, max_pending=1)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_execute_mode_defaults_to_sync(monkeypatch):
+    monkeypatch.delenv('EXECUTE_MODE', raising=False)
+    assert get_execute_mode() == 'sync'
+    monkeypatch.setenv('EXECUTE_MODE', ' Background ')
+    assert get_execute_mode() == 'background'
+
+
+def test_pool_refuses_work_beyond_workers_and_pending(pool):
+    release = threading.Event()
+    started = threading.Barrier(3)
+
+    def job():
+        started.wait(5)
+        release.wait(5)
+
+    assert pool.submit(job)
+    assert pool.submit(job)
+    started.wait(5)
+    # Both workers are busy: one more may wait, the next is refused
+    assert pool.submit(release.wait, 5)
+    assert not pool.submit(release.wait, 5)
+    assert pool.stats()['active'] == 2
+
+    release.set()
+    pool.shutdown(wait=True)
+    stats = pool.stats()
+    assert (stats['submitted'], stats['rejected'], stats['active']) == (3, 1, 0)
+
+
+def test_failing_job_frees_its_slot():
+    pool = ExecutionPool(max_workers=1)
+
+    def failing():
+        raise RuntimeError('boom')
+
+    done = threading.Event()
+    assert pool.submit(failing)
+    deadline = time.monotonic() + 5
+    while not pool.submit(done.set):
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    assert done.wait(5)
+    pool.shutdown(wait=True)
+
+
+def test_submit_after_shutdown_is_refused(pool):
+    pool.shutdown(wait=True)
+    assert not pool.submit(lambda: None)
+    # The refused call did not keep a slot
+    assert pool._slots.acquire(blocking=False)
+
+
+def test_async_runner_admits_up_to_its_concurrency():
+    runner = AsyncRunner(max_concurrency=2)
+    release = threading.Event()
+    finished = []
+
+    async def job(name):
+        await asyncio.to_thread(release.wait, 5)
+        finished.append(name)
+
+    assert runner.submit(job, 'a')
+    assert runner.submit(job, 'b')
+    assert not runner.submit(job, 'c')
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(finished) < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    # Slots are free again once the jobs are done
+    while not runner.submit(job, 'd'):
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    while len(finished) < 3:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    runner.shutdown()
+
+    assert sorted(finished) == ['a', 'b', 'd']
+    assert runner.stats()['rejected'] >= 1
+
+
+def test_async_runner_shutdown_cancels_running_jobs():
+    runner = AsyncRunner(max_concurrency=4)
+    started = threading.Event()
+    outcome = []
+
+    async def job():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            outcome.append('cancelled')
+            raise
+
+    assert runner.submit(job)
+    assert started.wait(5)
+    runner.shutdown(timeout=5)
+
+    assert outcome == ['cancelled']
+    assert not runner.submit(job)
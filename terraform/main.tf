@@ -70,6 +70,12 @@ variable "jobs_table_name" {
   default     = "agents-jobs-state"
 }
 
+variable "reaper_schedule" {
+  description = "EventBridge schedule for the stale job sweep on Lambda"
+  type        = string
+  default     = "rate(5 minutes)"
+}
+
 # ECS-specific inputs
 variable "container_image" {
   description = "Full ECR image URI for ECS deployment"
@@ -118,6 +124,12 @@ locals {
 ########################################
 # Look up an existing, shared jobs table by name. It must exist and expose
 # a GSI named "status-index" on the attribute "status" for efficient queries.
+# Time to live should be enabled on the "expires_at" attribute so finished and
+# abandoned job records expire without scans.
+# Agent-scoped listings (capacity, cleanup, shutdown) also query a GSI named
+# "agent-status-index" with hash key "agent_status" (type S, projection ALL),
+# whose values are "<agent_name>#<environment>#<status>". Without it the agent
+# falls back to "status-index" with a filter on agent_name/environment.
 data "aws_dynamodb_table" "jobs" {
   name = var.jobs_table_name
 }
@@ -193,6 +205,8 @@ resource "aws_iam_policy" "dynamodb_rw" {
         "dynamodb:PutItem",
         "dynamodb:DeleteItem",
         "dynamodb:UpdateItem",
+        "dynamodb:BatchGetItem",
+        "dynamodb:BatchWriteItem",
         "dynamodb:Query",
         "dynamodb:Scan",
         "dynamodb:DescribeTable"
@@ -285,6 +299,37 @@ resource "aws_lambda_function_url" "agent_url" {
   authorization_type = "NONE"
 }
 
+########################################
+#        Scheduled Job Reaper          #
+########################################
+# Lambda freezes background threads, so stale jobs are swept by a schedule
+resource "aws_cloudwatch_event_rule" "reaper" {
+  count               = local.is_lambda ? 1 : 0
+  name                = "${var.function_name}-${var.environment}-reaper"
+  schedule_expression = var.reaper_schedule
+
+  tags = {
+    Name        = "${var.function_name}-${var.environment}-reaper"
+    Environment = var.environment
+    ManagedBy   = "Terraform"
+  }
+}
+
+resource "aws_cloudwatch_event_target" "reaper" {
+  count = local.is_lambda ? 1 : 0
+  rule  = aws_cloudwatch_event_rule.reaper[0].name
+  arn   = aws_lambda_function.agent[0].arn
+}
+
+resource "aws_lambda_permission" "reaper" {
+  count         = local.is_lambda ? 1 : 0
+  statement_id  = "AllowEventBridgeReaper-${var.environment}"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.agent[0].function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.reaper[0].arn
+}
+
 ########################################
 #         API Gateway (optional)       #
 ########################################
@@ -720,11 +765,14 @@ output "ssm_parameter_info" {
 
 output "dynamodb_info" {
   value = {
-    table_name  = data.aws_dynamodb_table.jobs.name
-    table_arn   = data.aws_dynamodb_table.jobs.arn
-    hash_key    = "id"
-    gsi_name    = "status-index"
-    description = "Shared DynamoDB table for job state across multiple agents"
+    table_name     = data.aws_dynamodb_table.jobs.name
+    table_arn      = data.aws_dynamodb_table.jobs.arn
+    hash_key       = "id"
+    gsi_name       = "status-index"
+    agent_gsi_name = "agent-status-index"
+    agent_gsi_key  = "agent_status"
+    ttl_attribute  = "expires_at"
+    description    = "Shared DynamoDB table for job state across multiple agents"
   }
 }
 